@@ -1,9 +1,69 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, session
-from db_connect import get_conn
+from flask import Flask, request, jsonify, render_template, redirect, url_for, session, g, has_request_context
+from db_connect import db_connection, executemany, pool_stats
+from migrations import rebuilds_for, run_migrations, schema_is_current
+from schema_info import has_column, refresh_schema_cache
+from deputy_status import (
+    compile_status_timeline,
+    parse_status_payload,
+    rebuild_status_ledger,
+    rename_status_ledger,
+    replace_status_ledger,
+    statuses_between,
+)
+from executive_summary import OVERTIME_COLUMNS, OVERTIME_GROUPS, overtime_report, summarize_day, work_week
+from staffing import benchmark_latest_staffing, latest_staffing, remember_cell
+from result_stream import json_array_chunks, peak_allocation
+from assignment_rows import (
+    assignment_rows,
+    benchmark_row_pipeline,
+    benchmark_slot_lookup,
+    compact_duplicate_slots,
+    decode_search_cursor,
+    duplicate_slot_dates,
+    encode_search_cursor,
+    json_array_text,
+    search_rows_from_values,
+    slot_key_conflicts,
+    slot_rank_sql,
+    synthetic_search_rows,
+)
+from day_events import current_offset, day_event_frames, publish as publish_day_events
+from day_versions import (
+    DEPUTIES_SCOPE,
+    DayResultCache,
+    bump_day_versions,
+    bump_scope_versions,
+    day_version,
+    normalize_day,
+    scope_version,
+    transfers_scope,
+)
+from vacancy_counters import (
+    VACANCY_GROUP_COLUMNS,
+    benchmark_vacancy_counts,
+    rebuild_vacancy_counters,
+    refresh_stale_vacancy_counters,
+    vacancy_by_day,
+    vacancy_totals,
+)
+from assignment_members import (
+    MEMBER_OUTPUT_CLAUSE,
+    member_key,
+    member_search_prefixes,
+    rebuild_assignment_members,
+    refresh_assignment_members,
+    remove_member,
+    sync_assignment_members,
+    write_assignments,
+)
+import click
 import pyodbc
 import os
 import json
 import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -34,18 +94,17 @@ def _current_user_must_change_password():
 
 
 def _fetch_user(email):
-    conn = get_conn()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT TOP 1 email, password_hash, permission, must_change_password
-        FROM search.users
-        WHERE email = ?
-        """,
-        (email,),
-    )
-    row = cursor.fetchone()
-    conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT TOP 1 email, password_hash, permission, must_change_password
+            FROM search.users
+            WHERE email = ?
+            """,
+            (email,),
+        )
+        row = cursor.fetchone()
 
     if not row:
         return None
@@ -67,9 +126,43 @@ SUPERVISOR_PATH_PREFIXES = [
 
 ADMIN_PATH_PREFIXES = [
     "/api/delete-deputy",
+    "/api/admin",
 ]
 
 
+# Migrations run from `flask --app app migrate` as a deploy step, never on
+# import. Until they have, requests get a 503 instead of failing on a
+# missing table or column.
+SCHEMA_CHECK_INTERVAL_SECONDS = 30
+_schema_check = {"current": False, "checked_at": None}
+_schema_check_lock = threading.Lock()
+
+
+def _schema_is_current():
+    if _schema_check["current"]:
+        return True
+    with _schema_check_lock:
+        checked_at = _schema_check["checked_at"]
+        if checked_at is not None and time.monotonic() - checked_at < SCHEMA_CHECK_INTERVAL_SECONDS:
+            return _schema_check["current"]
+        with db_connection() as conn:
+            current = schema_is_current(conn.cursor())
+        _schema_check["current"] = current
+        _schema_check["checked_at"] = time.monotonic()
+        if not current:
+            app.logger.warning("Database schema has pending migrations; run `flask --app app migrate`.")
+        return current
+
+
+@app.before_request
+def require_current_schema():
+    if request.endpoint == "static" or _schema_is_current():
+        return None
+    if request.path.startswith("/api/"):
+        return jsonify({"status": "error", "message": "database schema is being upgraded"}), 503
+    return "Service Unavailable: database schema is being upgraded", 503
+
+
 @app.before_request
 def enforce_auth_and_permissions():
     public_endpoints = {"login", "logout", "change_password", "static"}
@@ -162,18 +255,17 @@ def change_password():
         elif new_password != confirm_password:
             error = "Passwords do not match."
         else:
-            conn = get_conn()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE search.users
-                SET password_hash = ?, must_change_password = 0
-                WHERE email = ?
-                """,
-                (new_password, session.get("user_email")),
-            )
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    UPDATE search.users
+                    SET password_hash = ?, must_change_password = 0
+                    WHERE email = ?
+                    """,
+                    (new_password, session.get("user_email")),
+                )
+                conn.commit()
 
             session["must_change_password"] = False
             return redirect(url_for("index"))
@@ -181,80 +273,6 @@ def change_password():
     return render_template("change_password.html", error=error)
 
 
-def _ensure_courtroom_meta_table(cursor):
-    cursor.execute("""
-        IF OBJECT_ID('dbo.courtroom_meta', 'U') IS NULL
-        BEGIN
-            CREATE TABLE dbo.courtroom_meta (
-                assignment_date DATE NOT NULL,
-                courthouse NVARCHAR(100) NOT NULL,
-                location_detail NVARCHAR(100) NOT NULL,
-                part NVARCHAR(100) NOT NULL DEFAULT '',
-                start_time NVARCHAR(16) NULL,
-                break_time NVARCHAR(16) NULL,
-                restart_time NVARCHAR(16) NULL,
-                adjourned_time NVARCHAR(16) NULL,
-                start_to_break_minutes INT NULL,
-                break_to_restart_minutes INT NULL,
-                restart_to_adjourned_minutes INT NULL,
-                total_time_up_minutes INT NULL,
-                is_down BIT NOT NULL DEFAULT 0,
-                is_high_profile BIT NOT NULL DEFAULT 0,
-                is_unscheduled BIT NOT NULL DEFAULT 0,
-                unscheduled_changed_by NVARCHAR(255) NULL,
-                unscheduled_changed_at NVARCHAR(64) NULL,
-                updated_at DATETIME NOT NULL DEFAULT GETDATE(),
-                CONSTRAINT PK_courtroom_meta PRIMARY KEY (assignment_date, courthouse, location_detail, part)
-            )
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'break_time') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD break_time NVARCHAR(16) NULL;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'start_to_break_minutes') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD start_to_break_minutes INT NULL;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'break_to_restart_minutes') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD break_to_restart_minutes INT NULL;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'restart_to_adjourned_minutes') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD restart_to_adjourned_minutes INT NULL;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'total_time_up_minutes') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD total_time_up_minutes INT NULL;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'is_high_profile') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD is_high_profile BIT NOT NULL CONSTRAINT DF_courtroom_meta_is_high_profile DEFAULT 0;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'is_unscheduled') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD is_unscheduled BIT NOT NULL CONSTRAINT DF_courtroom_meta_is_unscheduled DEFAULT 0;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'unscheduled_changed_by') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD unscheduled_changed_by NVARCHAR(255) NULL;
-        END
-
-        IF COL_LENGTH('dbo.courtroom_meta', 'unscheduled_changed_at') IS NULL
-        BEGIN
-            ALTER TABLE dbo.courtroom_meta ADD unscheduled_changed_at NVARCHAR(64) NULL;
-        END
-    """)
-
-
 def _parse_courtroom_time_to_minutes(time_value):
     text = (time_value or "").strip()
     if not text:
@@ -349,131 +367,23 @@ def _previous_weekday(target_date):
     return cursor_date
 
 
-def _parse_status_payload(status_text):
-    if not status_text:
-        return {"legacy": None, "legacy_meta": {}, "ranges": [], "weekly_unavailable": []}
-
-    try:
-        parsed = json.loads(status_text)
-        if isinstance(parsed, dict) and "ranges" in parsed:
-            return {
-                "legacy": parsed.get("legacy"),
-                "legacy_meta": parsed.get("legacy_meta") or {},
-                "ranges": parsed.get("ranges") or [],
-                "weekly_unavailable": parsed.get("weekly_unavailable") or []
-            }
-    except (json.JSONDecodeError, TypeError):
-        pass
-
-    return {"legacy": status_text, "legacy_meta": {}, "ranges": [], "weekly_unavailable": []}
-
-
 def _status_change_actor():
     return (session.get("user_email") or "unknown").strip().lower()
 
 
 def _effective_status_meta_for_date(status_text, target_date):
-    payload = _parse_status_payload(status_text)
-
-    if target_date:
-        target = _parse_date_value(target_date)
-        matches = []
-
-        for idx, status_range in enumerate(payload.get("ranges", [])):
-            start = _parse_date_value(status_range.get("start_date"))
-            end = _parse_date_value(status_range.get("end_date"))
-            status_value = status_range.get("status")
-            if not (start and end and status_value):
-                continue
-            if target and start <= target <= end:
-                matches.append({
-                    "status": status_value,
-                    "changed_by": status_range.get("changed_by"),
-                    "changed_at": status_range.get("changed_at"),
-                    "order": idx,
-                })
-
-        weekday_name = target.strftime("%A") if target else None
-        for idx, rule in enumerate(payload.get("weekly_unavailable", [])):
-            rule_day = (rule.get("day") or "").strip()
-            rule_end = _parse_date_value(rule.get("end_date"))
-            if not rule_day or not rule_end or not weekday_name:
-                continue
-            if target <= rule_end and (rule_day == "Any Day" or rule_day == weekday_name):
-                matches.append({
-                    "status": "Unavailable",
-                    "changed_by": rule.get("changed_by"),
-                    "changed_at": rule.get("changed_at"),
-                    "order": len(payload.get("ranges", [])) + idx,
-                })
-
-        if matches:
-            winner = sorted(matches, key=lambda item: item.get("order", 0))[-1]
-            return {
-                "status": winner.get("status"),
-                "changed_by": winner.get("changed_by"),
-                "changed_at": winner.get("changed_at"),
-            }
-
-    has_structured_status = bool(payload.get("ranges") or payload.get("weekly_unavailable"))
-    legacy_status = payload.get("legacy")
-    if legacy_status and not has_structured_status:
-        legacy_meta = payload.get("legacy_meta") or {}
-        return {
-            "status": legacy_status,
-            "changed_by": legacy_meta.get("changed_by"),
-            "changed_at": legacy_meta.get("changed_at"),
-        }
-
-    return {"status": None, "changed_by": None, "changed_at": None}
+    return compile_status_timeline(status_text).meta_for(target_date)
 
 
 def _effective_status_for_date(status_text, target_date):
-    meta = _effective_status_meta_for_date(status_text, target_date)
-    if meta.get("status"):
-        return meta.get("status")
-
-    payload = _parse_status_payload(status_text)
-
-    if target_date:
-        target = _parse_date_value(target_date)
-        active_statuses = []
-
-        for status_range in payload.get("ranges", []):
-            start = _parse_date_value(status_range.get("start_date"))
-            end = _parse_date_value(status_range.get("end_date"))
-            status_value = status_range.get("status")
-
-            if not (start and end and status_value):
-                continue
-
-            if start <= target <= end and status_value not in active_statuses:
-                active_statuses.append(status_value)
-
-        weekday_name = target.strftime("%A") if target else None
-        for rule in payload.get("weekly_unavailable", []):
-            rule_day = (rule.get("day") or "").strip()
-            rule_end = _parse_date_value(rule.get("end_date"))
-            if not rule_day or not rule_end or not weekday_name:
-                continue
-            if target <= rule_end and (rule_day == "Any Day" or rule_day == weekday_name):
-                if "Unavailable" not in active_statuses:
-                    active_statuses.append("Unavailable")
-
-        if active_statuses:
-            # Keep only one status active for a given date.
-            # Newer entries are appended later, so they should win.
-            return active_statuses[-1]
+    return compile_status_timeline(status_text).status_for(target_date)
 
-    has_structured_status = bool(payload.get("ranges") or payload.get("weekly_unavailable"))
-    if has_structured_status:
-        return None
 
-    return payload.get("legacy")
+def _is_off_for_assignment(status_text, target_date):
+    return _is_off_status(_effective_status_for_date(status_text, target_date))
 
 
-def _is_off_for_assignment(status_text, target_date):
-    effective_status = _effective_status_for_date(status_text, target_date)
+def _is_off_status(effective_status):
     if not effective_status:
         return False
 
@@ -569,27 +479,6 @@ def _canonical_capacity_tag(value):
     return raw
 
 
-def _ensure_deputy_transfers_table(cursor):
-    cursor.execute("""
-        IF OBJECT_ID('dbo.deputy_transfers', 'U') IS NULL
-        BEGIN
-            CREATE TABLE dbo.deputy_transfers (
-                assignment_date DATE NOT NULL,
-                full_name NVARCHAR(255) NOT NULL,
-                transfer_out_time DATETIME NULL,
-                transfer_in_time DATETIME NULL,
-                transfer_history NVARCHAR(MAX) NULL,
-                CONSTRAINT PK_deputy_transfers PRIMARY KEY (assignment_date, full_name)
-            )
-        END
-
-        IF COL_LENGTH('dbo.deputy_transfers', 'transfer_history') IS NULL
-        BEGIN
-            ALTER TABLE dbo.deputy_transfers ADD transfer_history NVARCHAR(MAX) NULL;
-        END
-    """)
-
-
 def _default_time_label():
     return datetime.now().strftime("%I:%M %p").lstrip("0")
 
@@ -660,30 +549,91 @@ def _safe_transfer_history_load(raw_history, out_dt=None, in_dt=None):
     return history[:3]
 
 
+def _not_modified(etag):
+    """
+    Return a 304 response when the request's If-None-Match already names
+    ``etag``, otherwise None. Read the version behind ``etag`` before the
+    data it describes, so a concurrent write can only make the tag older.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _tagged_json(payload, etag):
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _encode_json_row(row):
+    # Same encoding as jsonify (dates, sorted keys), without the whole body.
+    return app.json.dumps(row, separators=(",", ":"))
+
+
+def _json_text_response(body, etag=None):
+    """Send an already-encoded JSON body, optionally tagged like _tagged_json."""
+    response = app.response_class(body, mimetype="application/json")
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _encode_assignment_row(row):
+    return row.to_json(_encode_json_row)
+
+
+def _streamed_json(produce_rows, encode=_encode_json_row):
+    """
+    Stream a JSON array whose items come from ``produce_rows(cursor)``.
+
+    The connection is checked out when the body starts and held until the
+    last row is sent, so ``produce_rows`` can iterate a live cursor.
+    The status is already sent when a row fails, so the error is logged
+    and the array is left unterminated for the client to reject.
+    """
+    def generate():
+        try:
+            with db_connection() as conn:
+                yield from json_array_chunks(produce_rows(conn.cursor()), encode)
+        except Exception:
+            app.logger.exception("Streamed JSON response failed mid-body")
+
+    return app.response_class(generate(), mimetype="application/json")
+
+
 @app.route("/api/transfers")
 def get_transfers():
     assignment_date = request.args.get("date")
     if not assignment_date:
         return jsonify([])
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    _ensure_deputy_transfers_table(cursor)
-    cursor.execute("""
-        SELECT full_name, transfer_out_time, transfer_in_time, transfer_history
-        FROM dbo.deputy_transfers
-        WHERE assignment_date = ?
-    """, (assignment_date,))
-    rows = cursor.fetchall()
-    conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        etag = f"transfers-{normalize_day(assignment_date)}-{scope_version(cursor, transfers_scope(assignment_date))}"
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        cursor.execute("""
+            SELECT full_name, transfer_out_time, transfer_in_time, transfer_history
+            FROM dbo.deputy_transfers
+            WHERE assignment_date = ?
+        """, (assignment_date,))
+        rows = cursor.fetchall()
 
-    return jsonify([
+    return _tagged_json([
         {
             "full_name": r[0],
             "history": _safe_transfer_history_load(r[3], r[1], r[2]),
         }
         for r in rows
-    ])
+    ], etag)
 
 
 @app.route("/api/transfer-out", methods=["POST"])
@@ -697,62 +647,61 @@ def transfer_out():
     if not assignment_date or not full_name:
         return jsonify({"status": "error", "message": "missing assignment_date/full_name"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    _ensure_deputy_transfers_table(cursor)
-    cursor.execute("""
-        SELECT transfer_history, transfer_out_time, transfer_in_time
-        FROM dbo.deputy_transfers
-        WHERE assignment_date = ? AND full_name = ?
-    """, (assignment_date, full_name))
-    existing = cursor.fetchone()
+        cursor.execute("""
+            SELECT transfer_history, transfer_out_time, transfer_in_time
+            FROM dbo.deputy_transfers
+            WHERE assignment_date = ? AND full_name = ?
+        """, (assignment_date, full_name))
+        existing = cursor.fetchone()
 
-    history = _safe_transfer_history_load(existing[0], existing[1], existing[2]) if existing else []
+        history = _safe_transfer_history_load(existing[0], existing[1], existing[2]) if existing else []
 
-    target_index = None
-    try:
-        if transfer_index is not None:
-            target_index = int(transfer_index) - 1
-    except (TypeError, ValueError):
         target_index = None
+        try:
+            if transfer_index is not None:
+                target_index = int(transfer_index) - 1
+        except (TypeError, ValueError):
+            target_index = None
+
+        if target_index is not None and 0 <= target_index < len(history):
+            if from_post:
+                history[target_index]["from"] = from_post
+            history[target_index]["out"] = transfer_time
+        else:
+            if len(history) >= 3:
+                return jsonify({"status": "error", "message": "Maximum of 3 transfers reached"}), 400
+            history.append({"from": from_post, "to": None, "out": transfer_time, "in": None})
+            target_index = len(history) - 1
 
-    if target_index is not None and 0 <= target_index < len(history):
-        if from_post:
-            history[target_index]["from"] = from_post
-        history[target_index]["out"] = transfer_time
-    else:
-        if len(history) >= 3:
-            conn.close()
-            return jsonify({"status": "error", "message": "Maximum of 3 transfers reached"}), 400
-        history.append({"from": from_post, "to": None, "out": transfer_time, "in": None})
-        target_index = len(history) - 1
-
-    latest = history[target_index] if 0 <= target_index < len(history) else history[-1]
+        latest = history[target_index] if 0 <= target_index < len(history) else history[-1]
 
-    cursor.execute("""
-        MERGE dbo.deputy_transfers AS t
-        USING (SELECT ? AS assignment_date, ? AS full_name) AS s
-        ON t.assignment_date = s.assignment_date AND t.full_name = s.full_name
-        WHEN MATCHED THEN
-            UPDATE SET
-                transfer_history = ?,
-                transfer_out_time = NULL,
-                transfer_in_time = NULL
-        WHEN NOT MATCHED THEN
-            INSERT (assignment_date, full_name, transfer_out_time, transfer_in_time, transfer_history)
-            VALUES (?, ?, NULL, NULL, ?);
-    """, (
-        assignment_date,
-        full_name,
-        json.dumps(history),
-        assignment_date,
-        full_name,
-        json.dumps(history),
-    ))
+        cursor.execute("""
+            MERGE dbo.deputy_transfers AS t
+            USING (SELECT ? AS assignment_date, ? AS full_name) AS s
+            ON t.assignment_date = s.assignment_date AND t.full_name = s.full_name
+            WHEN MATCHED THEN
+                UPDATE SET
+                    transfer_history = ?,
+                    transfer_out_time = NULL,
+                    transfer_in_time = NULL
+            WHEN NOT MATCHED THEN
+                INSERT (assignment_date, full_name, transfer_out_time, transfer_in_time, transfer_history)
+                VALUES (?, ?, NULL, NULL, ?);
+        """, (
+            assignment_date,
+            full_name,
+            json.dumps(history),
+            assignment_date,
+            full_name,
+            json.dumps(history),
+        ))
 
-    conn.commit()
-    conn.close()
+        bump_scope_versions(cursor, [transfers_scope(assignment_date)])
+        _queue_day_event(assignment_date, "transfers")
+        conn.commit()
     return jsonify({
         "status": "success",
         "transfer_index": target_index + 1,
@@ -772,58 +721,56 @@ def transfer_in():
     if not assignment_date or not full_name:
         return jsonify({"status": "error", "message": "missing assignment_date/full_name"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
-
-    _ensure_deputy_transfers_table(cursor)
-    cursor.execute("""
-        SELECT transfer_history, transfer_out_time, transfer_in_time
-        FROM dbo.deputy_transfers
-        WHERE assignment_date = ? AND full_name = ?
-    """, (assignment_date, full_name))
-    existing = cursor.fetchone()
-
-    history = _safe_transfer_history_load(existing[0], existing[1], existing[2]) if existing else []
-    if not history:
-        conn.close()
-        return jsonify({"status": "error", "message": "No transfer-out found"}), 400
-
-    target_index = None
-    try:
-        if transfer_index is not None:
-            idx = int(transfer_index) - 1
-            if 0 <= idx < len(history):
-                target_index = idx
-    except (TypeError, ValueError):
-        target_index = None
-
-    if target_index is None:
-        for i in range(len(history) - 1, -1, -1):
-            if history[i].get("out") and not history[i].get("in"):
-                target_index = i
-                break
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    if target_index is None:
-        conn.close()
-        return jsonify({"status": "error", "message": "No open transfer-out found"}), 400
+        cursor.execute("""
+            SELECT transfer_history, transfer_out_time, transfer_in_time
+            FROM dbo.deputy_transfers
+            WHERE assignment_date = ? AND full_name = ?
+        """, (assignment_date, full_name))
+        existing = cursor.fetchone()
 
-    out_time_value = _parse_time_label(history[target_index].get("out"))
-    in_time_value = _parse_time_label(transfer_time)
-    if out_time_value and in_time_value and in_time_value == out_time_value:
-        in_time_value = in_time_value + timedelta(seconds=1)
+        history = _safe_transfer_history_load(existing[0], existing[1], existing[2]) if existing else []
+        if not history:
+            return jsonify({"status": "error", "message": "No transfer-out found"}), 400
 
-    history[target_index]["in"] = _format_time_label(in_time_value) if in_time_value else transfer_time
-    if to_post:
-        history[target_index]["to"] = to_post
+        target_index = None
+        try:
+            if transfer_index is not None:
+                idx = int(transfer_index) - 1
+                if 0 <= idx < len(history):
+                    target_index = idx
+        except (TypeError, ValueError):
+            target_index = None
+
+        if target_index is None:
+            for i in range(len(history) - 1, -1, -1):
+                if history[i].get("out") and not history[i].get("in"):
+                    target_index = i
+                    break
+
+        if target_index is None:
+            return jsonify({"status": "error", "message": "No open transfer-out found"}), 400
+
+        out_time_value = _parse_time_label(history[target_index].get("out"))
+        in_time_value = _parse_time_label(transfer_time)
+        if out_time_value and in_time_value and in_time_value == out_time_value:
+            in_time_value = in_time_value + timedelta(seconds=1)
+
+        history[target_index]["in"] = _format_time_label(in_time_value) if in_time_value else transfer_time
+        if to_post:
+            history[target_index]["to"] = to_post
 
-    cursor.execute("""
-        UPDATE dbo.deputy_transfers
-        SET transfer_history = ?, transfer_out_time = NULL, transfer_in_time = NULL
-        WHERE assignment_date = ? AND full_name = ?
-    """, (json.dumps(history), assignment_date, full_name))
+        cursor.execute("""
+            UPDATE dbo.deputy_transfers
+            SET transfer_history = ?, transfer_out_time = NULL, transfer_in_time = NULL
+            WHERE assignment_date = ? AND full_name = ?
+        """, (json.dumps(history), assignment_date, full_name))
 
-    conn.commit()
-    conn.close()
+        bump_scope_versions(cursor, [transfers_scope(assignment_date)])
+        _queue_day_event(assignment_date, "transfers")
+        conn.commit()
     return jsonify({
         "status": "success",
         "transfer_index": target_index + 1,
@@ -840,15 +787,15 @@ def remove_transfer_data():
     if not assignment_date or not full_name:
         return jsonify({"status": "error", "message": "missing assignment_date/full_name"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    _ensure_deputy_transfers_table(cursor)
-    cursor.execute("""
-        DELETE FROM dbo.deputy_transfers
-        WHERE assignment_date = ? AND full_name = ?
-    """, (assignment_date, full_name))
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM dbo.deputy_transfers
+            WHERE assignment_date = ? AND full_name = ?
+        """, (assignment_date, full_name))
+        bump_scope_versions(cursor, [transfers_scope(assignment_date)])
+        _queue_day_event(assignment_date, "transfers")
+        conn.commit()
     return jsonify({"status": "success"})
 
 
@@ -866,35 +813,36 @@ def update_status():
     changed_by = _status_change_actor()
     changed_at = datetime.utcnow().isoformat()
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT current_status
-        FROM dbo.deputies
-        WHERE full_name = ?
-    """, (data["full_name"],))
-    row = cursor.fetchone()
-    current_status = row[0] if row else None
-    payload = _parse_status_payload(current_status)
-
-    payload["legacy"] = data["status"]
-    payload["legacy_meta"] = {
-        "changed_by": changed_by,
-        "changed_at": changed_at,
-    }
+        cursor.execute("""
+            SELECT current_status
+            FROM dbo.deputies
+            WHERE full_name = ?
+        """, (data["full_name"],))
+        row = cursor.fetchone()
+        current_status = row[0] if row else None
+        payload = parse_status_payload(current_status)
 
-    cursor.execute("""
-        UPDATE dbo.deputies
-        SET current_status = ?
-        WHERE full_name = ?
-    """, (
-        _serialize_status_payload(payload),
-        data["full_name"]
-    ))
+        payload["legacy"] = data["status"]
+        payload["legacy_meta"] = {
+            "changed_by": changed_by,
+            "changed_at": changed_at,
+        }
+
+        cursor.execute("""
+            UPDATE dbo.deputies
+            SET current_status = ?
+            WHERE full_name = ?
+        """, (
+            _serialize_status_payload(payload),
+            data["full_name"]
+        ))
+        replace_status_ledger(cursor, data["full_name"], payload)
 
-    conn.commit()
-    conn.close()
+        bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+        conn.commit()
 
     return {"status": "success"}
 
@@ -906,155 +854,144 @@ def update_status_range():
     status = _normalize_status_type(data.get("status"))
     start_date = data.get("start_date")
     end_date = data.get("end_date")
-    conn = get_conn()
-    cursor = conn.cursor()
-    changed_by = _status_change_actor()
-    changed_at = datetime.utcnow().isoformat()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        changed_by = _status_change_actor()
+        changed_at = datetime.utcnow().isoformat()
+    
+        if status == "CLEAR_ALL":
+            cursor.execute("""
+                UPDATE dbo.deputies
+                SET current_status = NULL
+                WHERE full_name = ?
+            """, (full_name,))
+            replace_status_ledger(cursor, full_name, None)
+
+            bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+            conn.commit()
+            return jsonify({"status": "cleared", "removed_assignments": 0})
     
-    if status == "CLEAR_ALL":
+
         cursor.execute("""
-            UPDATE dbo.deputies
-            SET current_status = NULL
+            SELECT current_status
+            FROM dbo.deputies
             WHERE full_name = ?
         """, (full_name,))
-        
-        conn.commit()
-        conn.close()
-        return jsonify({"status": "cleared", "removed_assignments": 0})
-    
+        row = cursor.fetchone()
+        current_status = row[0] if row else None
+        payload = parse_status_payload(current_status)
 
-    cursor.execute("""
-        SELECT current_status
-        FROM dbo.deputies
-        WHERE full_name = ?
-    """, (full_name,))
-    row = cursor.fetchone()
-    current_status = row[0] if row else None
-    payload = _parse_status_payload(current_status)
-
-    ranges = payload.get("ranges", [])
-    remove_only = bool(data.get("remove_only"))
-    new_ranges = []
-
-    target_start = _parse_date_value(start_date)
-    target_end = _parse_date_value(end_date) or target_start
-
-    for r in ranges:
-        r_status = r.get("status")
-        r_start = _parse_date_value(r.get("start_date"))
-        r_end = _parse_date_value(r.get("end_date"))
-
-        if not (r_status and r_start and r_end):
-            new_ranges.append(r)
-            continue
+        ranges = payload.get("ranges", [])
+        remove_only = bool(data.get("remove_only"))
+        new_ranges = []
 
-        applies_to_row = (
-            r_status == status if remove_only else True
-        )
-        has_overlap = (
-            target_start and
-            target_end and
-            r_start <= target_end and
-            target_start <= r_end
-        )
+        target_start = _parse_date_value(start_date)
+        target_end = _parse_date_value(end_date) or target_start
 
-        if not applies_to_row or not has_overlap:
-            new_ranges.append(r)
-            continue
+        for r in ranges:
+            r_status = r.get("status")
+            r_start = _parse_date_value(r.get("start_date"))
+            r_end = _parse_date_value(r.get("end_date"))
 
-        # Preserve any non-overlapping portions of existing ranges.
-        segments = _split_status_range(r_start, r_end, target_start, target_end)
-        if not segments:
-            # Entire range was removed (common for single-day ranges).
-            continue
+            if not (r_status and r_start and r_end):
+                new_ranges.append(r)
+                continue
 
-        for seg_start, seg_end in segments:
-            new_ranges.append({
-                "status": r_status,
-                "start_date": seg_start.isoformat(),
-                "end_date": seg_end.isoformat(),
-                "changed_by": r.get("changed_by"),
-                "changed_at": r.get("changed_at"),
-            })
+            applies_to_row = (
+                r_status == status if remove_only else True
+            )
+            has_overlap = (
+                target_start and
+                target_end and
+                r_start <= target_end and
+                target_start <= r_end
+            )
 
-    ranges = new_ranges
-    if not remove_only:
-        ranges.append({
-            "status": status,
-            "start_date": start_date,
-            "end_date": end_date,
-            "changed_by": changed_by,
-            "changed_at": changed_at,
-        })
-    payload["ranges"] = ranges
+            if not applies_to_row or not has_overlap:
+                new_ranges.append(r)
+                continue
 
-    cursor.execute("""
-        UPDATE dbo.deputies
-        SET current_status = ?
-        WHERE full_name = ?
-    """, (
-        _serialize_status_payload(payload),
-        full_name
-    ))
-    removed_count = 0
+            # Preserve any non-overlapping portions of existing ranges.
+            segments = _split_status_range(r_start, r_end, target_start, target_end)
+            if not segments:
+                # Entire range was removed (common for single-day ranges).
+                continue
+
+            for seg_start, seg_end in segments:
+                new_ranges.append({
+                    "status": r_status,
+                    "start_date": seg_start.isoformat(),
+                    "end_date": seg_end.isoformat(),
+                    "changed_by": r.get("changed_by"),
+                    "changed_at": r.get("changed_at"),
+                })
 
-    if status in ["Scheduled Leave", "Unscheduled Leave", "Unavailable", "Training"] and start_date and end_date:
+        ranges = new_ranges
+        if not remove_only:
+            ranges.append({
+                "status": status,
+                "start_date": start_date,
+                "end_date": end_date,
+                "changed_by": changed_by,
+                "changed_at": changed_at,
+            })
+        payload["ranges"] = ranges
 
         cursor.execute("""
-            SELECT assignment_date, courthouse, assignment_type,
-                location_group, location_detail, part, assigned_member
-            FROM dbo.court_assignments
-            WHERE assignment_date BETWEEN ? AND ?
-            AND assigned_member LIKE ?
+            UPDATE dbo.deputies
+            SET current_status = ?
+            WHERE full_name = ?
         """, (
-            start_date,
-            end_date,
-            f"%{full_name}%"
+            _serialize_status_payload(payload),
+            full_name
         ))
+        replace_status_ledger(cursor, full_name, payload)
+        removed_count = 0
+        removed_by_date = {}
 
-        rows = cursor.fetchall()
-
-        for row in rows:
-            assignment_date = row[0]
-            courthouse = row[1]
-            assignment_type = row[2]
-            location_group = row[3]
-            location_detail = row[4]
-            part = row[5]
-            assigned_member = row[6] or ""
-
-            names = [n.strip() for n in assigned_member.split("||") if n.strip()]
-            names = [n for n in names if n != full_name]
-
-            new_value = " || ".join(names) if names else None
+        if status in ["Scheduled Leave", "Unscheduled Leave", "Unavailable", "Training"] and start_date and end_date:
 
+            # Candidate rows come from the member index; remove_member then
+            # re-checks the locked assigned_member text token by token.
             cursor.execute("""
-                UPDATE dbo.court_assignments
-                SET assigned_member = ?
-                WHERE assignment_date = ?
-                AND courthouse = ?
-                AND assignment_type = ?
-                AND ISNULL(location_group,'') = ISNULL(?, '')
-                AND ISNULL(location_detail,'') = ISNULL(?, '')
-                AND ISNULL(part,'') = ISNULL(?, '')
+                SELECT DISTINCT a.id, a.assignment_date, a.assigned_member
+                FROM dbo.court_assignment_members m
+                JOIN dbo.court_assignments a WITH (UPDLOCK) ON a.id = m.assignment_id
+                WHERE m.member_key = ?
+                AND m.assignment_date BETWEEN ? AND ?
             """, (
-                new_value,
-                assignment_date,
-                courthouse,
-                assignment_type,
-                location_group,
-                location_detail,
-                part
+                member_key(full_name),
+                start_date,
+                end_date
             ))
 
-            removed_count += 1
+            updated_rows = []
+            for assignment_id, assignment_date, assigned_member in cursor.fetchall():
+                new_value, removed = remove_member(assigned_member, full_name)
+                if removed:
+                    updated_rows.append((assignment_id, assignment_date, new_value))
 
-    conn.commit()
-    conn.close()
+            executemany(cursor, """
+                UPDATE dbo.court_assignments
+                SET assigned_member = ?
+                WHERE id = ?
+            """, [(new_value, assignment_id) for assignment_id, _, new_value in updated_rows])
+            sync_assignment_members(cursor, updated_rows)
+
+            for assignment_id, assignment_date, new_value in updated_rows:
+                changed_day = normalize_day(assignment_date)
+                removed_by_date[changed_day] = removed_by_date.get(changed_day, 0) + 1
+                _queue_day_event(changed_day, "deputy")
+            _mark_days_changed(cursor, removed_by_date)
+            removed_count = len(updated_rows)
+
+        bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+        conn.commit()
 
     return jsonify({
         "status": "success",
-        "removed_assignments": removed_count
+        "removed_assignments": removed_count,
+        "removed_by_date": removed_by_date
     })
 
 @app.route("/api/update-unavailability", methods=["POST"])
@@ -1065,48 +1002,54 @@ def update_unavailability():
     end_date = data.get("end_date")
     remove_all = bool(data.get("remove_all"))
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    changed_by = _status_change_actor()
-    changed_at = datetime.utcnow().isoformat()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        changed_by = _status_change_actor()
+        changed_at = datetime.utcnow().isoformat()
 
-    cursor.execute("""
-        SELECT current_status
-        FROM dbo.deputies
-        WHERE full_name = ?
-    """, (full_name,))
-    row = cursor.fetchone()
-    current_status = row[0] if row else None
-    payload = _parse_status_payload(current_status)
-
-    rules = payload.get("weekly_unavailable", [])
-
-    if remove_all:
-        payload["weekly_unavailable"] = []
-    else:
-        rules = [r for r in rules if not (r.get("day") == day)]
-        rules.append({
-            "day": day,
-            "end_date": end_date,
-            "changed_by": changed_by,
-            "changed_at": changed_at,
-        })
-        payload["weekly_unavailable"] = rules
+        cursor.execute("""
+            SELECT current_status
+            FROM dbo.deputies
+            WHERE full_name = ?
+        """, (full_name,))
+        row = cursor.fetchone()
+        current_status = row[0] if row else None
+        payload = parse_status_payload(current_status)
 
-    cursor.execute("""
-        UPDATE dbo.deputies
-        SET current_status = ?
-        WHERE full_name = ?
-    """, (
-        _serialize_status_payload(payload),
-        full_name
-    ))
+        rules = payload.get("weekly_unavailable", [])
+
+        if remove_all:
+            payload["weekly_unavailable"] = []
+        else:
+            rules = [r for r in rules if not (r.get("day") == day)]
+            rules.append({
+                "day": day,
+                "end_date": end_date,
+                "changed_by": changed_by,
+                "changed_at": changed_at,
+            })
+            payload["weekly_unavailable"] = rules
 
-    conn.commit()
-    conn.close()
+        cursor.execute("""
+            UPDATE dbo.deputies
+            SET current_status = ?
+            WHERE full_name = ?
+        """, (
+            _serialize_status_payload(payload),
+            full_name
+        ))
+        replace_status_ledger(cursor, full_name, payload)
+
+        bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+        conn.commit()
 
     return jsonify({"status": "success"})
 
+def _deputy_optional_columns(cursor):
+    """Optional dbo.deputies columns present in this database, in statement order."""
+    return [column for column in ("email", "division", "rank") if has_column(cursor, "deputies", column)]
+
+
 @app.route("/api/upsert-deputy", methods=["POST"])
 def upsert_deputy():
     data = request.json or {}
@@ -1124,104 +1067,55 @@ def upsert_deputy():
     if not original_full_name and not email:
         return jsonify({"status": "error", "message": "full_name must be in 'Last name, First name' format"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    if original_full_name:
-        update_queries = [
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, email = ?, division = ?, rank = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, email, data.get("division"), data.get("rank"), canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, email = ?, division = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, email, data.get("division"), canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, division = ?, rank = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, data.get("division"), data.get("rank"), canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, division = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, data.get("division"), canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, email = ?, rank = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, email, data.get("rank"), canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, rank = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, data.get("rank"), canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, email = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, email, canonical_capacity_tag, original_full_name)),
-            ("""
-                UPDATE dbo.deputies
-                SET full_name = ?, capacity_tag = ?
-                WHERE full_name = ?
-            """, (full_name, canonical_capacity_tag, original_full_name)),
-        ]
+        optional_columns = _deputy_optional_columns(cursor)
+        optional_values = {
+            "email": email,
+            "division": data.get("division"),
+            "rank": data.get("rank"),
+        }
 
-        for query, params in update_queries:
-            try:
-                cursor.execute(query, params)
-                break
-            except (pyodbc.ProgrammingError, pyodbc.IntegrityError):
-                continue
-    else:
-        insert_queries = [
-            ("""
-                INSERT INTO dbo.deputies (full_name, email, division, rank, capacity_tag, current_status)
-                VALUES (?, ?, ?, ?, ?, NULL)
-            """, (full_name, email, data.get("division"), data.get("rank"), canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, email, division, capacity_tag, current_status)
-                VALUES (?, ?, ?, ?, NULL)
-            """, (full_name, email, data.get("division"), canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, email, rank, capacity_tag, current_status)
-                VALUES (?, ?, ?, ?, NULL)
-            """, (full_name, email, data.get("rank"), canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, email, capacity_tag, current_status)
-                VALUES (?, ?, ?, NULL)
-            """, (full_name, email, canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, division, rank, capacity_tag, current_status)
-                VALUES (?, ?, ?, ?, NULL)
-            """, (full_name, data.get("division"), data.get("rank"), canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, division, capacity_tag, current_status)
-                VALUES (?, ?, ?, NULL)
-            """, (full_name, data.get("division"), canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, rank, capacity_tag, current_status)
-                VALUES (?, ?, ?, NULL)
-            """, (full_name, data.get("rank"), canonical_capacity_tag)),
-            ("""
-                INSERT INTO dbo.deputies (full_name, capacity_tag, current_status)
-                VALUES (?, ?, NULL)
-            """, (full_name, canonical_capacity_tag)),
-        ]
+        def _write_deputy(include_email):
+            columns = ["full_name"] + [
+                column for column in optional_columns
+                if include_email or column != "email"
+            ] + ["capacity_tag"]
+            values = [full_name] + [optional_values[column] for column in columns[1:-1]] + [canonical_capacity_tag]
+
+            if original_full_name:
+                assignments = ", ".join(f"{column} = ?" for column in columns)
+                cursor.execute(f"""
+                    UPDATE dbo.deputies
+                    SET {assignments}
+                    WHERE full_name = ?
+                """, values + [original_full_name])
+            else:
+                placeholders = ", ".join("?" for _ in columns)
+                cursor.execute(f"""
+                    INSERT INTO dbo.deputies ({", ".join(columns)}, current_status)
+                    VALUES ({placeholders}, NULL)
+                """, values)
 
-        for query, params in insert_queries:
+        try:
             try:
-                cursor.execute(query, params)
-                break
-            except (pyodbc.ProgrammingError, pyodbc.IntegrityError):
-                continue
-
-    conn.commit()
-    conn.close()
+                _write_deputy(include_email=True)
+            except pyodbc.IntegrityError:
+                # An email already used by another deputy is left off rather than
+                # failing the whole save.
+                if "email" not in optional_columns:
+                    raise
+                _write_deputy(include_email=False)
+        except pyodbc.IntegrityError:
+            conn.rollback()
+            return jsonify({"status": "error", "message": f"A deputy named {full_name} already exists"}), 400
+
+        if original_full_name and original_full_name != full_name:
+            rename_status_ledger(cursor, original_full_name, full_name)
+
+        bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+        conn.commit()
 
     return {"status": "success"}
 
@@ -1229,16 +1123,38 @@ def upsert_deputy():
 def delete_deputy():
     data = request.json
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("DELETE FROM dbo.deputies WHERE full_name = ?", (data.get("full_name"),))
+        cursor.execute("DELETE FROM dbo.deputies WHERE full_name = ?", (data.get("full_name"),))
+        replace_status_ledger(cursor, data.get("full_name"), None)
 
-    conn.commit()
-    conn.close()
+        bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+        conn.commit()
 
     return {"status": "success"}
 
+
+@app.route("/api/admin/db-pool")
+def db_pool_stats():
+    return jsonify(pool_stats())
+
+
+@app.route("/api/admin/search-cache")
+def search_cache_stats():
+    return jsonify(_search_cache.stats())
+
+
+@app.route("/api/admin/schema-cache/refresh", methods=["POST"])
+def refresh_schema_cache_route():
+    refresh_schema_cache()
+    # Optional deputies columns may have appeared; retire cached roster bodies.
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        bump_scope_versions(cursor, [DEPUTIES_SCOPE])
+        conn.commit()
+    return jsonify({"status": "success"})
+
 @app.route("/staffing")
 def staffing():
     return render_template("staffing.html")
@@ -1249,101 +1165,165 @@ def executive_summary():
     return render_template("executive_summary.html")
 
 
-@app.route("/api/import-previous-column", methods=["POST"])
-def import_previous_column():
-    data = request.json
-    staffing_date = data["staffing_date"]
-    column_name = data["column_name"]
+@app.route("/api/executive-summary")
+def executive_summary_data():
+    week_of = _parse_date_value(request.args.get("week_of"))
+    if not week_of:
+        return jsonify({"status": "error", "message": "week_of is required (YYYY-MM-DD)"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    week_dates = work_week(week_of)
+    first_day, last_day = week_dates[0], week_dates[-1]
+    for day in week_dates:
+        _ensure_day_materialized(day.isoformat())
 
-    # Find most recent previous date for this column
-    cursor.execute("""
-        SELECT MAX(staffing_date)
-        FROM dbo.staffing_daily
-        WHERE staffing_date < ?
-          AND column_name = ?
-    """, (staffing_date, column_name))
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        optional_columns = _deputy_optional_columns(cursor)
 
-    row = cursor.fetchone()
-    previous_date = row[0]
+        cursor.execute(f"""
+            SELECT full_name, capacity_tag,
+                   {"division" if "division" in optional_columns else "NULL"},
+                   {"rank" if "rank" in optional_columns else "NULL"}
+            FROM dbo.deputies
+            ORDER BY full_name
+        """)
+        deputies = [
+            {"full_name": row[0], "capacity_tag": row[1], "division": row[2], "rank": row[3]}
+            for row in cursor.fetchall()
+        ]
 
-    if not previous_date:
-        conn.close()
-        return {"status": "no_previous_data"}
+        statuses_by_day = statuses_between(cursor, first_day, last_day)
 
-    # Get all rows from that previous date for this column
-    cursor.execute("""
-        SELECT row_number, deputy_name
-        FROM dbo.staffing_daily
-        WHERE staffing_date = ?
-          AND column_name = ?
-    """, (previous_date, column_name))
+        cursor.execute("""
+            SELECT id, assignment_date, courthouse, assignment_type, location_group, location_detail,
+                   part, shift_time, assigned_member, assignment_notes, created_at
+            FROM dbo.court_assignments
+            WHERE assignment_date BETWEEN ? AND ?
+            ORDER BY assignment_date DESC, id ASC
+        """, (first_day, last_day))
+        columns = [column[0] for column in cursor.description]
+        assignments = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        cursor.execute("""
+            SELECT assignment_date, is_high_profile, is_unscheduled
+            FROM dbo.courtroom_meta
+            WHERE assignment_date BETWEEN ? AND ?
+        """, (first_day, last_day))
+        meta_rows = [
+            {"assignment_date": row[0], "is_high_profile": bool(row[1]), "is_unscheduled": bool(row[2])}
+            for row in cursor.fetchall()
+        ]
 
-    previous_rows = cursor.fetchall()
+    assignments_by_day = {day: [] for day in week_dates}
+    for row in assignments:
+        assignments_by_day.setdefault(_parse_date_value(str(row["assignment_date"])[:10]), []).append(row)
 
-    for r in previous_rows:
-        row_number = r[0]
-        deputy_name = r[1]
+    meta_by_day = {day: [] for day in week_dates}
+    for row in meta_rows:
+        meta_by_day.setdefault(_parse_date_value(str(row["assignment_date"])[:10]), []).append(row)
 
-        cursor.execute("""
+    days = []
+    for day in week_dates:
+        day_statuses = statuses_by_day.get(day, {})
+        day_deputies = [
+            dict(deputy, status=day_statuses.get(deputy["full_name"]))
+            for deputy in deputies
+        ]
+        summary = summarize_day(assignments_by_day[day], day_deputies, meta_by_day[day])
+        summary["date"] = day.isoformat()
+        days.append(summary)
+
+    return jsonify({"week_of": first_day.isoformat(), "days": days})
+
+
+@app.route("/api/import-previous-column", methods=["POST"])
+def import_previous_column():
+    data = request.json or {}
+    staffing_date = data.get("staffing_date")
+    copy_entire_day = bool(data.get("copy_entire_day"))
+    column_names = data.get("column_names")
+    if column_names is None and data.get("column_name"):
+        column_names = [data["column_name"]]
+
+    if not _parse_date_value(staffing_date):
+        return jsonify({"status": "error", "message": "staffing_date is required (YYYY-MM-DD)"}), 400
+    if not copy_entire_day:
+        if not isinstance(column_names, list) or not column_names or not all(isinstance(name, str) and name for name in column_names):
+            return jsonify({"status": "error", "message": "column_name, column_names or copy_entire_day is required"}), 400
+
+    if copy_entire_day:
+        # Every column comes from the latest earlier date that has any data.
+        source_query = """
+            SELECT staffing_date, row_number, column_name, deputy_name
+            FROM dbo.staffing_daily
+            WHERE staffing_date = (
+                SELECT MAX(staffing_date)
+                FROM dbo.staffing_daily
+                WHERE staffing_date < ?
+            )
+        """
+        params = [staffing_date]
+    else:
+        # Each column comes from its own most recent earlier date.
+        placeholders = ", ".join("?" for _ in column_names)
+        source_query = f"""
+            SELECT sd.staffing_date, sd.row_number, sd.column_name, sd.deputy_name
+            FROM dbo.staffing_daily sd
+            INNER JOIN (
+                SELECT column_name, MAX(staffing_date) AS previous_date
+                FROM dbo.staffing_daily
+                WHERE staffing_date < ?
+                  AND column_name IN ({placeholders})
+                GROUP BY column_name
+            ) previous
+            ON sd.column_name = previous.column_name
+               AND sd.staffing_date = previous.previous_date
+        """
+        params = [staffing_date, *column_names]
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
             MERGE dbo.staffing_daily AS target
-            USING (SELECT ? AS staffing_date,
-                          ? AS row_number,
-                          ? AS column_name) AS source
-            ON target.staffing_date = source.staffing_date
+            USING ({source_query}) AS source
+            ON target.staffing_date = ?
                AND target.row_number = source.row_number
                AND target.column_name = source.column_name
 
             WHEN MATCHED THEN
-                UPDATE SET deputy_name = ?
+                UPDATE SET deputy_name = source.deputy_name
 
             WHEN NOT MATCHED THEN
                 INSERT (staffing_date, row_number, column_name, deputy_name)
-                VALUES (?, ?, ?, ?);
-        """, (
-            staffing_date,
-            row_number,
-            column_name,
-            deputy_name,
-            staffing_date,
-            row_number,
-            column_name,
-            deputy_name
-        ))
+                VALUES (?, source.row_number, source.column_name, source.deputy_name)
 
-    conn.commit()
-    conn.close()
+            OUTPUT inserted.column_name, source.staffing_date;
+        """, (*params, staffing_date, staffing_date))
+        copied_rows = cursor.fetchall()
+        conn.commit()
 
-    return {"status": "success"}
+    if not copied_rows:
+        return {"status": "no_previous_data"}
+
+    copied_by_column = {}
+    previous_dates = {}
+    for column_name, previous_date in copied_rows:
+        copied_by_column[column_name] = copied_by_column.get(column_name, 0) + 1
+        previous_dates[column_name] = str(previous_date)
+
+    return {
+        "status": "success",
+        "copied": len(copied_rows),
+        "copied_by_column": copied_by_column,
+        "previous_dates": previous_dates,
+    }
 @app.route("/api/get-staffing")
 def get_staffing():
     staffing_date = request.args.get("date")
 
-    conn = get_conn()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    SELECT sd.row_number,
-           sd.column_name,
-           sd.deputy_name
-    FROM dbo.staffing_daily sd
-    INNER JOIN (
-        SELECT row_number,
-               column_name,
-               MAX(staffing_date) AS max_date
-        FROM dbo.staffing_daily
-        WHERE staffing_date <= ?
-        GROUP BY row_number, column_name
-    ) latest
-    ON sd.row_number = latest.row_number
-       AND sd.column_name = latest.column_name
-       AND sd.staffing_date = latest.max_date
-""", (staffing_date,))
-
-    rows = cursor.fetchall()
-    conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        rows = latest_staffing(cursor, staffing_date)
 
     result = []
 
@@ -1368,92 +1348,132 @@ def roster_page():
 def update_staffing():
     data = request.json
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    # Upsert logic
-    cursor.execute("""
-        MERGE dbo.staffing_daily AS target
-        USING (SELECT ? AS staffing_date,
-                      ? AS row_number,
-                      ? AS column_name) AS source
-        ON target.staffing_date = source.staffing_date
-           AND target.row_number = source.row_number
-           AND target.column_name = source.column_name
+        # Upsert logic
+        cursor.execute("""
+            MERGE dbo.staffing_daily AS target
+            USING (SELECT ? AS staffing_date,
+                          ? AS row_number,
+                          ? AS column_name) AS source
+            ON target.staffing_date = source.staffing_date
+               AND target.row_number = source.row_number
+               AND target.column_name = source.column_name
 
-        WHEN MATCHED THEN
-            UPDATE SET deputy_name = ?
+            WHEN MATCHED THEN
+                UPDATE SET deputy_name = ?
 
-        WHEN NOT MATCHED THEN
-            INSERT (staffing_date, row_number, column_name, deputy_name)
-            VALUES (?, ?, ?, ?);
-    """, (
-        data["staffing_date"],
-        data["row_number"],
-        data["column_name"],
-        data["deputy_name"],
-        data["staffing_date"],
-        data["row_number"],
-        data["column_name"],
-        data["deputy_name"]
-    ))
+            WHEN NOT MATCHED THEN
+                INSERT (staffing_date, row_number, column_name, deputy_name)
+                VALUES (?, ?, ?, ?);
+        """, (
+            data["staffing_date"],
+            data["row_number"],
+            data["column_name"],
+            data["deputy_name"],
+            data["staffing_date"],
+            data["row_number"],
+            data["column_name"],
+            data["deputy_name"]
+        ))
+        remember_cell(cursor, data["row_number"], data["column_name"])
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
     return {"status": "success"}
 
 @app.route("/api/deputies-available")
 def get_available_deputies():
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT full_name, capacity_tag
-        FROM dbo.deputies
-        WHERE current_status IS NULL
-        ORDER BY full_name
-    """)
-
-    deputies = [
-        {
-            "full_name": row[0],
-            "capacity_tag": row[1]
-        }
-        for row in cursor.fetchall()
-    ]
+        cursor.execute("""
+            SELECT full_name, capacity_tag
+            FROM dbo.deputies
+            WHERE current_status IS NULL
+            ORDER BY full_name
+        """)
 
-    conn.close()
+        deputies = [
+            {
+                "full_name": row[0],
+                "capacity_tag": row[1]
+            }
+            for row in cursor.fetchall()
+        ]
 
     return jsonify(deputies)
 
-@app.route("/api/update-assignment-notes", methods=["POST"])
-def update_assignment_notes():
-    data = request.json or {}
+# How each kind of edit finds its slot; see _slot_upsert_sql.
+_SLOT_MATCHES = {
+    # Courtrooms, judge names and notes are addressed by room and part.
+    "detail": "target.detail_key = source.detail_key AND target.part_key = source.part_key",
+    # Fixed posts are addressed by post (location_group) and part.
+    "group": "target.group_key = source.group_key AND target.part_key = source.part_key",
+    # Other slots match on either column, and a slot saved under a different
+    # part is still updated when no row has the requested one.
+    "group_or_detail": (
+        "(target.group_key = source.group_key OR target.detail_key = source.detail_key)"
+        " AND target.part_key = source.match_part_key"
+    ),
+}
 
-    conn = get_conn()
-    cursor = conn.cursor()
+_SLOT_MATCH_PART_SQL = """
+    COALESCE((
+        SELECT TOP 1 a.part_key
+        FROM dbo.court_assignments a
+        WHERE a.assignment_date = keyed.assignment_date
+          AND a.courthouse = keyed.courthouse
+          AND a.assignment_type = keyed.assignment_type
+          AND (a.group_key = keyed.group_key OR a.detail_key = keyed.detail_key)
+        ORDER BY CASE WHEN a.part_key = keyed.part_key THEN 0 ELSE 1 END, a.id
+    ), keyed.part_key)
+"""
 
-    cursor.execute("""
-        UPDATE dbo.court_assignments
-        SET assignment_notes = ?
-        WHERE assignment_date = ?
-          AND courthouse = ?
-          AND assignment_type = ?
-          AND ISNULL(location_detail, '') = ISNULL(?, '')
-          AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
-    """, (
-        data.get("assignment_notes"),
-        data.get("assignment_date"),
-        data.get("courthouse"),
-        data.get("assignment_type"),
-        data.get("location_detail"),
-        data.get("part")
-    ))
 
-    if cursor.rowcount == 0:
-        cursor.execute("""
-            INSERT INTO dbo.court_assignments (
+def _slot_upsert_sql(match, update_set, output=""):
+    """
+    One MERGE that updates a slot's rows or inserts the slot, taking the
+    parameters from _slot_upsert_params. ``update_set`` lists the columns the
+    edit overwrites (as ``column = source.column``). HOLDLOCK serializes
+    concurrent saves of the same slot, and the unique slot index
+    (migration 10) backs it up.
+    """
+    match_part = _SLOT_MATCH_PART_SQL if match == "group_or_detail" else "keyed.part_key"
+    return f"""
+        MERGE dbo.court_assignments WITH (HOLDLOCK) AS target
+        USING (
+            SELECT keyed.*, {match_part} AS match_part_key
+            FROM (
+                SELECT
+                    v.*,
+                    LOWER(LTRIM(RTRIM(ISNULL(v.location_group, '')))) AS group_key,
+                    LOWER(LTRIM(RTRIM(ISNULL(v.location_detail, '')))) AS detail_key,
+                    LOWER(LTRIM(RTRIM(ISNULL(v.part, '')))) AS part_key
+                FROM (
+                    SELECT
+                        CAST(? AS DATE) AS assignment_date,
+                        ? AS courthouse,
+                        ? AS assignment_type,
+                        ? AS location_group,
+                        ? AS location_detail,
+                        ? AS part,
+                        ? AS judge_name,
+                        ? AS shift_time,
+                        ? AS assigned_member,
+                        ? AS assignment_notes
+                ) v
+            ) keyed
+        ) AS source
+        ON target.assignment_date = source.assignment_date
+           AND target.courthouse = source.courthouse
+           AND target.assignment_type = source.assignment_type
+           AND {_SLOT_MATCHES[match]}
+        WHEN MATCHED THEN
+            UPDATE SET {update_set}
+        WHEN NOT MATCHED THEN
+            INSERT (
                 assignment_date,
                 courthouse,
                 assignment_type,
@@ -1466,694 +1486,532 @@ def update_assignment_notes():
                 assignment_notes,
                 created_at
             )
-            VALUES (?, ?, ?, NULL, ?, ?, NULL, NULL, NULL, ?, GETDATE())
-        """, (
-            data.get("assignment_date"),
-            data.get("courthouse"),
-            data.get("assignment_type"),
-            data.get("location_detail"),
-            data.get("part"),
-            data.get("assignment_notes")
-        ))
+            VALUES (
+                source.assignment_date,
+                source.courthouse,
+                source.assignment_type,
+                source.location_group,
+                source.location_detail,
+                source.part,
+                source.judge_name,
+                source.shift_time,
+                source.assigned_member,
+                source.assignment_notes,
+                GETDATE()
+            )
+        {output};
+    """
+
+
+def _slot_upsert_params(data, location_group=None, location_detail=None, part=None, judge_name=None,
+                        shift_time=None, assigned_member=None, assignment_notes=None):
+    return (
+        data.get("assignment_date"),
+        data.get("courthouse"),
+        data.get("assignment_type"),
+        location_group,
+        location_detail,
+        part,
+        judge_name,
+        shift_time,
+        assigned_member,
+        assignment_notes,
+    )
+
 
-    conn.commit()
-    conn.close()
+def _apply_assignment_notes_change(cursor, data):
+    cursor.execute(
+        _slot_upsert_sql("detail", "assignment_notes = source.assignment_notes"),
+        _slot_upsert_params(
+            data,
+            location_detail=data.get("location_detail"),
+            part=data.get("part"),
+            assignment_notes=data.get("assignment_notes"),
+        ),
+    )
 
+    _queue_day_event(data.get("assignment_date"), "assignment_notes")
     return {"status": "success"}
 
+
+@app.route("/api/update-assignment-notes", methods=["POST"])
+def update_assignment_notes():
+    data = request.json or {}
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        result = _apply_assignment_notes_change(cursor, data)
+        _mark_days_changed(cursor, [data.get("assignment_date")])
+        conn.commit()
+
+    return result
+
+
 @app.route("/api/get-details-notes", methods=["GET"])
 def get_details_notes():
     date = request.args.get("date")
     if not date:
         return jsonify([])
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT
-            location_detail,
-            assignment_notes
-        FROM dbo.court_assignments
-        WHERE assignment_date = ?
-          AND courthouse = 'Details'
-          AND assignment_type = 'Details Note'
-        ORDER BY location_detail
-    """, (date,))
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        etag = f"day-{normalize_day(date)}-{day_version(cursor, date)}"
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
 
-    rows = [
-        {
-            "location_detail": row[0],
-            "assignment_notes": row[1] or ""
-        }
-        for row in cursor.fetchall()
-    ]
+        cursor.execute("""
+            SELECT
+                location_detail,
+                assignment_notes
+            FROM dbo.court_assignments
+            WHERE assignment_date = ?
+              AND courthouse = 'Details'
+              AND assignment_type = 'Details Note'
+            ORDER BY location_detail
+        """, (date,))
+
+        rows = [
+            {
+                "location_detail": row[0],
+                "assignment_notes": row[1] or ""
+            }
+            for row in cursor.fetchall()
+        ]
+
+    return _tagged_json(rows, etag)
+
+def _apply_judge_name_change(cursor, data):
+    cursor.execute(
+        _slot_upsert_sql("detail", "judge_name = source.judge_name"),
+        _slot_upsert_params(
+            data,
+            location_detail=data.get("location_detail"),
+            part=data.get("part"),
+            judge_name=data.get("judge_name"),
+        ),
+    )
+
+    _queue_day_event(data.get("assignment_date"), "judge_name")
+    return {"status": "success"}
 
-    conn.close()
-    return jsonify(rows)
 
 @app.route("/api/update-judge-name", methods=["POST"])
 def update_judge_name():
     data = request.json or {}
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        result = _apply_judge_name_change(cursor, data)
+        _mark_days_changed(cursor, [data.get("assignment_date")])
+        conn.commit()
 
-    cursor.execute("""
-        UPDATE dbo.court_assignments
-        SET judge_name = ?
-        WHERE assignment_date = ?
-          AND courthouse = ?
-          AND assignment_type = ?
-          AND ISNULL(location_detail, '') = ISNULL(?, '')
-          AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
-    """, (
-        data.get("judge_name"),
-        data.get("assignment_date"),
-        data.get("courthouse"),
-        data.get("assignment_type"),
-        data.get("location_detail"),
-        data.get("part")
-    ))
+    return result
 
-    if cursor.rowcount == 0:
-        cursor.execute("""
-            INSERT INTO dbo.court_assignments (
-                assignment_date,
-                courthouse,
-                assignment_type,
-                location_group,
-                location_detail,
-                part,
-                judge_name,
-                shift_time,
-                assigned_member,
-                assignment_notes,
-                created_at
-            )
-            VALUES (?, ?, ?, NULL, ?, ?, ?, NULL, NULL, NULL, GETDATE())
-        """, (
-            data.get("assignment_date"),
-            data.get("courthouse"),
-            data.get("assignment_type"),
-            data.get("location_detail"),
-            data.get("part"),
-            data.get("judge_name")
-        ))
 
-    conn.commit()
-    conn.close()
+def _apply_shift_time_change(cursor, data):
+    assignment_type = data.get("assignment_type")
+    location_group = (data.get("location_group") or data.get("location_detail") or "").strip()
+    location_detail = (data.get("location_detail") or "").strip()
+    normalized_part = (data.get("part") or "").strip()
+    assigned_member = (data.get("assigned_member") or "").strip() or None
+    shift_time = (data.get("shift_time") or "").strip() or None
+
+    if assignment_type == "Fixed Post":
+        cursor.execute(
+            _slot_upsert_sql("group", "shift_time = source.shift_time"),
+            _slot_upsert_params(data, location_group=location_group, part=normalized_part, shift_time=shift_time),
+        )
+    else:
+        write_assignments(
+            cursor,
+            _slot_upsert_sql("group_or_detail", "shift_time = source.shift_time", MEMBER_OUTPUT_CLAUSE),
+            _slot_upsert_params(
+                data,
+                location_group=location_group or None,
+                location_detail=location_detail,
+                part=normalized_part,
+                shift_time=shift_time,
+                assigned_member=assigned_member,
+            ),
+        )
 
+    _queue_day_event(data.get("assignment_date"), "shift_time")
     return {"status": "success"}
 
 
 @app.route("/api/update-shift-time", methods=["POST"])
 def update_shift_time():
     data = request.json or {}
-    assignment_type = data.get("assignment_type")
-    location_group = (data.get("location_group") or data.get("location_detail") or "").strip()
-    location_detail = (data.get("location_detail") or "").strip()
-    normalized_part = (data.get("part") or "").strip()
-    assigned_member = (data.get("assigned_member") or "").strip() or None
-    shift_time = (data.get("shift_time") or "").strip() or None
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        result = _apply_shift_time_change(cursor, data)
+        _mark_days_changed(cursor, [data.get("assignment_date")])
+        conn.commit()
 
-    if assignment_type == "Fixed Post":
-        cursor.execute("""
+    return result
+
+
+@app.route("/api/deputies")
+def get_deputies():
+    target_date = request.args.get("date")
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        # Statuses are resolved for the requested date; without a valid one
+        # every deputy gets the same undated status, so those share one tag.
+        etag = f"deputies-{scope_version(cursor, DEPUTIES_SCOPE)}-{normalize_day(target_date) or 'undated'}"
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        optional_columns = _deputy_optional_columns(cursor)
+        cursor.execute(f"""
+            SELECT full_name, {"email" if "email" in optional_columns else "NULL"}, capacity_tag, current_status,
+                   {"division" if "division" in optional_columns else "NULL"},
+                   {"rank" if "rank" in optional_columns else "NULL"}
+            FROM dbo.deputies
+            ORDER BY full_name
+        """)
+        rows = cursor.fetchall()
+
+    deputies = []
+    for full_name, email, capacity_tag, status_raw, division, rank in rows:
+        status_meta = _effective_status_meta_for_date(status_raw, target_date)
+        deputies.append({
+            "full_name": full_name,
+            "email": email,
+            "capacity_tag": capacity_tag,
+            "current_status": status_meta.get("status"),
+            "status_raw": status_raw,
+            "status_changed_by": status_meta.get("changed_by"),
+            "status_changed_at": status_meta.get("changed_at"),
+            "division": division,
+            "rank": rank,
+        })
+    return _tagged_json(deputies, etag)
+
+def _apply_deputy_change(cursor, data):
+    assignment_id = data.get("assignment_id")
+    if assignment_id:
+        updated = write_assignments(cursor, f"""
             UPDATE dbo.court_assignments
-            SET shift_time = ?
-            WHERE assignment_date = ?
-              AND courthouse = ?
-              AND assignment_type = ?
-              AND ISNULL(location_group, '') = ISNULL(?, '')
-              AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
+            SET assigned_member = ?
+            {MEMBER_OUTPUT_CLAUSE}
+            WHERE id = ?
+              AND assignment_date = ?
         """, (
-            shift_time,
-            data.get("assignment_date"),
-            data.get("courthouse"),
-            assignment_type,
-            location_group,
-            normalized_part
+            data["assigned_member"],
+            assignment_id,
+            data["assignment_date"]
         ))
+        _queue_day_event(data.get("assignment_date"), "deputy")
+        return {"status": "success", "updated": updated}
+
+    # A KeyError here reports a change without a full slot address.
+    slot = {key: data[key] for key in ("assignment_date", "courthouse", "assignment_type")}
+    if slot["assignment_type"] == "Fixed Post":
+        match = "group"
+        update_set = "assigned_member = source.assigned_member"
+        params = _slot_upsert_params(
+            slot,
+            location_group=data["location_detail"],
+            part=data.get("part"),
+            assigned_member=data["assigned_member"],
+        )
+    elif slot["assignment_type"] == "Courtroom":
+        match = "detail"
+        update_set = "assigned_member = source.assigned_member"
+        params = _slot_upsert_params(
+            slot,
+            location_detail=data["location_detail"],
+            part=data.get("part"),
+            assigned_member=data["assigned_member"],
+        )
     else:
-        cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET shift_time = ?
-            WHERE assignment_date = ?
-              AND courthouse = ?
-              AND assignment_type = ?
-              AND (
-                    LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                    OR LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                  )
-              AND LOWER(LTRIM(RTRIM(ISNULL(part, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-        """, (
-            shift_time,
-            data.get("assignment_date"),
-            data.get("courthouse"),
-            assignment_type,
-            location_group,
-            location_detail,
-            normalized_part
-        ))
+        match = "group_or_detail"
+        update_set = """
+            assigned_member = source.assigned_member,
+            shift_time = COALESCE(NULLIF(target.shift_time, ''), source.shift_time)
+        """
+        params = _slot_upsert_params(
+            slot,
+            location_group=data.get("location_group") or data.get("location_detail"),
+            location_detail=data.get("location_detail"),
+            part=(data.get("part") or "").strip(),
+            shift_time=(data.get("shift_time") or "").strip() or None,
+            assigned_member=data["assigned_member"],
+        )
+    updated = write_assignments(cursor, _slot_upsert_sql(match, update_set, MEMBER_OUTPUT_CLAUSE), params)
 
-        if cursor.rowcount == 0:
-            cursor.execute("""
-                UPDATE dbo.court_assignments
-                SET shift_time = ?
-                WHERE assignment_date = ?
-                  AND courthouse = ?
-                  AND assignment_type = ?
-                  AND (
-                        LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                        OR LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                      )
-            """, (
-                shift_time,
-                data.get("assignment_date"),
-                data.get("courthouse"),
-                assignment_type,
-                location_group,
-                location_detail
-            ))
+    _queue_day_event(data.get("assignment_date"), "deputy")
+    return {"status": "success", "updated": updated}
 
-    if cursor.rowcount == 0:
-        if assignment_type == "Fixed Post":
-            cursor.execute("""
-                INSERT INTO dbo.court_assignments (
-                    assignment_date,
-                    courthouse,
-                    assignment_type,
-                    location_group,
-                    location_detail,
-                    part,
-                    judge_name,
-                    shift_time,
-                    assigned_member,
-                    assignment_notes,
-                    created_at
-                )
-                VALUES (?, ?, ?, ?, NULL, ?, NULL, ?, NULL, NULL, GETDATE())
-            """, (
-                data.get("assignment_date"),
-                data.get("courthouse"),
-                assignment_type,
-                location_group,
-                normalized_part,
-                shift_time
-            ))
-        else:
-            cursor.execute("""
-                INSERT INTO dbo.court_assignments (
-                    assignment_date,
-                    courthouse,
-                    assignment_type,
-                    location_group,
-                    location_detail,
-                    part,
-                    judge_name,
-                    shift_time,
-                    assigned_member,
-                    assignment_notes,
-                    created_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, NULL, GETDATE())
-            """, (
-                data.get("assignment_date"),
-                data.get("courthouse"),
-                assignment_type,
-                location_group if location_group else None,
-                location_detail,
-                normalized_part,
-                shift_time,
-                assigned_member
-            ))
-
-    conn.commit()
-    conn.close()
-
-    return {"status": "success"}
-
-@app.route("/api/deputies")
-def get_deputies():
-    target_date = request.args.get("date")
-    conn = get_conn()
-    cursor = conn.cursor()
-
-    query_options = [
-        ("""
-            SELECT full_name, email, capacity_tag, current_status, division, rank
-            FROM dbo.deputies
-            ORDER BY full_name
-        """, True, True),
-        ("""
-            SELECT full_name, email, capacity_tag, current_status, division
-            FROM dbo.deputies
-            ORDER BY full_name
-        """, True, False),
-        ("""
-            SELECT full_name, email, capacity_tag, current_status, rank
-            FROM dbo.deputies
-            ORDER BY full_name
-        """, False, True),
-        ("""
-            SELECT full_name, email, capacity_tag, current_status
-            FROM dbo.deputies
-            ORDER BY full_name
-        """, False, False),
-    ]
-
-    rows = []
-    has_division = False
-    has_rank = False
-
-    for query, query_has_division, query_has_rank in query_options:
-        try:
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            has_division = query_has_division
-            has_rank = query_has_rank
-            break
-        except pyodbc.ProgrammingError:
-            continue
-
-    deputies = []
-    for row in rows:
-        status_meta = _effective_status_meta_for_date(row[3], target_date)
-        deputy = {
-            "full_name": row[0],
-            "email": row[1],
-            "capacity_tag": row[2],
-            "current_status": status_meta.get("status"),
-            "status_raw": row[3],
-            "status_changed_by": status_meta.get("changed_by"),
-            "status_changed_at": status_meta.get("changed_at"),
-            "division": None,
-            "rank": None,
-        }
-
-        idx = 4
-        if has_division and len(row) > idx:
-            deputy["division"] = row[idx]
-            idx += 1
-
-        if has_rank and len(row) > idx:
-            deputy["rank"] = row[idx]
-
-        deputies.append(deputy)
-
-    conn.close()
-
-    return jsonify(deputies)
 
 @app.route("/api/update-deputy", methods=["POST"])
 def update_deputy():
     data = request.json
 
-    conn = get_conn()
-    cursor = conn.cursor()
-
-    assignment_id = data.get("assignment_id")
-    if assignment_id:
-        cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET assigned_member = ?
-            WHERE id = ?
-              AND assignment_date = ?
-        """, (
-            data["assigned_member"],
-            assignment_id,
-            data["assignment_date"]
-        ))
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        result = _apply_deputy_change(cursor, data)
+        _mark_days_changed(cursor, [data.get("assignment_date")])
         conn.commit()
-        conn.close()
-        return {"status": "success", "updated": cursor.rowcount}
 
-    is_fixed_post = data.get("assignment_type") == "Fixed Post"
-    is_courtroom = data.get("assignment_type") == "Courtroom"
-
-    if is_fixed_post:
-        cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET assigned_member = ?
-            WHERE assignment_date = ?
-              AND courthouse = ?
-              AND assignment_type = ?
-              AND ISNULL(location_group, '') = ISNULL(?, '')
-              AND ISNULL(part, '') = ISNULL(?, '')
-        """, (
-            data["assigned_member"],
-            data["assignment_date"],
-            data["courthouse"],
-            data["assignment_type"],
-            data["location_detail"],
-            data.get("part")
-        ))
-
-        if cursor.rowcount == 0:
-            cursor.execute("""
-                INSERT INTO dbo.court_assignments (
-                    assignment_date,
-                    courthouse,
-                    assignment_type,
-                    location_group,
-                    location_detail,
-                    part,
-                    judge_name,
-                    shift_time,
-                    assigned_member,
-                    assignment_notes,
-                    created_at
-                )
-                VALUES (?, ?, ?, ?, NULL, ?, NULL, NULL, ?, NULL, GETDATE())
-            """, (
-                data["assignment_date"],
-                data["courthouse"],
-                data["assignment_type"],
-                data["location_detail"],
-                data.get("part"),
-                data["assigned_member"]
-            ))
-    elif is_courtroom:
-        cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET assigned_member = ?
-            WHERE assignment_date = ?
-              AND courthouse = ?
-              AND assignment_type = ?
-              AND ISNULL(location_detail, '') = ISNULL(?, '')
-              AND ISNULL(part, '') = ISNULL(?, '')
-        """, (
-            data["assigned_member"],
-            data["assignment_date"],
-            data["courthouse"],
-            data["assignment_type"],
-            data["location_detail"],
-            data.get("part")
-        ))
-
-        if cursor.rowcount == 0:
-            cursor.execute("""
-                INSERT INTO dbo.court_assignments (
-                    assignment_date,
-                    courthouse,
-                    assignment_type,
-                    location_group,
-                    location_detail,
-                    part,
-                    judge_name,
-                    shift_time,
-                    assigned_member,
-                    assignment_notes,
-                    created_at
-                )
-                VALUES (?, ?, ?, NULL, ?, ?, NULL, NULL, ?, NULL, GETDATE())
-            """, (
-                data["assignment_date"],
-                data["courthouse"],
-                data["assignment_type"],
-                data["location_detail"],
-                data.get("part"),
-                data["assigned_member"]
-            ))
-    else:
-        location_group = data.get("location_group") or data.get("location_detail")
-        location_detail = data.get("location_detail")
-        normalized_part = (data.get("part") or "").strip()
-        incoming_shift_time = (data.get("shift_time") or "").strip()
-        cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET assigned_member = ?,
-                shift_time = COALESCE(NULLIF(shift_time, ''), NULLIF(?, ''))
-            WHERE assignment_date = ?
-              AND courthouse = ?
-              AND assignment_type = ?
-              AND (
-                    LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                    OR LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                  )
-              AND LOWER(LTRIM(RTRIM(ISNULL(part, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-        """, (
-            data["assigned_member"],
-            incoming_shift_time,
-            data["assignment_date"],
-            data["courthouse"],
-            data["assignment_type"],
-            location_group,
-            location_detail,
-            normalized_part
-        ))
-
-        if cursor.rowcount == 0:
-            cursor.execute("""
-                UPDATE dbo.court_assignments
-                SET assigned_member = ?,
-                    shift_time = COALESCE(NULLIF(shift_time, ''), NULLIF(?, ''))
-                WHERE assignment_date = ?
-                  AND courthouse = ?
-                  AND assignment_type = ?
-                  AND (
-                        LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                        OR LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
-                      )
-            """, (
-                data["assigned_member"],
-                incoming_shift_time,
-                data["assignment_date"],
-                data["courthouse"],
-                data["assignment_type"],
-                location_group,
-                location_detail
-            ))
-
-        if cursor.rowcount == 0:
-            cursor.execute("""
-                INSERT INTO dbo.court_assignments (
-                    assignment_date,
-                    courthouse,
-                    assignment_type,
-                    location_group,
-                    location_detail,
-                    part,
-                    judge_name,
-                    shift_time,
-                    assigned_member,
-                    assignment_notes,
-                    created_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, NULL, NULLIF(?, ''), ?, NULL, GETDATE())
-            """, (
-                data["assignment_date"],
-                data["courthouse"],
-                data["assignment_type"],
-                location_group,
-                location_detail,
-                normalized_part,
-                incoming_shift_time,
-                data["assigned_member"]
-            ))
-
-    conn.commit()
-    conn.close()
-
-    return {"status": "success", "updated": cursor.rowcount}
+    return result
 
 
 @app.route("/api/get-courtroom-meta")
 def get_courtroom_meta():
     date = request.args.get("date")
-    conn = get_conn()
-    cursor = conn.cursor()
-    _ensure_courtroom_meta_table(cursor)
-
-    cursor.execute("""
-        SELECT assignment_date, courthouse, location_detail, part, start_time, break_time, restart_time, adjourned_time,
-               start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
-               is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at
-        FROM dbo.courtroom_meta
-        WHERE assignment_date = ?
-    """, (date,))
-
-    rows = [
-        {
-            "assignment_date": str(row[0]),
-            "courthouse": row[1],
-            "location_detail": row[2],
-            "part": row[3] or "",
-            "start_time": row[4] or "",
-            "break_time": row[5] or "",
-            "restart_time": row[6] or "",
-            "adjourned_time": row[7] or "",
-            "start_to_break_minutes": row[8],
-            "break_to_restart_minutes": row[9],
-            "restart_to_adjourned_minutes": row[10],
-            "total_time_up_minutes": row[11],
-            "is_down": bool(row[12]),
-            "is_high_profile": bool(row[13]),
-            "is_unscheduled": bool(row[14]),
-            "unscheduled_changed_by": row[15] or "",
-            "unscheduled_changed_at": row[16] or "",
-        }
-        for row in cursor.fetchall()
-    ]
-
-    conn.close()
-    return jsonify(rows)
-
-
-def _parse_assigned_member_names(value):
-    text = (value or "").strip()
-    if not text:
-        return []
-
-    def _is_placeholder_assignment(name):
-        normalized = (name or "").strip().upper()
-        return normalized in {"OPEN", "VACANT", "UNASSIGNED", "TBD"} or normalized.startswith("OPEN-")
-
-    if "||" in text:
-        return [name.strip() for name in re.split(r"\s*\|\|\s*", text) if name.strip() and not _is_placeholder_assignment(name)]
-
-    if "\n" in text:
-        return [name.strip() for name in re.split(r"\n+", text) if name.strip() and not _is_placeholder_assignment(name)]
-
-    if _is_placeholder_assignment(text):
-        return []
-
-    return [text]
-
-
-def _required_deputies_for_courtroom_label(label):
-    normalized = (label or "").strip().upper()
-    if not normalized:
-        return 0
-
-    if normalized in {"CLOSED", "NO DEPUTY", "NO DEPUTIES", "CIVIL - NO DEPUTIES", "ON LEAVE"}:
-        return 0
-
-    if normalized == "NEED 2 DEPUTIES":
-        return 2
-
-    if normalized in {"NEED 1 DEPUTY", "CIVIL - 1 DEPUTY", "JUVENILE", "FAMILY", "OPEN"} or normalized.startswith("OPEN-"):
-        return 1
-
-    return 1
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        etag = f"day-{normalize_day(date)}-{day_version(cursor, date)}"
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
 
+        cursor.execute("""
+            SELECT assignment_date, courthouse, location_detail, part, start_time, break_time, restart_time, adjourned_time,
+                   start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
+                   is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at
+            FROM dbo.courtroom_meta
+            WHERE assignment_date = ?
+        """, (date,))
+
+        rows = [
+            {
+                "assignment_date": str(row[0]),
+                "courthouse": row[1],
+                "location_detail": row[2],
+                "part": row[3] or "",
+                "start_time": row[4] or "",
+                "break_time": row[5] or "",
+                "restart_time": row[6] or "",
+                "adjourned_time": row[7] or "",
+                "start_to_break_minutes": row[8],
+                "break_to_restart_minutes": row[9],
+                "restart_to_adjourned_minutes": row[10],
+                "total_time_up_minutes": row[11],
+                "is_down": bool(row[12]),
+                "is_high_profile": bool(row[13]),
+                "is_unscheduled": bool(row[14]),
+                "unscheduled_changed_by": row[15] or "",
+                "unscheduled_changed_at": row[16] or "",
+            }
+            for row in cursor.fetchall()
+        ]
 
-def _fixed_post_requirement_group(row):
-    courthouse = (row.get("courthouse") or "").strip().lower()
-    post = (row.get("location_group") or "").strip().lower()
-    part = (row.get("part") or "").strip().lower()
+    return _tagged_json(rows, etag)
 
-    # Transportation placeholder row is informational-only; named transportation slots still count.
-    if post == "transportation" and not part and not (row.get("location_detail") or "").strip():
-        return None
 
-    # Mitchell Calvert includes an optional third slot.
-    if courthouse == "mitchell" and post == "calvert" and part == "0800-3":
-        return None
+def _seed_day_from_template(cursor, target_date):
+    """
+    Copy template slots missing from a day into dbo.court_assignments.
 
-    # Mitchell Lockup West second slot and select Juvenile slots are optional and do not count toward VFO.
-    if courthouse == "mitchell" and post in {"lock up west", "lockup west"} and part == "open-2":
-        return None
-    if courthouse == "juvenile" and post == "lobby" and part == "0830-1630-3":
-        return None
-    if courthouse == "juvenile" and post == "lockup":
-        return None
+    Template rows that share a slot (e.g. one overtime post listed once per
+    shift) seed a single row, preferring one with a shift time, since the
+    slot key is unique.
+    """
+    cursor.execute("""
+        INSERT INTO dbo.court_assignments (
+            assignment_date,
+            courthouse,
+            assignment_type,
+            location_group,
+            location_detail,
+            part,
+            judge_name,
+            shift_time,
+            assigned_member,
+            assignment_notes,
+            created_at
+        )
+        SELECT
+            ?,
+            t.courthouse,
+            t.assignment_type,
+            t.location_group,
+            t.location_detail,
+            t.part,
+            t.judge_name,
+            t.shift_time,
+            NULL,
+            t.assignment_notes,
+            GETDATE()
+        FROM (
+            SELECT
+                courthouse,
+                assignment_type,
+                location_group,
+                location_detail,
+                part,
+                judge_name,
+                shift_time,
+                assignment_notes,
+                ROW_NUMBER() OVER (
+                    PARTITION BY
+                        courthouse,
+                        assignment_type,
+                        LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))),
+                        LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))),
+                        LOWER(LTRIM(RTRIM(ISNULL(part, ''))))
+                    ORDER BY
+                        CASE WHEN LTRIM(RTRIM(ISNULL(shift_time, ''))) <> '' THEN 1 ELSE 0 END DESC,
+                        CASE WHEN LTRIM(RTRIM(ISNULL(assignment_notes, ''))) <> '' THEN 1 ELSE 0 END DESC
+                ) AS rn
+            FROM dbo.court_assignment_template
+        ) t
+        WHERE t.rn = 1
+          AND NOT EXISTS (
+            SELECT 1
+            FROM dbo.court_assignments a WITH (UPDLOCK, HOLDLOCK)
+            WHERE a.assignment_date = ?
+            AND a.courthouse = t.courthouse
+            AND a.assignment_type = t.assignment_type
+            AND a.group_key = LOWER(LTRIM(RTRIM(ISNULL(t.location_group, ''))))
+            AND a.detail_key = LOWER(LTRIM(RTRIM(ISNULL(t.location_detail, ''))))
+            AND a.part_key = LOWER(LTRIM(RTRIM(ISNULL(t.part, ''))))
+        )
+    """, (target_date, target_date))
+    return cursor.rowcount
 
-    # Armed requirement rules:
-    # - Jury Room + St. Paul are treated as one combined armed post.
-    if courthouse == "mitchell" and post in {"jury room", "st. paul"}:
-        return f"{courthouse}|jury-stpaul-combined"
 
-    # - Cummings has one armed requirement at 8:00; 8:30 slots are optional for armed coverage.
-    if courthouse == "cummings" and post == "cummings":
-        if part == "0800":
-            return f"{courthouse}|cummings-0800"
-        if part.startswith("0830"):
-            return None
+# Dates this worker has already seen recorded in dbo.materialized_days, most
+# recently used last. Forgetting a date only costs one more materialized_days
+# lookup, so the set is capped rather than kept for the life of the worker.
+MATERIALIZED_DATES_CACHE_SIZE = int(os.getenv("MATERIALIZED_DATES_CACHE_SIZE", "1024"))
+_materialized_dates = OrderedDict()
+_materialized_dates_lock = threading.Lock()
 
-    # Default: each fixed post slot counts independently.
-    return "|".join([
-        courthouse,
-        post,
-        (row.get("location_detail") or "").strip().lower(),
-        part,
-    ])
+# /api/search day views keyed by (date, courthouse), checked against
+# dbo.day_versions on every read.
+_search_cache = DayResultCache()
 
 
-def _assignment_dedupe_key(row):
+def _mark_days_changed(cursor, days):
     """
-    Build a stable dedupe key for assignment rows.
+    Bump dbo.day_versions for every date a write touched. Call it before the
+    write commits so cached day views go stale in every worker together.
+    Returns the ISO dates that were bumped.
     """
-    return (
-        row.get("assignment_date"),
-        (row.get("courthouse") or "").strip(),
-        (row.get("assignment_type") or "").strip(),
-        (row.get("location_group") or "").strip(),
-        (row.get("location_detail") or "").strip(),
-        (row.get("part") or "").strip(),
-    )
+    days = bump_day_versions(cursor, days)
+    _search_cache.invalidate_days(days)
+    return days
 
 
-def _assignment_row_score(row):
+def _queue_day_event(day, kind):
     """
-    Prefer rows with assignment data populated when duplicates exist.
+    Stage a change-feed event for ``day``. Staged events are published by
+    publish_day_change_events once the request has succeeded, so handlers
+    that roll back never announce their changes.
+
+    Boards refetch the day on any change, so an event only names the kinds
+    of change and the board that made them, and a request publishes at most
+    one event per day.
     """
-    has_assigned = 1 if (row.get("assigned_member") or "").strip() else 0
-    has_shift = 1 if (row.get("shift_time") or "").strip() else 0
-    has_notes = 1 if (row.get("assignment_notes") or "").strip() else 0
-    created_at = str(row.get("created_at") or "")
-    return (has_assigned, has_shift, has_notes, created_at)
+    day = normalize_day(day)
+    if not day or not has_request_context():
+        return
+    g.setdefault("day_events", {}).setdefault(day, set()).add(kind)
+
+
+@app.after_request
+def publish_day_change_events(response):
+    kinds_by_day = g.pop("day_events", None)
+    if kinds_by_day and response.status_code < 400:
+        client_id = (request.headers.get("X-Board-Client") or "").strip()[:64]
+        events_by_day = {}
+        for day, kinds in kinds_by_day.items():
+            event = {"kinds": sorted(kinds)}
+            if client_id:
+                event["client"] = client_id
+            events_by_day[day] = [event]
+        try:
+            publish_day_events(events_by_day)
+        except OSError:
+            app.logger.exception("Unable to publish day change events")
+    return response
+
 
+@app.route("/api/days/<day>/events")
+def day_events(day):
+    day = normalize_day(day)
+    if not day:
+        return jsonify({"status": "error", "message": "date must be YYYY-MM-DD"}), 400
 
-def _assignment_row_id_value(row):
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
     try:
-        return int(row.get("id"))
+        offset = int(last_event_id)
     except (TypeError, ValueError):
-        return 2**31 - 1
+        offset = current_offset(day)
 
+    # Sync workers serve one request at a time and report wsgi.multithread
+    # as false; gthread, gevent and the threaded dev server report true.
+    can_hold = bool(request.environ.get("wsgi.multithread"))
+    response = app.response_class(day_event_frames(day, max(offset, 0), can_hold), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
-def _should_replace_deduped_row(existing, incoming):
-    incoming_score = _assignment_row_score(incoming)
-    existing_score = _assignment_row_score(existing)
-    if incoming_score > existing_score:
-        return True
-    if incoming_score < existing_score:
-        return False
-    return _assignment_row_id_value(incoming) < _assignment_row_id_value(existing)
 
-
-def _cleanup_overtime_duplicates(cursor, target_date):
+def _materialize_day(target_date, force=False):
     """
-    Remove duplicate overtime rows for a date, keeping the best canonical row.
+    Seed a day from the template exactly once, recording it in the ledger.
+
+    Returns True when this call seeded the day. The ledger row is inserted
+    before seeding in the same transaction, so a concurrent caller blocks on
+    its key and then sees the day as already materialized.
     """
-    cursor.execute("""
-        ;WITH ranked AS (
-            SELECT
-                id,
-                ROW_NUMBER() OVER (
-                    PARTITION BY
-                        assignment_date,
-                        courthouse,
-                        assignment_type,
-                        ISNULL(location_group, ''),
-                        ISNULL(location_detail, ''),
-                        ISNULL(part, '')
-                    ORDER BY
-                        CASE WHEN LTRIM(RTRIM(ISNULL(assigned_member, ''))) <> '' THEN 1 ELSE 0 END DESC,
-                        CASE WHEN LTRIM(RTRIM(ISNULL(shift_time, ''))) <> '' THEN 1 ELSE 0 END DESC,
-                        id ASC
-                ) AS rn
-            FROM dbo.court_assignments
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if not force:
+            cursor.execute("""
+                SELECT 1
+                FROM dbo.materialized_days
+                WHERE assignment_date = ?
+            """, (target_date,))
+            if cursor.fetchone():
+                return False
+
+            try:
+                cursor.execute("""
+                    INSERT INTO dbo.materialized_days (assignment_date, materialized_at)
+                    VALUES (?, GETDATE())
+                """, (target_date,))
+            except pyodbc.IntegrityError:
+                conn.rollback()
+                return False
+
+        seeded_rows = _seed_day_from_template(cursor, target_date)
+        cursor.execute("""
+            UPDATE dbo.materialized_days
+            SET seeded_rows = ?, materialized_at = GETDATE()
             WHERE assignment_date = ?
-              AND assignment_type = 'Overtime'
-        )
-        DELETE ca
-        FROM dbo.court_assignments ca
-        INNER JOIN ranked r ON r.id = ca.id
-        WHERE r.rn > 1
-    """, (target_date,))
+        """, (seeded_rows, target_date))
+        if force and cursor.rowcount == 0:
+            cursor.execute("""
+                INSERT INTO dbo.materialized_days (assignment_date, materialized_at, seeded_rows)
+                VALUES (?, GETDATE(), ?)
+            """, (target_date, seeded_rows))
+        _mark_days_changed(cursor, [target_date])
+        conn.commit()
+    return True
+
+
+def _ensure_day_materialized(date_value):
+    target_date = _parse_date_value(date_value)
+    if not target_date:
+        return
+    with _materialized_dates_lock:
+        if target_date in _materialized_dates:
+            _materialized_dates.move_to_end(target_date)
+            return
+    _materialize_day(target_date.isoformat())
+    with _materialized_dates_lock:
+        _materialized_dates[target_date] = True
+        while len(_materialized_dates) > MATERIALIZED_DATES_CACHE_SIZE:
+            _materialized_dates.popitem(last=False)
 
 
 @app.route("/api/assignment-totals")
@@ -2161,104 +2019,132 @@ def assignment_totals():
     date = request.args.get("date")
     if not date:
         return jsonify({"vacant": 0, "filled": 0})
+    if not normalize_day(date):
+        return jsonify({"status": "error", "message": "date must be YYYY-MM-DD"}), 400
+    courthouse = (request.args.get("courthouse") or "").strip() or None
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        # Recounts the date only when a write has bumped it since its last count.
+        if refresh_stale_vacancy_counters(cursor, date):
+            conn.commit()
+        vacant, filled = vacancy_totals(cursor, date, courthouse)
 
-    # Reuse the exact same query + dedupe behavior as /api/search
-    query = """
-        SELECT
-            id,
-            assignment_date,
-            courthouse,
-            assignment_type,
-            location_group,
-            location_detail,
-            judge_name,
-            part,
-            shift_time,
-            assigned_member,
-            assignment_notes,
-            created_at
-        FROM dbo.court_assignments
-        WHERE assignment_date = ?
-        ORDER BY assignment_date DESC, id ASC
-    """
-
-    conn = get_conn()
-    cursor = conn.cursor()
-    cursor.execute(query, (date,))
-    columns = [c[0] for c in cursor.description]
-    raw_results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-    conn.close()
-
-    # SAME dedupe as /api/search (prefer row that has assigned_member)
-    deduped = {}
-    for row in raw_results:
-        key = _assignment_dedupe_key(row)
-        existing = deduped.get(key)
-        if not existing:
-            deduped[key] = row
-            continue
-
-        if _should_replace_deduped_row(existing, row):
-            deduped[key] = row
-
-    rows = list(deduped.values())
-
-    # COUNT using staffing requirement rules
-    vacant = filled = 0
-    fixed_post_groups = {}
-
-    for r in rows:
-        typ = (r.get("assignment_type") or "").strip()
-        if typ not in ("Courtroom", "Fixed Post"):
-            continue
-
-        assigned_names = _parse_assigned_member_names(r.get("assigned_member"))
-        assigned_count = len(assigned_names)
-        label = (r.get("assignment_notes") or "").strip().upper()
-
-        if typ == "Fixed Post":
-            group_key = _fixed_post_requirement_group(r)
-            if not group_key:
-                continue
-
-            existing_assigned = fixed_post_groups.get(group_key, 0)
-            if assigned_count > existing_assigned:
-                fixed_post_groups[group_key] = assigned_count
-            continue
+    return jsonify({"vacant": vacant, "filled": filled})
 
-        # Courtroom:
-        required_deputies = _required_deputies_for_courtroom_label(label)
-        if required_deputies == 0:
-            continue
 
-        if label == "OPEN" or label.startswith("OPEN-") or label == "WAITING TO RECEIVE CASE":
-            continue
+@app.route("/api/overtime")
+def overtime():
+    start = _parse_date_value(request.args.get("start"))
+    end = _parse_date_value(request.args.get("end"))
+    if not start or not end:
+        return jsonify({"status": "error", "message": "start and end are required (YYYY-MM-DD)"}), 400
+    if start > end:
+        return jsonify({"status": "error", "message": "start must be on or before end"}), 400
+    by = (request.args.get("by") or "deputy").strip()
+    if by not in OVERTIME_GROUPS:
+        return jsonify({"status": "error", "message": f"by must be one of {', '.join(OVERTIME_GROUPS)}"}), 400
+
+    # Only staffed Overtime and Fixed Post rows can carry overtime hours.
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT assignment_date, assigned_member, {", ".join(OVERTIME_COLUMNS)}
+            FROM dbo.court_assignments
+            WHERE assignment_date BETWEEN ? AND ?
+              AND assignment_type IN ('Overtime', 'Fixed Post')
+              AND ISNULL(assigned_member, '') <> ''
+        """, (start.isoformat(), end.isoformat()))
+        report = overtime_report(assignment_rows(cursor), by)
+
+    for entry in report["days"]:
+        entry["date"] = normalize_day(entry["date"])
+    return jsonify({"start": start.isoformat(), "end": end.isoformat(), "by": by, **report})
+
+
+@app.route("/api/analytics/vacancy")
+def vacancy_analytics():
+    start = _parse_date_value(request.args.get("start"))
+    end = _parse_date_value(request.args.get("end"))
+    if not start or not end:
+        return jsonify({"status": "error", "message": "start and end are required (YYYY-MM-DD)"}), 400
+    if start > end:
+        return jsonify({"status": "error", "message": "start must be on or before end"}), 400
+    group_by = (request.args.get("group_by") or "courthouse").strip()
+    if group_by not in VACANCY_GROUP_COLUMNS:
+        return jsonify({
+            "status": "error",
+            "message": f"group_by must be one of {', '.join(VACANCY_GROUP_COLUMNS)}",
+        }), 400
+
+    # One aggregate over the counters, after recounting any dates written since their last count.
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if refresh_stale_vacancy_counters(cursor, start, end):
+            conn.commit()
+        rows = vacancy_by_day(cursor, start.isoformat(), end.isoformat(), group_by)
 
-        filled += min(assigned_count, required_deputies)
-        vacant += max(required_deputies - assigned_count, 0)
+    days = []
+    totals = {}
+    for assignment_date, group, vacant, filled in rows:
+        days.append({"date": normalize_day(assignment_date), group_by: group, "vacant": vacant, "filled": filled})
+        group_totals = totals.setdefault(group, {group_by: group, "vacant": 0, "filled": 0})
+        group_totals["vacant"] += vacant
+        group_totals["filled"] += filled
 
-    for assigned_count in fixed_post_groups.values():
-        if assigned_count > 0:
-            filled += 1
-        else:
-            vacant += 1
+    return jsonify({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": group_by,
+        "days": days,
+        "totals": [totals[group] for group in sorted(totals)],
+    })
 
-    return jsonify({"vacant": vacant, "filled": filled})
+class ChangeValidationError(ValueError):
+    """Raised when a submitted change is missing the fields needed to apply it."""
+
+
+_COURTROOM_META_MERGE_SQL = """
+    MERGE dbo.courtroom_meta AS target
+    USING (
+        SELECT ? AS assignment_date, ? AS courthouse, ? AS location_detail, ? AS part
+    ) AS source
+    ON target.assignment_date = source.assignment_date
+       AND target.courthouse = source.courthouse
+       AND target.location_detail = source.location_detail
+       AND target.part = source.part
+    WHEN MATCHED THEN
+        UPDATE SET
+            start_time = ?,
+            break_time = ?,
+            restart_time = ?,
+            adjourned_time = ?,
+            start_to_break_minutes = ?,
+            break_to_restart_minutes = ?,
+            restart_to_adjourned_minutes = ?,
+            total_time_up_minutes = ?,
+            is_down = ?,
+            is_high_profile = ?,
+            is_unscheduled = ?,
+            unscheduled_changed_by = ?,
+            unscheduled_changed_at = ?,
+            updated_at = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (assignment_date, courthouse, location_detail, part, start_time, break_time, restart_time, adjourned_time,
+                start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
+                is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE());
+"""
 
-@app.route("/api/update-courtroom-meta", methods=["POST"])
-def update_courtroom_meta():
-    data = request.json or {}
 
+def _courtroom_meta_merge_params(data):
     assignment_date = (data.get("assignment_date") or "").strip()
     courthouse = (data.get("courthouse") or "").strip()
     location_detail = (data.get("location_detail") or "").strip()
 
     if not assignment_date or not courthouse or not location_detail:
-        return jsonify({"status": "error", "message": "assignment_date, courthouse, and location_detail are required"}), 400
+        raise ChangeValidationError("assignment_date, courthouse, and location_detail are required")
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    _ensure_courtroom_meta_table(cursor)
     is_unscheduled = 1 if data.get("is_unscheduled") else 0
     unscheduled_changed_by = None
     unscheduled_changed_at = None
@@ -2273,37 +2159,7 @@ def update_courtroom_meta():
         data.get("adjourned_time"),
     )
 
-    cursor.execute("""
-        MERGE dbo.courtroom_meta AS target
-        USING (
-            SELECT ? AS assignment_date, ? AS courthouse, ? AS location_detail, ? AS part
-        ) AS source
-        ON target.assignment_date = source.assignment_date
-           AND target.courthouse = source.courthouse
-           AND target.location_detail = source.location_detail
-           AND ISNULL(target.part, '') = ISNULL(source.part, '')
-        WHEN MATCHED THEN
-            UPDATE SET
-                start_time = ?,
-                break_time = ?,
-                restart_time = ?,
-                adjourned_time = ?,
-                start_to_break_minutes = ?,
-                break_to_restart_minutes = ?,
-                restart_to_adjourned_minutes = ?,
-                total_time_up_minutes = ?,
-                is_down = ?,
-                is_high_profile = ?,
-                is_unscheduled = ?,
-                unscheduled_changed_by = ?,
-                unscheduled_changed_at = ?,
-                updated_at = GETDATE()
-        WHEN NOT MATCHED THEN
-            INSERT (assignment_date, courthouse, location_detail, part, start_time, break_time, restart_time, adjourned_time,
-                    start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
-                    is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE());
-    """, (
+    return (
         assignment_date,
         courthouse,
         location_detail,
@@ -2338,17 +2194,38 @@ def update_courtroom_meta():
         is_unscheduled,
         unscheduled_changed_by,
         unscheduled_changed_at,
-    ))
+    )
+
 
-    conn.commit()
-    conn.close()
+def _queue_courtroom_meta_event(data):
+    _queue_day_event(data.get("assignment_date"), "courtroom_meta")
+
+
+def _apply_courtroom_meta_change(cursor, data):
+    cursor.execute(_COURTROOM_META_MERGE_SQL, _courtroom_meta_merge_params(data))
+    _queue_courtroom_meta_event(data)
     return {"status": "success"}
 
 
-@app.route("/api/update-courtroom-location", methods=["POST"])
-def update_courtroom_location():
+@app.route("/api/update-courtroom-meta", methods=["POST"])
+def update_courtroom_meta():
     data = request.json or {}
 
+    try:
+        params = _courtroom_meta_merge_params(data)
+    except ChangeValidationError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 400
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(_COURTROOM_META_MERGE_SQL, params)
+        _queue_courtroom_meta_event(data)
+        _mark_days_changed(cursor, [data.get("assignment_date")])
+        conn.commit()
+    return {"status": "success"}
+
+
+def _apply_courtroom_location_change(cursor, data):
     assignment_date = (data.get("assignment_date") or "").strip()
     courthouse = (data.get("courthouse") or "").strip()
     old_location_detail = (data.get("old_location_detail") or "").strip()
@@ -2357,169 +2234,311 @@ def update_courtroom_location():
     new_part = (data.get("new_part") or "").strip()
 
     if not assignment_date or not courthouse or not old_location_detail:
-        return jsonify({"status": "error", "message": "assignment_date, courthouse, and old_location_detail are required"}), 400
+        raise ChangeValidationError("assignment_date, courthouse, and old_location_detail are required")
     if not new_location_detail:
-        return jsonify({"status": "error", "message": "new_location_detail is required"}), 400
+        raise ChangeValidationError("new_location_detail is required")
 
     if old_location_detail == new_location_detail and old_part.lower() == new_part.lower():
-        return jsonify({"status": "success"})
+        return {"status": "success"}
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    _ensure_courtroom_meta_table(cursor)
-    cursor.execute("SET LOCK_TIMEOUT 5000;")
+    # Slots are unique, so moving onto a room/part that is already on the
+    # board keeps only the better row of each pair, as the board showed it.
+    cursor.execute(f"""
+        ;WITH ranked AS (
+            SELECT ca.id, {slot_rank_sql("ca", ("group_key",))} AS slot_rank
+            FROM dbo.court_assignments ca
+            WHERE ca.assignment_date = ?
+              AND ca.courthouse = ?
+              AND ca.assignment_type = 'Courtroom'
+              AND (
+                    (ca.detail_key = LOWER(LTRIM(RTRIM(?))) AND ca.part_key = LOWER(LTRIM(RTRIM(?))))
+                    OR (ca.detail_key = LOWER(LTRIM(RTRIM(?))) AND ca.part_key = LOWER(LTRIM(RTRIM(?))))
+                  )
+        )
+        DELETE target
+        FROM dbo.court_assignments target
+        INNER JOIN ranked r ON r.id = target.id
+        WHERE r.slot_rank > 1
+    """, (
+        assignment_date,
+        courthouse,
+        old_location_detail,
+        old_part,
+        new_location_detail,
+        new_part
+    ))
+
+    cursor.execute("""
+        UPDATE dbo.court_assignments
+        SET location_detail = ?,
+            part = ?
+        WHERE assignment_date = ?
+          AND courthouse = ?
+          AND assignment_type = 'Courtroom'
+          AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+          AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+    """, (
+        new_location_detail,
+        new_part,
+        assignment_date,
+        courthouse,
+        old_location_detail,
+        old_part
+    ))
+
+    cursor.execute("""
+        SELECT start_time, break_time, restart_time, adjourned_time,
+               start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
+               is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at
+        FROM dbo.courtroom_meta
+        WHERE assignment_date = ?
+          AND courthouse = ?
+          AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+          AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+    """, (
+        assignment_date,
+        courthouse,
+        old_location_detail,
+        old_part
+    ))
+    source_meta = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT start_time, break_time, restart_time, adjourned_time,
+               start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
+               is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at
+        FROM dbo.courtroom_meta
+        WHERE assignment_date = ?
+          AND courthouse = ?
+          AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+          AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+    """, (
+        assignment_date,
+        courthouse,
+        new_location_detail,
+        new_part
+    ))
+    target_meta = cursor.fetchone()
+
+    if source_meta and target_meta:
+        merged_start = source_meta[0] or target_meta[0]
+        merged_break = source_meta[1] or target_meta[1]
+        merged_restart = source_meta[2] or target_meta[2]
+        merged_adjourned = source_meta[3] or target_meta[3]
+        merged_duration_minutes = _calculate_courtroom_duration_minutes(
+            merged_start,
+            merged_break,
+            merged_restart,
+            merged_adjourned,
+        )
+        merged_is_down = 1 if (bool(source_meta[8]) or bool(target_meta[8])) else 0
+        merged_is_high_profile = 1 if (bool(source_meta[9]) or bool(target_meta[9])) else 0
+        merged_is_unscheduled = 1 if (bool(source_meta[10]) or bool(target_meta[10])) else 0
+        source_audit_at = (source_meta[12] or "").strip() if source_meta[12] else ""
+        target_audit_at = (target_meta[12] or "").strip() if target_meta[12] else ""
+        merged_unscheduled_changed_by = (source_meta[11] or target_meta[11]) if merged_is_unscheduled else None
+        merged_unscheduled_changed_at = (source_audit_at or target_audit_at) if merged_is_unscheduled else None
 
-    try:
         cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET location_detail = ?,
-                part = ?
+            UPDATE dbo.courtroom_meta
+            SET start_time = ?,
+                break_time = ?,
+                restart_time = ?,
+                adjourned_time = ?,
+                start_to_break_minutes = ?,
+                break_to_restart_minutes = ?,
+                restart_to_adjourned_minutes = ?,
+                total_time_up_minutes = ?,
+                is_down = ?,
+                is_high_profile = ?,
+                is_unscheduled = ?,
+                unscheduled_changed_by = ?,
+                unscheduled_changed_at = ?,
+                updated_at = GETDATE()
             WHERE assignment_date = ?
               AND courthouse = ?
-              AND assignment_type = 'Courtroom'
-              AND ISNULL(location_detail, '') = ISNULL(?, '')
-              AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
+              AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+              AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
         """, (
-            new_location_detail,
-            new_part,
+            merged_start,
+            merged_break,
+            merged_restart,
+            merged_adjourned,
+            merged_duration_minutes["start_to_break_minutes"],
+            merged_duration_minutes["break_to_restart_minutes"],
+            merged_duration_minutes["restart_to_adjourned_minutes"],
+            merged_duration_minutes["total_time_up_minutes"],
+            merged_is_down,
+            merged_is_high_profile,
+            merged_is_unscheduled,
+            merged_unscheduled_changed_by,
+            merged_unscheduled_changed_at,
             assignment_date,
             courthouse,
-            old_location_detail,
-            old_part
+            new_location_detail,
+            new_part
         ))
 
         cursor.execute("""
-            SELECT start_time, break_time, restart_time, adjourned_time,
-                   start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
-                   is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at
-            FROM dbo.courtroom_meta
+            DELETE FROM dbo.courtroom_meta
             WHERE assignment_date = ?
               AND courthouse = ?
-              AND ISNULL(location_detail, '') = ISNULL(?, '')
-              AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
+              AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+              AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
         """, (
             assignment_date,
             courthouse,
             old_location_detail,
             old_part
         ))
-        source_meta = cursor.fetchone()
-
+    elif source_meta:
         cursor.execute("""
-            SELECT start_time, break_time, restart_time, adjourned_time,
-                   start_to_break_minutes, break_to_restart_minutes, restart_to_adjourned_minutes, total_time_up_minutes,
-                   is_down, is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at
-            FROM dbo.courtroom_meta
+            UPDATE dbo.courtroom_meta
+            SET location_detail = ?,
+                part = ?,
+                updated_at = GETDATE()
             WHERE assignment_date = ?
               AND courthouse = ?
-              AND ISNULL(location_detail, '') = ISNULL(?, '')
-              AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
+              AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+              AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
         """, (
+            new_location_detail,
+            new_part,
             assignment_date,
             courthouse,
-            new_location_detail,
-            new_part
+            old_location_detail,
+            old_part
         ))
-        target_meta = cursor.fetchone()
-
-        if source_meta and target_meta:
-            merged_start = source_meta[0] or target_meta[0]
-            merged_break = source_meta[1] or target_meta[1]
-            merged_restart = source_meta[2] or target_meta[2]
-            merged_adjourned = source_meta[3] or target_meta[3]
-            merged_duration_minutes = _calculate_courtroom_duration_minutes(
-                merged_start,
-                merged_break,
-                merged_restart,
-                merged_adjourned,
-            )
-            merged_is_down = 1 if (bool(source_meta[8]) or bool(target_meta[8])) else 0
-            merged_is_high_profile = 1 if (bool(source_meta[9]) or bool(target_meta[9])) else 0
-            merged_is_unscheduled = 1 if (bool(source_meta[10]) or bool(target_meta[10])) else 0
-            source_audit_at = (source_meta[12] or "").strip() if source_meta[12] else ""
-            target_audit_at = (target_meta[12] or "").strip() if target_meta[12] else ""
-            merged_unscheduled_changed_by = (source_meta[11] or target_meta[11]) if merged_is_unscheduled else None
-            merged_unscheduled_changed_at = (source_audit_at or target_audit_at) if merged_is_unscheduled else None
 
-            cursor.execute("""
-                UPDATE dbo.courtroom_meta
-                SET start_time = ?,
-                    break_time = ?,
-                    restart_time = ?,
-                    adjourned_time = ?,
-                    start_to_break_minutes = ?,
-                    break_to_restart_minutes = ?,
-                    restart_to_adjourned_minutes = ?,
-                    total_time_up_minutes = ?,
-                    is_down = ?,
-                    is_high_profile = ?,
-                    is_unscheduled = ?,
-                    unscheduled_changed_by = ?,
-                    unscheduled_changed_at = ?,
-                    updated_at = GETDATE()
-                WHERE assignment_date = ?
-                  AND courthouse = ?
-                  AND ISNULL(location_detail, '') = ISNULL(?, '')
-                  AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
-            """, (
-                merged_start,
-                merged_break,
-                merged_restart,
-                merged_adjourned,
-                merged_duration_minutes["start_to_break_minutes"],
-                merged_duration_minutes["break_to_restart_minutes"],
-                merged_duration_minutes["restart_to_adjourned_minutes"],
-                merged_duration_minutes["total_time_up_minutes"],
-                merged_is_down,
-                merged_is_high_profile,
-                merged_is_unscheduled,
-                merged_unscheduled_changed_by,
-                merged_unscheduled_changed_at,
-                assignment_date,
-                courthouse,
-                new_location_detail,
-                new_part
-            ))
+    _queue_day_event(assignment_date, "courtroom_location")
+    return {"status": "success"}
 
-            cursor.execute("""
-                DELETE FROM dbo.courtroom_meta
-                WHERE assignment_date = ?
-                  AND courthouse = ?
-                  AND ISNULL(location_detail, '') = ISNULL(?, '')
-                  AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
-            """, (
-                assignment_date,
-                courthouse,
-                old_location_detail,
-                old_part
-            ))
-        elif source_meta:
-            cursor.execute("""
-                UPDATE dbo.courtroom_meta
-                SET location_detail = ?,
-                    part = ?,
-                    updated_at = GETDATE()
-                WHERE assignment_date = ?
-                  AND courthouse = ?
-                  AND ISNULL(location_detail, '') = ISNULL(?, '')
-                  AND LOWER(ISNULL(part, '')) = LOWER(ISNULL(?, ''))
-            """, (
-                new_location_detail,
-                new_part,
-                assignment_date,
-                courthouse,
-                old_location_detail,
-                old_part
-            ))
 
-        conn.commit()
-    except Exception as exc:
-        conn.rollback()
-        conn.close()
-        return jsonify({"status": "error", "message": f"Unable to update courtroom location: {exc}"}), 500
+@app.route("/api/update-courtroom-location", methods=["POST"])
+def update_courtroom_location():
+    data = request.json or {}
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SET LOCK_TIMEOUT 5000;")
+
+        try:
+            _apply_courtroom_location_change(cursor, data)
+            _mark_days_changed(cursor, [data.get("assignment_date")])
+            conn.commit()
+        except ChangeValidationError as exc:
+            conn.rollback()
+            return jsonify({"status": "error", "message": str(exc)}), 400
+        except Exception as exc:
+            conn.rollback()
+            return jsonify({"status": "error", "message": f"Unable to update courtroom location: {exc}"}), 500
+
+    return jsonify({"status": "success"})
+
+
+# Applied in this order, matching how the search page used to sequence its saves:
+# room/part moves first so later edits land on the new slot, shift times last.
+_SAVE_DAY_CHANGE_KINDS = (
+    ("courtroom_location", _apply_courtroom_location_change),
+    ("courtroom_meta", _apply_courtroom_meta_change),
+    ("deputy", _apply_deputy_change),
+    ("assignment_notes", _apply_assignment_notes_change),
+    ("judge_name", _apply_judge_name_change),
+    ("shift_time", _apply_shift_time_change),
+)
+
+
+def _apply_day_changes(cursor, changes, results):
+    """
+    Apply staged changes in order, appending one result per item.
+
+    Courtroom meta upserts and deputy updates addressed by assignment id are
+    sent as parameter arrays; everything else reuses the single-edit helpers.
+    """
+    for kind, apply_change in _SAVE_DAY_CHANGE_KINDS:
+        items = changes.get(kind) or []
+        if not isinstance(items, list):
+            raise ChangeValidationError(f"changes.{kind} must be a list")
+
+        if kind == "courtroom_meta":
+            batch = []
+            batch_results = []
+            for index, item in enumerate(items):
+                results.append({"kind": kind, "index": index, "status": "pending"})
+                batch.append(_courtroom_meta_merge_params(item or {}))
+                batch_results.append(results[-1])
+            # Items stay pending until the batch has run, so a failing batch
+            # reports all of them as the failed items.
+            executemany(cursor, _COURTROOM_META_MERGE_SQL, batch)
+            for item, result in zip(items, batch_results):
+                _queue_courtroom_meta_event(item)
+                result["status"] = "success"
+            continue
+
+        if kind == "deputy":
+            by_id = [(index, item) for index, item in enumerate(items) if (item or {}).get("assignment_id")]
+            if by_id:
+                batch_results = [{"kind": kind, "index": index, "status": "pending"} for index, _ in by_id]
+                results.extend(batch_results)
+                executemany(cursor, """
+                    UPDATE dbo.court_assignments
+                    SET assigned_member = ?
+                    WHERE id = ?
+                      AND assignment_date = ?
+                """, [
+                    (item.get("assigned_member"), item["assignment_id"], item.get("assignment_date"))
+                    for _, item in by_id
+                ])
+                refresh_assignment_members(cursor, [item["assignment_id"] for _, item in by_id])
+                for (_, item), result in zip(by_id, batch_results):
+                    _queue_day_event(item.get("assignment_date"), "deputy")
+                    result["status"] = "success"
+            items = [(index, item) for index, item in enumerate(items) if not (item or {}).get("assignment_id")]
+        else:
+            items = list(enumerate(items))
+
+        for index, item in items:
+            results.append({"kind": kind, "index": index, "status": "pending"})
+            results[-1].update(apply_change(cursor, item or {}))
+
+
+@app.route("/api/save-day", methods=["POST"])
+def save_day():
+    data = request.json or {}
+    changes = data.get("changes") or {}
+    if not isinstance(changes, dict):
+        return jsonify({"status": "error", "message": "changes must be an object keyed by change type"}), 400
+
+    results = []
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SET LOCK_TIMEOUT 5000;")
 
-    conn.close()
-    return jsonify({"status": "success"})
+        try:
+            _apply_day_changes(cursor, changes, results)
+            _mark_days_changed(cursor, [
+                item.get("assignment_date")
+                for items in changes.values() if isinstance(items, list)
+                for item in items if isinstance(item, dict)
+            ])
+            conn.commit()
+        except Exception as exc:
+            conn.rollback()
+            # Whatever was still pending failed: one item, or a whole batch.
+            for result in results:
+                if result["status"] == "pending":
+                    result["status"] = "error"
+                    result["message"] = str(exc)
+                else:
+                    result["status"] = "rolled_back"
+            status_code = 400 if isinstance(exc, (ChangeValidationError, KeyError)) else 500
+            return jsonify({
+                "status": "error",
+                "message": f"Unable to save changes: {exc}",
+                "results": results,
+            }), status_code
+
+    return jsonify({"status": "success", "saved": len(results), "results": results})
 
 
 @app.route("/api/clear-daily-assignments", methods=["POST"])
@@ -2530,35 +2549,42 @@ def clear_daily_assignments():
     if not assignment_date:
         return jsonify({"status": "error", "message": "assignment_date is required"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    _ensure_courtroom_meta_table(cursor)
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        UPDATE dbo.court_assignments
-        SET assigned_member = NULL
-        WHERE assignment_date = ?
-    """, (assignment_date,))
+        cursor.execute("""
+            UPDATE dbo.court_assignments
+            SET assigned_member = NULL
+            WHERE assignment_date = ?
+        """, (assignment_date,))
 
-    cursor.execute("""
-        UPDATE dbo.court_assignments
-        SET assignment_notes = NULL
-        WHERE assignment_date = ?
-          AND assignment_type = 'Courtroom'
-    """, (assignment_date,))
+        cursor.execute("""
+            DELETE FROM dbo.court_assignment_members
+            WHERE assignment_id IN (
+                SELECT id FROM dbo.court_assignments WHERE assignment_date = ?
+            )
+        """, (assignment_date,))
 
-    cursor.execute("""
-        UPDATE dbo.courtroom_meta
-        SET is_high_profile = 0,
-            is_unscheduled = 0,
-            unscheduled_changed_by = NULL,
-            unscheduled_changed_at = NULL,
-            updated_at = GETDATE()
-        WHERE assignment_date = ?
-    """, (assignment_date,))
+        cursor.execute("""
+            UPDATE dbo.court_assignments
+            SET assignment_notes = NULL
+            WHERE assignment_date = ?
+              AND assignment_type = 'Courtroom'
+        """, (assignment_date,))
+
+        cursor.execute("""
+            UPDATE dbo.courtroom_meta
+            SET is_high_profile = 0,
+                is_unscheduled = 0,
+                unscheduled_changed_by = NULL,
+                unscheduled_changed_at = NULL,
+                updated_at = GETDATE()
+            WHERE assignment_date = ?
+        """, (assignment_date,))
 
-    conn.commit()
-    conn.close()
+        _mark_days_changed(cursor, [assignment_date])
+        _queue_day_event(assignment_date, "reload")
+        conn.commit()
 
     return jsonify({"status": "success"})
 
@@ -2576,131 +2602,176 @@ def clear_section_assignments():
     if section_type not in {"fixed_post", "courtroom"}:
         return jsonify({"status": "error", "message": "section_type must be fixed_post or courtroom"}), 400
 
-    conn = get_conn()
-    cursor = conn.cursor()
-    if section_type == "courtroom":
-        _ensure_courtroom_meta_table(cursor)
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    if section_type == "fixed_post":
-        if not courthouse:
-            return jsonify({"status": "error", "message": "courthouse is required for fixed_post clear"}), 400
+        if section_type == "fixed_post":
+            if not courthouse:
+                return jsonify({"status": "error", "message": "courthouse is required for fixed_post clear"}), 400
 
-        cursor.execute("""
-            UPDATE dbo.court_assignments
-            SET assigned_member = NULL
-            WHERE assignment_date = ?
-              AND assignment_type = 'Fixed Post'
-              AND courthouse = ?
-        """, (assignment_date, courthouse))
+            cursor.execute("""
+                UPDATE dbo.court_assignments
+                SET assigned_member = NULL
+                WHERE assignment_date = ?
+                  AND assignment_type = 'Fixed Post'
+                  AND courthouse = ?
+            """, (assignment_date, courthouse))
+
+            cursor.execute("""
+                DELETE FROM dbo.court_assignment_members
+                WHERE assignment_id IN (
+                    SELECT id
+                    FROM dbo.court_assignments
+                    WHERE assignment_date = ?
+                      AND assignment_type = 'Fixed Post'
+                      AND courthouse = ?
+                )
+            """, (assignment_date, courthouse))
 
-    if section_type == "courtroom":
-        params = [assignment_date]
-        courthouse_clause = ""
-        if courthouse:
-            courthouse_clause = " AND courthouse = ?"
-            params.append(courthouse)
+        if section_type == "courtroom":
+            params = [assignment_date]
+            courthouse_clause = ""
+            if courthouse:
+                courthouse_clause = " AND courthouse = ?"
+                params.append(courthouse)
 
-        cursor.execute(f"""
-            UPDATE dbo.court_assignments
-            SET assigned_member = NULL,
-                assignment_notes = NULL
-            WHERE assignment_date = ?
-              AND assignment_type = 'Courtroom'{courthouse_clause}
-        """, params)
+            cursor.execute(f"""
+                UPDATE dbo.court_assignments
+                SET assigned_member = NULL,
+                    assignment_notes = NULL
+                WHERE assignment_date = ?
+                  AND assignment_type = 'Courtroom'{courthouse_clause}
+            """, params)
+
+            cursor.execute(f"""
+                DELETE FROM dbo.court_assignment_members
+                WHERE assignment_id IN (
+                    SELECT id
+                    FROM dbo.court_assignments
+                    WHERE assignment_date = ?
+                      AND assignment_type = 'Courtroom'{courthouse_clause}
+                )
+            """, params)
 
-        cursor.execute(f"""
-            UPDATE dbo.courtroom_meta
-            SET is_high_profile = 0,
-                is_unscheduled = 0,
-                unscheduled_changed_by = NULL,
-                unscheduled_changed_at = NULL,
-                updated_at = GETDATE()
-            WHERE assignment_date = ?{courthouse_clause}
-        """, params)
+            cursor.execute(f"""
+                UPDATE dbo.courtroom_meta
+                SET is_high_profile = 0,
+                    is_unscheduled = 0,
+                    unscheduled_changed_by = NULL,
+                    unscheduled_changed_at = NULL,
+                    updated_at = GETDATE()
+                WHERE assignment_date = ?{courthouse_clause}
+            """, params)
 
-    conn.commit()
-    conn.close()
+        _mark_days_changed(cursor, [assignment_date])
+        _queue_day_event(assignment_date, "reload")
+        conn.commit()
 
     return jsonify({"status": "success"})
 
 
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "500"))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "2000"))
+
+
 @app.route("/api/search")
 def search():
+    """
+    Assignment search.
+
+    With ``date`` the whole day is returned (and cached). Callers that send
+    a numeric ``limit`` or a ``cursor`` get pages on (assignment_date DESC,
+    id): ``limit`` rows per page, optionally bounded by
+    ``start_date``/``end_date``. The cursor for the next page is returned in
+    the X-Next-Cursor header and sent back as ``cursor``. Without either, or
+    with ``limit=all``, every match is streamed, as before paging existed.
+    """
+    if "dedupe" in request.args:
+        # Slots are unique in the table (migration 10), so every result is
+        # already deduped; old callers still send the flag.
+        app.logger.info("Ignoring the obsolete dedupe parameter on /api/search")
+
     name = request.args.get("name")
     date = request.args.get("date")
     if date:
-        conn_for_seed = get_conn()
-        cursor = conn_for_seed.cursor()
-        cursor.execute("""
-            INSERT INTO dbo.court_assignments (
-                assignment_date,
-                courthouse,
-                assignment_type,
-                location_group,
-                location_detail,
-                part,
-                judge_name,
-                shift_time,
-                assigned_member,
-                assignment_notes,
-                created_at
-            )
-            SELECT
-                ?,
-                t.courthouse,
-                t.assignment_type,
-                t.location_group,
-                t.location_detail,
-                t.part,
-                t.judge_name,
-                t.shift_time,
-                NULL,
-                t.assignment_notes,
-                GETDATE()
-            FROM (
-                SELECT
-                    courthouse,
-                    assignment_type,
-                    location_group,
-                    location_detail,
-                    part,
-                    judge_name,
-                    shift_time,
-                    assignment_notes,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY
-                            courthouse,
-                            assignment_type,
-                            ISNULL(location_group, ''),
-                            ISNULL(location_detail, ''),
-                            ISNULL(part, ''),
-                            ISNULL(shift_time, '')
-                        ORDER BY (SELECT 1)
-                    ) AS rn
-                FROM dbo.court_assignment_template
-            ) t
-            WHERE t.rn = 1
-              AND NOT EXISTS (
+        _ensure_day_materialized(date)
+
+    courthouse = request.args.get("courthouse")
+
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    limit_param = (request.args.get("limit") or "").strip().lower()
+    export = not date and not request.args.get("cursor") and limit_param in ("", "all")
+
+    paged = not date and not export
+    limit = None
+    page_after = None
+    if paged:
+        try:
+            limit = int(limit_param or SEARCH_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"status": "error", "message": "limit must be a number"}), 400
+        limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+
+        cursor_token = request.args.get("cursor")
+        if cursor_token:
+            page_after = decode_search_cursor(cursor_token)
+            if not page_after:
+                return jsonify({"status": "error", "message": "cursor is invalid"}), 400
+
+    for label, value in (("start_date", start_date), ("end_date", end_date)):
+        if value and not normalize_day(value):
+            return jsonify({"status": "error", "message": f"{label} must be YYYY-MM-DD"}), 400
+
+    filters = ""
+    params = []
+
+    if name:
+        # Every word of the query must start a word of the same deputy's
+        # name ("jane", "doe j" and "doe, jane" all find "Doe, Jane"),
+        # matched through the indexed token table rather than a substring
+        # scan of assigned_member.
+        prefixes = member_search_prefixes(name)
+        filters += """
+            AND EXISTS (
                 SELECT 1
-                FROM dbo.court_assignments a WITH (UPDLOCK, HOLDLOCK)
-                WHERE a.assignment_date = ?
-                AND a.courthouse = t.courthouse
-                AND a.assignment_type = t.assignment_type
-                AND ISNULL(a.location_group,'') = ISNULL(t.location_group,'')
-                AND ISNULL(a.location_detail,'') = ISNULL(t.location_detail,'')
-                AND ISNULL(a.part,'') = ISNULL(t.part,'')
-                AND ISNULL(a.shift_time,'') = ISNULL(t.shift_time,'')
+                FROM dbo.court_assignment_members am
+                WHERE am.assignment_id = a.id
+        """ + "".join("""
+                  AND EXISTS (
+                      SELECT 1
+                      FROM dbo.court_assignment_member_tokens mt
+                      WHERE mt.assignment_id = am.assignment_id
+                        AND mt.ordinal = am.ordinal
+                        AND mt.token_key LIKE ?
+                  )
+        """ for _ in prefixes) + """
             )
-        """, (date, date))
-        _cleanup_overtime_duplicates(cursor, date)
-        conn_for_seed.commit()
-        conn_for_seed.close()
-    courthouse = request.args.get("courthouse")
-    dedupe_param = (request.args.get("dedupe") or "true").strip().lower()
-    should_dedupe = dedupe_param not in {"0", "false", "no", "off"}
+        """
+        params.extend(prefixes)
 
-    query = """
-        SELECT
+    if date:
+        filters += " AND a.assignment_date = ?"
+        params.append(date)
+
+    if start_date:
+        filters += " AND a.assignment_date >= ?"
+        params.append(normalize_day(start_date))
+
+    if end_date:
+        filters += " AND a.assignment_date <= ?"
+        params.append(normalize_day(end_date))
+
+    if courthouse:
+        filters += " AND a.courthouse = ?"
+        params.append(courthouse)
+
+    if page_after:
+        filters += " AND (a.assignment_date < ? OR (a.assignment_date = ? AND a.id > ?))"
+        params.extend([page_after[0], page_after[0], page_after[1]])
+
+    query = f"""
+        SELECT {{top}}
             a.id,
             a.assignment_date,
             a.courthouse,
@@ -2721,56 +2792,60 @@ def search():
         LEFT JOIN dbo.courtroom_meta m
             ON m.assignment_date = a.assignment_date
             AND m.courthouse = a.courthouse
-            AND ISNULL(m.location_detail, '') = ISNULL(a.location_detail, '')
-            AND ISNULL(m.part, '') = ISNULL(a.part, '')
-        WHERE 1=1
+            AND m.detail_key = a.detail_key
+            AND m.part_key = a.part_key
+        WHERE 1=1 {filters}
+        ORDER BY a.assignment_date DESC, a.id ASC
     """
 
-    params = []
-
-    if name:
-        query += " AND a.assigned_member LIKE ?"
-        params.append(f"%{name}%")
-
-    if date:
-        query += " AND a.assignment_date = ?"
-        params.append(date)
-
-    if courthouse:
-        query += " AND a.courthouse = ?"
-        params.append(courthouse)
-
-    query += " ORDER BY a.assignment_date DESC, a.id ASC"
-
-    conn = get_conn()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-
-    columns = [column[0] for column in cursor.description]
-    raw_results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-    if should_dedupe:
-        # Some historical data contains duplicate assignment rows for the same slot.
-        # Collapse those rows at read time so the UI shows each assignment once.
-        deduped_results = {}
-        for row in raw_results:
-            dedupe_key = _assignment_dedupe_key(row)
-
-            existing = deduped_results.get(dedupe_key)
-            if not existing:
-                deduped_results[dedupe_key] = row
-                continue
+    if export:
+        def export_rows(cursor):
+            cursor.execute(query.format(top=""), params)
+            return assignment_rows(cursor)
+
+        return _streamed_json(export_rows, _encode_assignment_row)
+
+    # Whole-day views (no name filter) are cached until the day's version moves.
+    cache_key = None
+    if date and not name and normalize_day(date):
+        cache_key = (normalize_day(date), courthouse or "")
+
+    next_cursor = None
+    with db_connection() as conn:
+        cursor = conn.cursor()
+
+        if cache_key:
+            # Read the version before the rows: a write landing in between
+            # then only causes one extra miss, never a stale hit.
+            version = day_version(cursor, cache_key[0])
+            etag = f"day-{cache_key[0]}-{version}"
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+            cached_body = _search_cache.get(cache_key, version)
+            if cached_body is not None:
+                return _json_text_response(cached_body, etag)
+
+        if paged:
+            cursor.execute(query.format(top="TOP (?)"), [limit + 1, *params])
+        else:
+            cursor.execute(query.format(top=""), params)
+        results = list(assignment_rows(cursor))
 
-            if _should_replace_deduped_row(existing, row):
-                deduped_results[dedupe_key] = row
+    if paged and len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_search_cursor(results[-1]["assignment_date"], results[-1]["id"])
 
-        results = list(deduped_results.values())
-    else:
-        results = raw_results
+    body = json_array_text(results, _encode_json_row)
 
-    conn.close()
+    if cache_key:
+        _search_cache.put(cache_key, version, body)
+        return _json_text_response(body, etag)
 
-    return jsonify(results)
+    response = _json_text_response(body)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
 @app.route("/api/import-previous-weekday", methods=["POST"])
@@ -2786,183 +2861,385 @@ def import_previous_weekday():
     source_date_str = source_date.isoformat()
     target_date_str = target_date.isoformat()
 
-    conn = get_conn()
-    cursor = conn.cursor()
+    with db_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT full_name, current_status
-        FROM dbo.deputies
-    """)
-    unavailable_names = {
-        (row[0] or "").strip().lower()
-        for row in cursor.fetchall()
-        if row[0] and _is_off_for_assignment(row[1], target_date_str)
-    }
+        unavailable_names = {
+            (full_name or "").strip().lower()
+            for full_name, status in statuses_between(cursor, target_date)[target_date].items()
+            if full_name and _is_off_status(status)
+        }
 
-    def _slot_key(row):
-        return (
-            (row["courthouse"] or "").strip(),
-            (row["assignment_type"] or "").strip(),
-            (row["location_group"] or "").strip(),
-            (row["location_detail"] or "").strip(),
-            (row["part"] or "").strip(),
+        cursor.execute("""
+            DROP TABLE IF EXISTS #unavailable_names;
+            CREATE TABLE #unavailable_names (
+                name_key NVARCHAR(255) COLLATE DATABASE_DEFAULT NOT NULL PRIMARY KEY
+            );
+        """)
+        executemany(
+            cursor,
+            "INSERT INTO #unavailable_names (name_key) VALUES (?)",
+            [(name[:255],) for name in sorted(unavailable_names)],
         )
 
-    cursor.execute("""
-        SELECT courthouse, assignment_type, location_group, location_detail, part, assigned_member
-        FROM dbo.court_assignments
-        WHERE assignment_date = ?
-    """, (target_date_str,))
-    target_rows = [
-        {
-            "courthouse": row[0],
-            "assignment_type": row[1],
-            "location_group": row[2],
-            "location_detail": row[3],
-            "part": row[4],
-            "assigned_member": row[5],
-        }
-        for row in cursor.fetchall()
-    ]
+        # One statement copies the source day: the first populated source row
+        # per slot (skipping unavailable deputies) fills existing empty target
+        # slots, unless another row for that slot is already populated, and
+        # slots the target day does not have yet are inserted.
+        cursor.execute(f"""
+            WITH source_slots AS (
+                SELECT
+                    s.courthouse,
+                    s.assignment_type,
+                    s.location_group,
+                    s.location_detail,
+                    s.part,
+                    s.group_key,
+                    s.detail_key,
+                    s.part_key,
+                    s.judge_name,
+                    s.shift_time,
+                    LTRIM(RTRIM(s.assigned_member)) AS assigned_member,
+                    s.assignment_notes,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY s.courthouse, s.assignment_type, s.group_key, s.detail_key, s.part_key
+                        ORDER BY s.id
+                    ) AS rn
+                FROM dbo.court_assignments s
+                WHERE s.assignment_date = ?
+                  AND LTRIM(RTRIM(ISNULL(s.assigned_member, ''))) <> ''
+                  AND NOT EXISTS (
+                        SELECT 1
+                        FROM #unavailable_names u
+                        WHERE u.name_key = LOWER(LTRIM(RTRIM(s.assigned_member)))
+                  )
+            ),
+            import_rows AS (
+                SELECT
+                    src.*,
+                    CASE WHEN EXISTS (
+                        SELECT 1
+                        FROM dbo.court_assignments p
+                        WHERE p.assignment_date = ?
+                          AND p.courthouse = src.courthouse
+                          AND p.assignment_type = src.assignment_type
+                          AND p.group_key = src.group_key
+                          AND p.detail_key = src.detail_key
+                          AND p.part_key = src.part_key
+                          AND LTRIM(RTRIM(ISNULL(p.assigned_member, ''))) <> ''
+                    ) THEN 1 ELSE 0 END AS slot_populated
+                FROM source_slots src
+                WHERE src.rn = 1
+            ),
+            target_day AS (
+                SELECT *
+                FROM dbo.court_assignments
+                WHERE assignment_date = ?
+            )
+            MERGE target_day AS target
+            USING import_rows AS source
+            ON target.courthouse = source.courthouse
+               AND target.assignment_type = source.assignment_type
+               AND target.group_key = source.group_key
+               AND target.detail_key = source.detail_key
+               AND target.part_key = source.part_key
+            WHEN MATCHED AND source.slot_populated = 0 AND ISNULL(target.assigned_member, '') = '' THEN
+                UPDATE SET
+                    assigned_member = source.assigned_member,
+                    assignment_notes = source.assignment_notes,
+                    shift_time = CASE
+                        WHEN target.assignment_type = 'Fixed Post' THEN target.shift_time
+                        ELSE COALESCE(NULLIF(target.shift_time, ''), source.shift_time)
+                    END
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT (
+                    assignment_date,
+                    courthouse,
+                    assignment_type,
+                    location_group,
+                    location_detail,
+                    part,
+                    judge_name,
+                    shift_time,
+                    assigned_member,
+                    assignment_notes,
+                    created_at
+                )
+                VALUES (
+                    ?,
+                    source.courthouse,
+                    source.assignment_type,
+                    source.location_group,
+                    source.location_detail,
+                    source.part,
+                    source.judge_name,
+                    CASE WHEN source.assignment_type = 'Fixed Post' THEN NULL ELSE source.shift_time END,
+                    source.assigned_member,
+                    source.assignment_notes,
+                    GETDATE()
+                )
+            {MEMBER_OUTPUT_CLAUSE}, $action, inserted.assignment_type;
+        """, (source_date_str, target_date_str, target_date_str, target_date_str))
+        merged_rows = cursor.fetchall()
+        cursor.execute("DROP TABLE IF EXISTS #unavailable_names;")
+
+        sync_assignment_members(cursor, [row[:3] for row in merged_rows])
+
+        counts_by_type = {}
+        for row in merged_rows:
+            type_counts = counts_by_type.setdefault(row[4] or "", {"updated": 0, "inserted": 0})
+            type_counts["updated" if row[3] == "UPDATE" else "inserted"] += 1
+        updated_count = sum(counts["updated"] for counts in counts_by_type.values())
+        inserted_count = sum(counts["inserted"] for counts in counts_by_type.values())
+        imported_count = updated_count + inserted_count
+
+        _mark_days_changed(cursor, [target_date_str])
+        _queue_day_event(target_date_str, "reload")
+        conn.commit()
 
-    target_slot_keys = {_slot_key(row) for row in target_rows}
-    populated_slot_keys = {
-        _slot_key(row)
-        for row in target_rows
-        if (row.get("assigned_member") or "").strip()
-    }
+    return jsonify({
+        "status": "success",
+        "target_date": target_date_str,
+        "source_date": source_date_str,
+        "updated_count": updated_count,
+        "inserted_count": inserted_count,
+        "imported_count": imported_count,
+        "counts_by_type": counts_by_type,
+    })
 
-    cursor.execute("""
-        SELECT courthouse, assignment_type, location_group, location_detail, part,
-               judge_name, shift_time, assigned_member, assignment_notes
+def _apply_schema_migrations():
+    with db_connection() as conn:
+        applied = run_migrations(conn, log=app.logger.info)
+    if applied:
+        refresh_schema_cache()
+    return applied
+
+
+@app.cli.command("migrate")
+@click.pass_context
+def migrate_command(ctx):
+    """
+    Apply pending database schema migrations, then run the rebuild commands
+    that fill the tables they created. Run this on every deploy.
+    """
+    applied = _apply_schema_migrations()
+    if not applied:
+        click.echo("Schema is up to date.")
+        return
+
+    click.echo(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    for command_name in rebuilds_for(applied):
+        click.echo(f"Running {command_name}")
+        try:
+            ctx.invoke(app.cli.get_command(ctx, command_name))
+        except Exception as error:
+            raise click.ClickException(
+                f"{command_name} failed ({error}); run `flask --app app {command_name}` to retry."
+            ) from error
+
+
+@app.cli.command("materialize-days")
+@click.option("--start", "start_date", help="First date to seed (YYYY-MM-DD). Defaults to today.")
+@click.option("--days", default=14, show_default=True, help="Number of consecutive days to seed.")
+@click.option("--force", is_flag=True, help="Re-copy template slots even for days already in the ledger.")
+def materialize_days_command(start_date, days, force):
+    """Seed upcoming days from the assignment template ahead of time."""
+    first_day = _parse_date_value(start_date) if start_date else datetime.now(ZoneInfo("America/New_York")).date()
+    if not first_day:
+        raise click.BadParameter("start must be YYYY-MM-DD", param_hint="--start")
+
+    seeded = 0
+    for offset in range(max(days, 0)):
+        if _materialize_day((first_day + timedelta(days=offset)).isoformat(), force=force):
+            seeded += 1
+    click.echo(f"Seeded {seeded} of {max(days, 0)} day(s) starting {first_day.isoformat()}.")
+
+
+@app.cli.command("rebuild-status-ledger")
+def rebuild_status_ledger_command():
+    """Rebuild dbo.deputy_status_ranges from dbo.deputies.current_status."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        row_count = rebuild_status_ledger(cursor)
+        conn.commit()
+    click.echo(f"Wrote {row_count} status row(s).")
+
+
+@app.cli.command("rebuild-assignment-members")
+def rebuild_assignment_members_command():
+    """Rebuild dbo.court_assignment_members from court_assignments.assigned_member."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        row_count = rebuild_assignment_members(cursor)
+        conn.commit()
+    click.echo(f"Wrote {row_count} member row(s).")
+
+
+@app.cli.command("rebuild-vacancy-counters")
+@click.option("--start-date", default=None, help="Only rebuild on or after this date (YYYY-MM-DD).")
+@click.option("--end-date", default=None, help="Only rebuild on or before this date (YYYY-MM-DD).")
+def rebuild_vacancy_counters_command(start_date, end_date):
+    """Recount dbo.vacancy_counters from court_assignments."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        day_count = rebuild_vacancy_counters(cursor, start_date, end_date)
+        conn.commit()
+    click.echo(f"Recounted {day_count} date(s).")
+
+
+@app.cli.command("compact-duplicate-slots")
+@click.option("--start-date", default=None, help="Only compact on or after this date (YYYY-MM-DD).")
+@click.option("--end-date", default=None, help="Only compact on or before this date (YYYY-MM-DD).")
+@click.option("--batch-size", default=5000, show_default=True, help="Commit after roughly this many deleted rows.")
+@click.option("--dry-run", is_flag=True, help="Only report the duplicate rows per date.")
+def compact_duplicate_slots_command(start_date, end_date, batch_size, dry_run):
+    """
+    Permanently delete assignment rows that lose their slot's dedupe, then
+    list the rows left sharing a slot only through case.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        dates = duplicate_slot_dates(cursor, start_date, end_date)
+        click.echo(f"{sum(count for _, count in dates)} duplicate row(s) on {len(dates)} date(s).")
+        if dry_run:
+            for day, count in dates:
+                click.echo(f"  {normalize_day(day)}: {count}")
+            _echo_slot_key_conflicts(cursor, start_date, end_date)
+            return
+
+        deleted = 0
+        pending_days = []
+        pending_rows = 0
+        for position, (day, _) in enumerate(dates, start=1):
+            # Whole dates per transaction: a slot's rows always share a date.
+            pending_rows += len(compact_duplicate_slots(cursor, day))
+            pending_days.append(day)
+            if pending_rows >= batch_size or position == len(dates):
+                _mark_days_changed(cursor, pending_days)
+                conn.commit()
+                deleted += pending_rows
+                click.echo(f"  deleted {deleted} row(s) through {normalize_day(day)}")
+                pending_days = []
+                pending_rows = 0
+        click.echo(f"Deleted {deleted} duplicate row(s).")
+        _echo_slot_key_conflicts(cursor, start_date, end_date)
+
+
+def _echo_slot_key_conflicts(cursor, start_date, end_date):
+    conflicts = slot_key_conflicts(cursor, start_date, end_date)
+    if not conflicts:
+        return
+    click.echo(f"{len(conflicts)} row(s) share a slot with rows that differ only in case; left in place:")
+    for row_id, day, courthouse, assignment_type, location_group, location_detail, part in conflicts:
+        click.echo(
+            f"  {normalize_day(day)} id {row_id}: {courthouse} / {assignment_type} / "
+            f"{location_group or ''} / {location_detail or ''} / {part or ''}"
+        )
+
+
+@app.cli.command("benchmark-staffing")
+@click.option("--years", default=3.0, show_default=True, help="Years of synthetic history to generate.")
+@click.option("--rows", "grid_rows", default=40, show_default=True, help="Grid rows.")
+@click.option("--columns", "grid_columns", default=12, show_default=True, help="Grid columns.")
+@click.option("--edit-percent", default=25, show_default=True, help="Chance (0-100) that a cell is edited on a given day.")
+def benchmark_staffing_command(years, grid_rows, grid_columns, edit_percent):
+    """Compare get-staffing query plans on synthetic history in temp tables."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        report = benchmark_latest_staffing(cursor, years, grid_rows, grid_columns, edit_percent)
+    click.echo(f"{report['history_rows']} history rows over {report['days']} days, {report['grid_cells']} cells")
+    for name, timing in report["timings"].items():
+        click.echo(f"  {name:8} min {timing['min_ms']} ms  avg {timing['avg_ms']} ms  max {timing['max_ms']} ms")
+    click.echo(f"  results match: {report['results_match']}")
+
+
+@app.cli.command("benchmark-slot-lookup")
+@click.option("--years", default=3.0, show_default=True, help="Years of synthetic assignments to generate.")
+@click.option("--slots-per-day", default=400, show_default=True, help="Assignment rows per day.")
+def benchmark_slot_lookup_command(years, slots_per_day):
+    """Compare wrapped and key-column slot lookups on synthetic assignments in a temp table."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        report = benchmark_slot_lookup(cursor, years, slots_per_day)
+    click.echo(f"{report['history_rows']} assignment rows over {report['days']} days")
+    for name, timing in report["timings"].items():
+        click.echo(f"  {name:8} min {timing['min_ms']} ms  avg {timing['avg_ms']} ms  max {timing['max_ms']} ms")
+    click.echo(f"  results match: {report['results_match']}")
+
+
+@app.cli.command("benchmark-search-export")
+@click.option("--start-date", help="First date of the range (YYYY-MM-DD).")
+@click.option("--end-date", help="Last date of the range (YYYY-MM-DD).")
+@click.option("--synthetic-rows", type=int, help="Encode this many generated rows instead of querying a range.")
+def benchmark_search_export_command(start_date, end_date, synthetic_rows):
+    """
+    Compare peak memory of a buffered and a streamed range search.
+
+    With --synthetic-rows no database is used: the driver rows are generated
+    before measuring, so only the application's copies are counted.
+    """
+    if not synthetic_rows and not (start_date and end_date):
+        raise click.UsageError("Pass --start-date and --end-date, or --synthetic-rows.")
+
+    query = """
+        SELECT id, assignment_date, courthouse, assignment_type, location_group, location_detail,
+               judge_name, part, shift_time, assigned_member, assignment_notes, created_at
         FROM dbo.court_assignments
-        WHERE assignment_date = ?
-          AND ISNULL(assigned_member, '') <> ''
-    """, (source_date_str,))
-    source_rows = [
-        {
-            "courthouse": row[0],
-            "assignment_type": row[1],
-            "location_group": row[2],
-            "location_detail": row[3],
-            "part": row[4],
-            "judge_name": row[5],
-            "shift_time": row[6],
-            "assigned_member": row[7],
-            "assignment_notes": row[8],
-        }
-        for row in cursor.fetchall()
-    ]
+        WHERE assignment_date BETWEEN ? AND ?
+        ORDER BY assignment_date DESC, id ASC
+    """
 
-    updated_count = 0
-    inserted_count = 0
+    def run(fetch_rows):
+        def buffered():
+            return len(json_array_text(list(fetch_rows()), _encode_json_row))
 
-    for source_row in source_rows:
-        assigned_member = (source_row.get("assigned_member") or "").strip()
-        if assigned_member.lower() in unavailable_names:
-            continue
+        def streamed():
+            return sum(len(chunk) for chunk in json_array_chunks(fetch_rows(), _encode_assignment_row))
 
-        slot_key = _slot_key(source_row)
+        for name, produce in (("buffered", buffered), ("streamed", streamed)):
+            started = time.perf_counter()
+            body_size, peak = peak_allocation(produce)
+            elapsed = (time.perf_counter() - started) * 1000
+            click.echo(f"  {name:8} body {body_size} chars  peak {peak / 1024 / 1024:.1f} MiB  {elapsed:.0f} ms")
 
-        if slot_key in target_slot_keys:
-            if slot_key in populated_slot_keys:
-                continue
+    with app.app_context():
+        if synthetic_rows:
+            driver_rows = synthetic_search_rows(synthetic_rows)
+            click.echo(f"{len(driver_rows)} synthetic rows")
+            run(lambda: search_rows_from_values(driver_rows))
+            return
 
-            if source_row.get("assignment_type") == "Fixed Post":
-                cursor.execute("""
-                    UPDATE dbo.court_assignments
-                    SET assigned_member = ?,
-                        assignment_notes = ?
-                    WHERE assignment_date = ?
-                      AND courthouse = ?
-                      AND assignment_type = ?
-                      AND ISNULL(location_group,'') = ?
-                      AND ISNULL(location_detail,'') = ?
-                      AND ISNULL(part,'') = ?
-                      AND ISNULL(assigned_member,'') = ''
-                """, (
-                    assigned_member,
-                    source_row.get("assignment_notes"),
-                    target_date_str,
-                    source_row.get("courthouse"),
-                    source_row.get("assignment_type"),
-                    (source_row.get("location_group") or ""),
-                    (source_row.get("location_detail") or ""),
-                    (source_row.get("part") or ""),
-                ))
-            else:
-                cursor.execute("""
-                    UPDATE dbo.court_assignments
-                    SET assigned_member = ?,
-                        assignment_notes = ?,
-                        shift_time = COALESCE(NULLIF(shift_time, ''), ?)
-                    WHERE assignment_date = ?
-                      AND courthouse = ?
-                      AND assignment_type = ?
-                      AND ISNULL(location_group,'') = ?
-                      AND ISNULL(location_detail,'') = ?
-                      AND ISNULL(part,'') = ?
-                      AND ISNULL(assigned_member,'') = ''
-                """, (
-                    assigned_member,
-                    source_row.get("assignment_notes"),
-                    source_row.get("shift_time"),
-                    target_date_str,
-                    source_row.get("courthouse"),
-                    source_row.get("assignment_type"),
-                    (source_row.get("location_group") or ""),
-                    (source_row.get("location_detail") or ""),
-                    (source_row.get("part") or ""),
-                ))
-            if cursor.rowcount and cursor.rowcount > 0:
-                updated_count += cursor.rowcount
-                populated_slot_keys.add(slot_key)
-            continue
+        with db_connection() as conn:
+            cursor = conn.cursor()
 
-        shift_time_to_insert = None if source_row.get("assignment_type") == "Fixed Post" else source_row.get("shift_time")
+            def fetch_rows():
+                cursor.execute(query, (start_date, end_date))
+                return assignment_rows(cursor)
 
-        cursor.execute("""
-            INSERT INTO dbo.court_assignments (
-                assignment_date,
-                courthouse,
-                assignment_type,
-                location_group,
-                location_detail,
-                part,
-                judge_name,
-                shift_time,
-                assigned_member,
-                assignment_notes,
-                created_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE())
-        """, (
-            target_date_str,
-            source_row.get("courthouse"),
-            source_row.get("assignment_type"),
-            source_row.get("location_group"),
-            source_row.get("location_detail"),
-            source_row.get("part"),
-            source_row.get("judge_name"),
-            shift_time_to_insert,
-            assigned_member,
-            source_row.get("assignment_notes"),
-        ))
-        inserted_count += 1
-        target_slot_keys.add(slot_key)
-        populated_slot_keys.add(slot_key)
-    imported_count = updated_count + inserted_count
-    conn.commit()
-    conn.close()
+            run(fetch_rows)
+
+
+@app.cli.command("benchmark-row-pipeline")
+@click.option("--rows", "row_count", default=200000, show_default=True, help="Synthetic rows to generate.")
+def benchmark_row_pipeline_command(row_count):
+    """Time search result encoding with dict rows against AssignmentRow."""
+    report = benchmark_row_pipeline(synthetic_search_rows(row_count), _encode_json_row)
+    click.echo(f"{report['rows']} rows")
+    for name, timing in report["timings"].items():
+        click.echo(f"  {name:8} min {timing['min_ms']} ms  avg {timing['avg_ms']} ms")
+    click.echo(f"  results match: {report['results_match']}")
+
+
+@app.cli.command("benchmark-vacancy-counts")
+@click.option("--days", default=365, show_default=True, help="Synthetic days to count.")
+@click.option("--rows-per-day", default=300, show_default=True, help="Assignment rows per day.")
+def benchmark_vacancy_counts_command(days, rows_per_day):
+    """Time the vacancy recount of a date range on synthetic rows."""
+    report = benchmark_vacancy_counts(days, rows_per_day)
+    click.echo(f"{report['rows']} rows over {report['days']} days")
+    for name, timing in report["timings"].items():
+        click.echo(f"  {name:8} min {timing['min_ms']} ms  avg {timing['avg_ms']} ms")
 
-    return jsonify({
-        "status": "success",
-        "target_date": target_date_str,
-        "source_date": source_date_str,
-        "updated_count": updated_count,
-        "inserted_count": inserted_count,
-        "imported_count": imported_count,
-    })
 
 if __name__ == "__main__":
     app.run(debug=True)
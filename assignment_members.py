@@ -0,0 +1,185 @@
+"""
+Deputy membership of assignment rows.
+
+court_assignments.assigned_member is free text ("Doe, Jane || Roe, Sam").
+dbo.court_assignment_members keeps one row per named deputy per assignment
+so lookups by deputy are index seeks instead of LIKE scans, and
+dbo.court_assignment_member_tokens holds each word of those names so a
+search for "Jane" finds "Doe, Jane". Token rows cascade from their member
+row. Every write that changes assigned_member reports the rows it touched
+(via an OUTPUT clause) and passes them to sync_assignment_members in the
+same transaction.
+"""
+
+import re
+
+from db_connect import executemany
+
+# Append to INSERT/UPDATE statements on dbo.court_assignments so the written
+# rows come back for sync_assignment_members.
+MEMBER_OUTPUT_CLAUSE = "OUTPUT inserted.id, inserted.assignment_date, inserted.assigned_member"
+
+_INSERT_MEMBER_SQL = """
+    INSERT INTO dbo.court_assignment_members (assignment_id, ordinal, member_name, member_key, assignment_date)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_TOKEN_SQL = """
+    INSERT INTO dbo.court_assignment_member_tokens (assignment_id, ordinal, token_key, assignment_date)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+def parse_assigned_member_names(value):
+    text = (value or "").strip()
+    if not text:
+        return []
+
+    def _is_placeholder_assignment(name):
+        normalized = (name or "").strip().upper()
+        return normalized in {"OPEN", "VACANT", "UNASSIGNED", "TBD"} or normalized.startswith("OPEN-")
+
+    if "||" in text:
+        return [name.strip() for name in re.split(r"\s*\|\|\s*", text) if name.strip() and not _is_placeholder_assignment(name)]
+
+    if "\n" in text:
+        return [name.strip() for name in re.split(r"\n+", text) if name.strip() and not _is_placeholder_assignment(name)]
+
+    if _is_placeholder_assignment(text):
+        return []
+
+    return [text]
+
+
+def member_key(name):
+    return (name or "").strip().lower()
+
+
+def member_key_prefix(name):
+    """LIKE pattern matching member keys that start with ``name``."""
+    escaped = member_key(name).replace("[", "[[]").replace("%", "[%]").replace("_", "[_]")
+    return f"{escaped}%"
+
+
+def member_tokens(name):
+    """
+    The words of a member name, folded like member_key. Hyphenated words
+    also contribute their parts, so "Smith-Jones" is found by "jones".
+    """
+    tokens = []
+    for word in re.split(r"[\s,]+", member_key(name)):
+        for token in [word, *(word.split("-") if "-" in word else ())]:
+            token = token[:100]
+            if token and token not in tokens:
+                tokens.append(token)
+    return tokens
+
+
+def member_search_prefixes(query):
+    """
+    LIKE patterns for a name search: one per word of ``query``, each to be
+    matched against the start of some token of the same member.
+    """
+    words = [word for word in re.split(r"[\s,]+", member_key(query)) if word]
+    return [member_key_prefix(word[:100]) for word in words] or [member_key_prefix(query)]
+
+
+def remove_member(assigned_member, name):
+    """
+    Drop the tokens of ``assigned_member`` that name ``name`` exactly (after
+    the same trimming and case folding as member_key). Returns the remaining
+    value, None when nothing is left, and the number of tokens removed.
+    Placeholders and other names are kept in order.
+    """
+    text = (assigned_member or "").strip()
+    if "||" in text:
+        tokens = re.split(r"\s*\|\|\s*", text)
+    elif "\n" in text:
+        tokens = re.split(r"\n+", text)
+    else:
+        tokens = [text]
+
+    key = member_key(name)
+    kept = [token.strip() for token in tokens if token.strip() and member_key(token) != key]
+    removed = sum(1 for token in tokens if token.strip() and member_key(token) == key)
+    return (" || ".join(kept) or None), removed
+
+
+def _member_rows(assignment_rows):
+    rows = []
+    for assignment_id, assignment_date, assigned_member in assignment_rows:
+        for ordinal, name in enumerate(parse_assigned_member_names(assigned_member)):
+            rows.append((assignment_id, ordinal, name[:255], member_key(name)[:255], assignment_date))
+    return rows
+
+
+def _token_rows(member_rows):
+    return [
+        (assignment_id, ordinal, token, assignment_date)
+        for assignment_id, ordinal, name, _key, assignment_date in member_rows
+        for token in member_tokens(name)
+    ]
+
+
+def sync_assignment_members(cursor, assignment_rows):
+    """
+    Replace the member rows of the given assignments.
+
+    ``assignment_rows`` are ``(id, assignment_date, assigned_member)`` tuples,
+    as returned by MEMBER_OUTPUT_CLAUSE.
+    """
+    assignment_rows = list(assignment_rows)
+    if not assignment_rows:
+        return
+    executemany(
+        cursor,
+        "DELETE FROM dbo.court_assignment_members WHERE assignment_id = ?",
+        [(row[0],) for row in assignment_rows],
+    )
+    member_rows = _member_rows(assignment_rows)
+    executemany(cursor, _INSERT_MEMBER_SQL, member_rows)
+    executemany(cursor, _INSERT_TOKEN_SQL, _token_rows(member_rows))
+
+
+def write_assignments(cursor, query, params):
+    """
+    Run an INSERT/UPDATE/MERGE on dbo.court_assignments that carries
+    MEMBER_OUTPUT_CLAUSE, keep the member rows in step and return the number
+    of assignment rows written.
+    """
+    cursor.execute(query, params)
+    written = cursor.fetchall()
+    sync_assignment_members(cursor, written)
+    return len(written)
+
+
+def refresh_assignment_members(cursor, assignment_ids):
+    """Re-derive member rows for assignments updated without an OUTPUT clause."""
+    assignment_ids = list(assignment_ids)
+    for start in range(0, len(assignment_ids), 500):
+        batch = assignment_ids[start:start + 500]
+        placeholders = ", ".join("?" for _ in batch)
+        cursor.execute(f"""
+            SELECT id, assignment_date, assigned_member
+            FROM dbo.court_assignments
+            WHERE id IN ({placeholders})
+        """, batch)
+        sync_assignment_members(cursor, cursor.fetchall())
+
+
+def rebuild_assignment_members(cursor, batch_size=5000):
+    """Rebuild every member row from court_assignments.assigned_member."""
+    cursor.execute("DELETE FROM dbo.court_assignment_members")
+    cursor.execute("""
+        SELECT id, assignment_date, assigned_member
+        FROM dbo.court_assignments
+        WHERE ISNULL(assigned_member, '') <> ''
+    """)
+    source_rows = cursor.fetchall()
+
+    written = 0
+    for start in range(0, len(source_rows), batch_size):
+        member_rows = _member_rows(source_rows[start:start + batch_size])
+        written += executemany(cursor, _INSERT_MEMBER_SQL, member_rows)
+        executemany(cursor, _INSERT_TOKEN_SQL, _token_rows(member_rows))
+    return written
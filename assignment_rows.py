@@ -0,0 +1,394 @@
+"""
+Compact assignment rows for the search and totals pipelines.
+
+Building a dict per fetched row and encoding each dict through the JSON
+provider dominated wide date-range searches. AssignmentRow keeps the
+driver row as-is, shares one RowLayout between all rows of a result and is
+encoded straight from the driver values, in the same form jsonify produces.
+
+slot_rank_sql ranks the rows of a slot, best first, which compaction and
+slot moves use to decide which duplicate row survives. Compaction only
+merges rows the board used to collapse on read; rows whose slot keys
+collide only through case are reported, never deleted. Paged searches
+resume after the (assignment_date, id) carried by a search cursor.
+"""
+
+import base64
+import binascii
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from json.encoder import encode_basestring_ascii
+
+from day_versions import normalize_day
+from result_stream import encode_json_value, iter_rows
+
+
+class RowLayout:
+    """Column positions shared by every row of one result set."""
+
+    __slots__ = ("names", "index", "json_fields")
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.index = {name: position for position, name in enumerate(self.names)}
+        # jsonify sorts keys, so the encoded members follow the same order.
+        self.json_fields = tuple(
+            (encode_json_value(name, None) + ":", self.index[name]) for name in sorted(self.names)
+        )
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        return cls(column[0] for column in cursor.description)
+
+
+class AssignmentRow:
+    """One court_assignments row, read by column name like the old row dicts."""
+
+    __slots__ = ("layout", "values")
+
+    def __init__(self, layout, values):
+        self.layout = layout
+        self.values = values
+
+    def get(self, name, default=None):
+        position = self.layout.index.get(name)
+        return default if position is None else self.values[position]
+
+    def __getitem__(self, name):
+        return self.values[self.layout.index[name]]
+
+    def as_dict(self):
+        return dict(zip(self.layout.names, self.values))
+
+    def to_json(self, fallback):
+        """The row as a JSON object, identical to jsonify's output for as_dict()."""
+        values = self.values
+        members = []
+        for prefix, position in self.layout.json_fields:
+            value = values[position]
+            # Strings and NULLs are most of a row; skip the call for them.
+            if value.__class__ is str:
+                members.append(prefix + encode_basestring_ascii(value))
+            elif value is None:
+                members.append(prefix + "null")
+            else:
+                members.append(prefix + encode_json_value(value, fallback))
+        return "{" + ",".join(members) + "}"
+
+
+def assignment_rows(cursor):
+    """Yield the rows of an executed assignment query as AssignmentRow."""
+    layout = RowLayout.from_cursor(cursor)
+    for values in iter_rows(cursor):
+        yield AssignmentRow(layout, values)
+
+
+# The slot key dbo.court_assignments is unique on (migration 10). The write
+# paths address slots by these columns, so SQL equality rules apply.
+SLOT_KEY_COLUMNS = ("assignment_date", "courthouse", "assignment_type", "group_key", "detail_key", "part_key")
+
+
+# The key the board deduped on when it read a date: each column trimmed
+# and, unlike the slot key, compared case-sensitively.
+READ_DEDUPE_KEY_COLUMNS = ("courthouse", "assignment_type", "location_group", "location_detail", "part")
+
+
+def read_dedupe_key_sql(alias):
+    """SQL expressions for the read-time dedupe key of rows aliased ``alias``."""
+    return (f"{alias}.assignment_date",) + tuple(
+        f"LTRIM(RTRIM(ISNULL({alias}.{name}, ''))) COLLATE Latin1_General_BIN2"
+        for name in READ_DEDUPE_KEY_COLUMNS
+    )
+
+
+def slot_rank_sql(alias, partition_by=SLOT_KEY_COLUMNS, partition_sql=None):
+    """
+    ROW_NUMBER() over the rows of each slot, best first, for a query over
+    dbo.court_assignments aliased ``alias``. Rank 1 is the row the duplicate
+    rule keeps: populated member, shift and notes first, then the newest
+    created_at, then the lowest id. ``partition_sql`` replaces the
+    partition columns with expressions.
+    """
+    partition = ", ".join(partition_sql or (f"{alias}.{name}" for name in partition_by))
+    return f"""ROW_NUMBER() OVER (
+        PARTITION BY {partition}
+        ORDER BY
+            CASE WHEN LTRIM(RTRIM(ISNULL({alias}.assigned_member, ''))) <> '' THEN 1 ELSE 0 END DESC,
+            CASE WHEN LTRIM(RTRIM(ISNULL({alias}.shift_time, ''))) <> '' THEN 1 ELSE 0 END DESC,
+            CASE WHEN LTRIM(RTRIM(ISNULL({alias}.assignment_notes, ''))) <> '' THEN 1 ELSE 0 END DESC,
+            {alias}.created_at DESC,
+            {alias}.id ASC
+    )"""
+
+
+def compact_duplicate_slots(cursor, assignment_date):
+    """
+    Delete every row of ``assignment_date`` that loses its ranking under the
+    read-time dedupe key, returning the deleted ids. Member rows go with
+    them (ON DELETE CASCADE).
+    """
+    cursor.execute(f"""
+        ;WITH ranked AS (
+            SELECT id, {slot_rank_sql("ca", partition_sql=read_dedupe_key_sql("ca"))} AS slot_rank
+            FROM dbo.court_assignments ca
+            WHERE ca.assignment_date = ?
+        )
+        DELETE target
+        OUTPUT deleted.id
+        FROM dbo.court_assignments target
+        INNER JOIN ranked r ON r.id = target.id
+        WHERE r.slot_rank > 1
+    """, (assignment_date,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def duplicate_slot_dates(cursor, start_date=None, end_date=None):
+    """Return ``(date, losing rows)`` for every date that compact_duplicate_slots would change."""
+    cursor.execute(f"""
+        ;WITH ranked AS (
+            SELECT ca.assignment_date, {slot_rank_sql("ca", partition_sql=read_dedupe_key_sql("ca"))} AS slot_rank
+            FROM dbo.court_assignments ca
+            WHERE (? IS NULL OR ca.assignment_date >= ?)
+              AND (? IS NULL OR ca.assignment_date <= ?)
+        )
+        SELECT assignment_date, COUNT(*)
+        FROM ranked
+        WHERE slot_rank > 1
+        GROUP BY assignment_date
+        ORDER BY assignment_date
+    """, (start_date, start_date, end_date, end_date))
+    return cursor.fetchall()
+
+
+def slot_key_conflicts(cursor, start_date=None, end_date=None):
+    """
+    Return ``(id, date, courthouse, assignment_type, location_group,
+    location_detail, part)`` for the rows that would still share a slot
+    after compaction: rows the board showed separately, whose slot keys
+    only collide through case.
+    """
+    cursor.execute(f"""
+        ;WITH kept AS (
+            SELECT ca.id, ca.assignment_date, ca.courthouse, ca.assignment_type,
+                   ca.location_group, ca.location_detail, ca.part,
+                   ca.group_key, ca.detail_key, ca.part_key,
+                   {slot_rank_sql("ca", partition_sql=read_dedupe_key_sql("ca"))} AS slot_rank
+            FROM dbo.court_assignments ca
+            WHERE (? IS NULL OR ca.assignment_date >= ?)
+              AND (? IS NULL OR ca.assignment_date <= ?)
+        ),
+        slots AS (
+            SELECT id, assignment_date, courthouse, assignment_type, location_group, location_detail, part,
+                   COUNT(*) OVER (
+                       PARTITION BY {", ".join(SLOT_KEY_COLUMNS)}
+                   ) AS slot_rows
+            FROM kept
+            WHERE slot_rank = 1
+        )
+        SELECT id, assignment_date, courthouse, assignment_type, location_group, location_detail, part
+        FROM slots
+        WHERE slot_rows > 1
+        ORDER BY assignment_date, courthouse, assignment_type, id
+    """, (start_date, start_date, end_date, end_date))
+    return cursor.fetchall()
+
+
+_WRAPPED_SLOT_LOOKUP_SQL = """
+    SELECT id
+    FROM #bench_slot_assignments
+    WHERE assignment_date = ?
+      AND courthouse = ?
+      AND assignment_type = ?
+      AND LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+      AND LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+      AND LOWER(LTRIM(RTRIM(ISNULL(part, '')))) = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+"""
+
+_KEYED_SLOT_LOOKUP_SQL = """
+    SELECT id
+    FROM #bench_slot_assignments
+    WHERE assignment_date = ?
+      AND courthouse = ?
+      AND assignment_type = ?
+      AND group_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+      AND detail_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+      AND part_key = LOWER(LTRIM(RTRIM(ISNULL(?, ''))))
+"""
+
+
+def benchmark_slot_lookup(cursor, years=3, slots_per_day=400, samples=20):
+    """
+    Time a slot lookup with the column-wrapping predicates the update paths
+    used before migration 5 against the same lookup on the key columns.
+
+    Both run against #bench_slot_assignments, a session temp table with the
+    key columns and IX_court_assignments_group_slot's index, so the real
+    tables are never touched.
+    """
+    days = max(1, int(years * 365))
+    cursor.execute("""
+        DROP TABLE IF EXISTS #bench_slot_assignments;
+        CREATE TABLE #bench_slot_assignments (
+            id INT IDENTITY(1, 1) PRIMARY KEY,
+            assignment_date DATE NOT NULL,
+            courthouse NVARCHAR(100) NOT NULL,
+            assignment_type NVARCHAR(50) NOT NULL,
+            location_group NVARCHAR(255) NULL,
+            location_detail NVARCHAR(255) NULL,
+            part NVARCHAR(100) NULL,
+            assigned_member NVARCHAR(MAX) NULL,
+            group_key AS CAST(LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) AS NVARCHAR(255)) PERSISTED,
+            detail_key AS CAST(LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) AS NVARCHAR(255)) PERSISTED,
+            part_key AS CAST(LOWER(LTRIM(RTRIM(ISNULL(part, '')))) AS NVARCHAR(100)) PERSISTED
+        );
+    """)
+    cursor.execute("""
+        WITH n AS (
+            SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS i
+            FROM sys.all_objects a CROSS JOIN sys.all_objects b
+        )
+        INSERT INTO #bench_slot_assignments
+            (assignment_date, courthouse, assignment_type, location_group, location_detail, part, assigned_member)
+        SELECT DATEADD(DAY, d.i, '2000-01-01'),
+               CONCAT('Courthouse ', s.i % 5),
+               CASE WHEN s.i % 4 = 0 THEN 'Fixed Post' ELSE 'Courtroom' END,
+               CONCAT(' Floor ', s.i % 12, ' '),
+               CONCAT('Room ', s.i),
+               CONCAT('', s.i % 3),
+               CONCAT('Deputy ', ABS(CHECKSUM(NEWID())) % 500)
+        FROM n d CROSS JOIN n s
+        WHERE d.i < ? AND s.i < ?
+    """, (max(days, slots_per_day), days, slots_per_day))
+    cursor.execute("""
+        CREATE INDEX IX_bench_slot_assignments_group_slot
+            ON #bench_slot_assignments (assignment_date, courthouse, assignment_type, group_key, part_key, detail_key)
+            INCLUDE (assigned_member);
+    """)
+    cursor.execute("SELECT COUNT(*) FROM #bench_slot_assignments")
+    history_rows = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT TOP (?) assignment_date, courthouse, assignment_type, UPPER(location_group), location_detail, part
+        FROM #bench_slot_assignments
+        ORDER BY NEWID()
+    """, (samples,))
+    sample_slots = [tuple(row) for row in cursor.fetchall()]
+
+    timings = {}
+    results = {}
+    for name, query in (("wrapped", _WRAPPED_SLOT_LOOKUP_SQL), ("keyed", _KEYED_SLOT_LOOKUP_SQL)):
+        elapsed = []
+        for slot in sample_slots:
+            started = time.perf_counter()
+            cursor.execute(query, slot)
+            rows = cursor.fetchall()
+            elapsed.append((time.perf_counter() - started) * 1000)
+            results.setdefault(slot, {})[name] = sorted(row[0] for row in rows)
+        timings[name] = {
+            "min_ms": round(min(elapsed), 2),
+            "avg_ms": round(sum(elapsed) / len(elapsed), 2),
+            "max_ms": round(max(elapsed), 2),
+        }
+
+    cursor.execute("DROP TABLE IF EXISTS #bench_slot_assignments;")
+    return {
+        "history_rows": history_rows,
+        "days": days,
+        "timings": timings,
+        "results_match": all(by_query["wrapped"] == by_query["keyed"] for by_query in results.values()),
+    }
+
+
+def encode_search_cursor(assignment_date, assignment_id):
+    """Opaque token for the page of /api/search after ``(assignment_date, id)``."""
+    token = json.dumps({"d": normalize_day(assignment_date), "i": assignment_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(token):
+    """Return ``(date, id)`` from a search cursor, or None if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        cursor_date = normalize_day(decoded["d"])
+        cursor_id = decoded["i"]
+    except (ValueError, TypeError, KeyError, UnicodeError, binascii.Error):
+        return None
+    # Ids are written as JSON integers; anything else was not issued here.
+    if not cursor_date or cursor_id.__class__ is not int:
+        return None
+    return cursor_date, cursor_id
+
+
+def json_array_text(rows, fallback):
+    return "[" + ",".join([row.to_json(fallback) for row in rows]) + "]"
+
+
+SEARCH_COLUMNS = (
+    "id", "assignment_date", "courthouse", "assignment_type", "location_group", "location_detail",
+    "judge_name", "part", "shift_time", "assigned_member", "assignment_notes", "created_at",
+)
+
+
+def synthetic_search_rows(count, seed=7):
+    """Driver-shaped tuples in SEARCH_COLUMNS order, newest date first."""
+    generator = random.Random(seed)
+    rows = []
+    first_day = date(2024, 1, 1)
+    for index in range(count):
+        slot = index + 1
+        day = first_day - timedelta(days=slot // 150)
+        rows.append((
+            index + 1,
+            day,
+            f" Courthouse {slot % 4} ",
+            "Courtroom" if slot % 3 else "Fixed Post",
+            f"Floor {slot % 12}",
+            f"Room {slot % 150} ",
+            f"Judge {slot % 90}",
+            str(slot % 5),
+            "" if generator.randrange(4) == 0 else "8:30-4:30",
+            "" if generator.randrange(3) == 0 else f"Deputy {generator.randrange(400)}",
+            "" if generator.randrange(5) else "OPEN",
+            datetime(2023, 12, 1) + timedelta(seconds=index),
+        ))
+    return rows
+
+
+def search_rows_from_values(rows):
+    """Yield AssignmentRow over driver tuples in SEARCH_COLUMNS order, as assignment_rows does."""
+    layout = RowLayout(SEARCH_COLUMNS)
+    for values in rows:
+        yield AssignmentRow(layout, values)
+
+
+def benchmark_row_pipeline(rows, fallback, repeat=5):
+    """
+    Time the dict-per-row pipeline /api/search used before AssignmentRow
+    (a dict per driver row, encoded with ``fallback``, the JSON provider)
+    against AssignmentRow over the same driver rows.
+    """
+    layout = RowLayout(SEARCH_COLUMNS)
+
+    def dicts():
+        return fallback([dict(zip(SEARCH_COLUMNS, values)) for values in rows])
+
+    def compact():
+        return json_array_text([AssignmentRow(layout, values) for values in rows], fallback)
+
+    pipelines = {"dicts": dicts, "compact": compact}
+    timings = {}
+    bodies = {}
+    for name, pipeline in pipelines.items():
+        elapsed = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            bodies[name] = pipeline()
+            elapsed.append((time.perf_counter() - started) * 1000)
+        timings[name] = {"min_ms": round(min(elapsed), 2), "avg_ms": round(sum(elapsed) / len(elapsed), 2)}
+    return {
+        "rows": len(rows),
+        "timings": timings,
+        "results_match": bodies["dicts"] == bodies["compact"],
+    }
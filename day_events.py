@@ -0,0 +1,157 @@
+"""
+Per-day change feed shared by every worker on a host.
+
+Committed writes append one JSON line per change to a spool file for the
+affected date (DAY_EVENTS_DIR/<date>.jsonl). Server-Sent Event streams tail
+that file, so an edit handled by one gunicorn worker reaches boards that are
+connected to any other worker. The byte offset after each line is the SSE
+event id, which lets a reconnecting EventSource resume with Last-Event-ID.
+
+A held stream occupies a worker thread, so held streams need threaded or
+async workers (gunicorn --worker-class gthread --threads N, or gevent), and
+at most DAY_EVENTS_MAX_STREAMS are held per worker; keep it below N so
+ordinary requests still get threads. On sync workers, and past the cap,
+day_event_frames answers with the pending events and closes, and the
+browser's EventSource polls again after DAY_EVENTS_SHORT_POLL_MS.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+DAY_EVENTS_DIR = os.getenv("DAY_EVENTS_DIR") or os.path.join(tempfile.gettempdir(), "court_day_events")
+# A stream ends after this long and the browser reconnects (EventSource does
+# so on its own), which keeps long-lived requests from pinning a worker.
+DAY_EVENTS_STREAM_SECONDS = float(os.getenv("DAY_EVENTS_STREAM_SECONDS", "55"))
+DAY_EVENTS_POLL_SECONDS = float(os.getenv("DAY_EVENTS_POLL_SECONDS", "1"))
+DAY_EVENTS_KEEPALIVE_SECONDS = 15
+DAY_EVENTS_RETENTION_DAYS = int(os.getenv("DAY_EVENTS_RETENTION_DAYS", "3"))
+DAY_EVENTS_MAX_STREAMS = int(os.getenv("DAY_EVENTS_MAX_STREAMS", "8"))
+DAY_EVENTS_SHORT_POLL_MS = int(os.getenv("DAY_EVENTS_SHORT_POLL_MS", "5000"))
+
+_prune_lock = threading.Lock()
+_stream_slots = threading.BoundedSemaphore(max(1, DAY_EVENTS_MAX_STREAMS))
+_last_prune = 0.0
+
+
+def _spool_path(day):
+    return os.path.join(DAY_EVENTS_DIR, f"{day}.jsonl")
+
+
+def publish(events_by_day):
+    """
+    Append events to each day's spool. ``events_by_day`` maps ISO dates to
+    lists of JSON-serializable dicts.
+    """
+    if not events_by_day:
+        return
+    os.makedirs(DAY_EVENTS_DIR, exist_ok=True)
+    published_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    for day, events in events_by_day.items():
+        if not events:
+            continue
+        payload = "".join(
+            json.dumps(dict(event, date=day, at=published_at), default=str, separators=(",", ":")) + "\n"
+            for event in events
+        ).encode("utf-8")
+        # One O_APPEND write per request keeps lines from different workers
+        # from interleaving.
+        fd = os.open(_spool_path(day), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+    _prune_old_spools()
+
+
+def _prune_old_spools():
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < 3600 or not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        _last_prune = now
+        cutoff = now - DAY_EVENTS_RETENTION_DAYS * 86400
+        for entry in os.scandir(DAY_EVENTS_DIR):
+            if entry.name.endswith(".jsonl") and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+    finally:
+        _prune_lock.release()
+
+
+def current_offset(day):
+    try:
+        return os.path.getsize(_spool_path(day))
+    except FileNotFoundError:
+        return 0
+
+
+def read_events(day, offset):
+    """
+    Return ``(events, offset)`` for complete lines written after ``offset``.
+    Each event is an ``(end_offset, line)`` pair.
+    """
+    try:
+        with open(_spool_path(day), "rb") as spool:
+            spool.seek(offset)
+            chunk = spool.read()
+    except FileNotFoundError:
+        return [], offset
+
+    events = []
+    position = offset
+    for line in chunk.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            # A write still in progress; pick it up on the next poll.
+            break
+        position += len(line)
+        events.append((position, line.decode("utf-8").strip()))
+    return events, position
+
+
+def event_stream(day, offset, max_seconds=DAY_EVENTS_STREAM_SECONDS, poll_seconds=DAY_EVENTS_POLL_SECONDS, retry_ms=2000):
+    """
+    Yield SSE frames for ``day`` starting after byte ``offset``. The spool is
+    read at least once, so ``max_seconds=0`` sends what is pending and ends.
+    """
+    yield f"retry: {retry_ms}\n\n"
+
+    if offset > current_offset(day):
+        # The spool was pruned or recreated; the client has to refetch.
+        offset = current_offset(day)
+        yield f"id: {offset}\nevent: reload\ndata: {{}}\n\n"
+
+    deadline = time.monotonic() + max_seconds
+    last_sent = time.monotonic()
+    while True:
+        events, offset = read_events(day, offset)
+        for end_offset, line in events:
+            yield f"id: {end_offset}\nevent: change\ndata: {line}\n\n"
+            last_sent = time.monotonic()
+        if time.monotonic() >= deadline:
+            return
+        if time.monotonic() - last_sent >= DAY_EVENTS_KEEPALIVE_SECONDS:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+        time.sleep(poll_seconds)
+
+
+def day_event_frames(day, offset, can_hold):
+    """
+    SSE frames for one /events request. ``can_hold`` says whether the worker
+    can hold a request open without blocking others (a threaded or async
+    worker); the stream is held only then and while a slot is free.
+    """
+    if can_hold and _stream_slots.acquire(blocking=False):
+        try:
+            yield from event_stream(day, offset)
+        finally:
+            _stream_slots.release()
+        return
+    yield from event_stream(day, offset, max_seconds=0, retry_ms=DAY_EVENTS_SHORT_POLL_MS)
@@ -0,0 +1,159 @@
+"""
+Change counters and the /api/search day-view cache.
+
+dbo.day_versions holds one counter per assignment_date. Every request that
+writes court_assignments or courtroom_meta for a date bumps that date's
+counter inside its own transaction. Readers compare the counter (a single
+primary-key seek) against the version their cached result was built from,
+so a write made by any gunicorn worker invalidates every worker's cache.
+
+dbo.data_versions holds the same kind of counter for data that is not part
+of a day's assignments, keyed by a scope name such as "deputies" or
+"transfers:2024-05-06". Both kinds of counters double as HTTP ETags.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+from db_connect import executemany
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+
+_BUMP_DAY_VERSION_SQL = """
+    MERGE dbo.day_versions WITH (HOLDLOCK) AS target
+    USING (SELECT CAST(? AS DATE) AS assignment_date) AS source
+    ON target.assignment_date = source.assignment_date
+    WHEN MATCHED THEN
+        UPDATE SET version = target.version + 1, updated_at = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN
+        INSERT (assignment_date, version, updated_at)
+        VALUES (source.assignment_date, 1, SYSUTCDATETIME());
+"""
+
+_BUMP_SCOPE_VERSION_SQL = """
+    MERGE dbo.data_versions WITH (HOLDLOCK) AS target
+    USING (SELECT CAST(? AS NVARCHAR(64)) AS scope) AS source
+    ON target.scope = source.scope
+    WHEN MATCHED THEN
+        UPDATE SET version = target.version + 1, updated_at = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN
+        INSERT (scope, version, updated_at)
+        VALUES (source.scope, 1, SYSUTCDATETIME());
+"""
+
+DEPUTIES_SCOPE = "deputies"
+
+
+def transfers_scope(day):
+    return f"transfers:{normalize_day(day)}"
+
+
+def normalize_day(value):
+    """Return a date as an ISO string, or None when it cannot be parsed."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    try:
+        return datetime.strptime((value or "").strip(), "%Y-%m-%d").date().isoformat()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def bump_day_versions(cursor, days):
+    """Advance the counter of every given date; returns the dates bumped."""
+    normalized = sorted({day for day in (normalize_day(value) for value in days) if day})
+    executemany(cursor, _BUMP_DAY_VERSION_SQL, [(day,) for day in normalized])
+    return normalized
+
+
+def day_version(cursor, day):
+    cursor.execute("""
+        SELECT version
+        FROM dbo.day_versions
+        WHERE assignment_date = ?
+    """, (normalize_day(day),))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def bump_scope_versions(cursor, scopes):
+    """Advance the counter of every given scope name."""
+    scopes = sorted({scope for scope in scopes if scope})
+    executemany(cursor, _BUMP_SCOPE_VERSION_SQL, [(scope,) for scope in scopes])
+    return scopes
+
+
+def scope_version(cursor, scope):
+    cursor.execute("""
+        SELECT version
+        FROM dbo.data_versions
+        WHERE scope = ?
+    """, (scope,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+class DayResultCache:
+    """
+    Bounded LRU of day-view results keyed by ``(date, ...)`` tuples.
+
+    Entries remember the day version they were built from and only count as
+    hits while that version is still current.
+    """
+
+    def __init__(self, max_size=SEARCH_CACHE_SIZE):
+        self.max_size = max(0, max_size)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry[0] != version:
+                del self._entries[key]
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_days(self, days):
+        """Drop this worker's entries for the given ISO dates."""
+        days = set(days)
+        if not days:
+            return
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in days]:
+                del self._entries[key]
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({"size": len(self._entries), "max_size": self.max_size})
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 4) if lookups else None
+        return snapshot
@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
+
 import pyodbc
 
 server = os.getenv("AZURE_SQL_SERVER")
@@ -8,7 +12,18 @@ password = os.getenv("AZURE_SQL_PASSWORD")
 
 driver = os.getenv("ODBC_DRIVER", "SQL Server")
 
-def get_conn():
+# The legacy "SQL Server" driver does not support parameter-array binding.
+FAST_EXECUTEMANY = (os.getenv("DB_FAST_EXECUTEMANY") or ("1" if "ODBC Driver" in driver else "0")).strip().lower() in {"1", "true", "yes", "on"}
+
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_IDLE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_IDLE_TIMEOUT_SECONDS", "300"))
+POOL_CHECKOUT_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT_SECONDS", "30"))
+# Connections idle for longer than this are pinged before being handed out.
+POOL_PING_AFTER_SECONDS = float(os.getenv("DB_POOL_PING_AFTER_SECONDS", "30"))
+
+
+def _connect():
     return pyodbc.connect(
         f"DRIVER={{{driver}}};"
         f"SERVER={server};"
@@ -19,3 +34,319 @@ def get_conn():
         "TrustServerCertificate=no;"
         "Connection Timeout=30;"
     )
+
+
+class PoolTimeout(pyodbc.OperationalError):
+    """Raised when no pooled connection became available in time."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pyodbc connection that hands the connection back to
+    its pool on close() instead of tearing down the TLS session.
+    """
+
+    def __init__(self, pool, raw_conn):
+        self._pool = pool
+        self._raw_conn = raw_conn
+        self._discard = False
+        self._rolled_back = False
+
+    def __getattr__(self, name):
+        raw_conn = self.__dict__.get("_raw_conn")
+        if raw_conn is None:
+            raise pyodbc.ProgrammingError("Attempt to use a closed connection.")
+        return getattr(raw_conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.mark_broken_if_unusable()
+        self.close()
+        return False
+
+    def mark_broken_if_unusable(self):
+        raw_conn = self._raw_conn
+        if raw_conn is None:
+            return
+        try:
+            raw_conn.rollback()
+            self._rolled_back = True
+        except pyodbc.Error:
+            self._discard = True
+
+    def close(self):
+        raw_conn = self._raw_conn
+        if raw_conn is None:
+            return
+        self._raw_conn = None
+        self._pool.release(raw_conn, discard=self._discard, rolled_back=self._rolled_back)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of pyodbc connections for a single worker process.
+
+    Idle connections are reused LIFO so the warmest session is handed out
+    first. A checkout that finds the pool below ``min_size`` starts a
+    background thread to open the missing connections, so requests never
+    wait on them; the same happens after connections are lost. Connections idle
+    past ``idle_timeout`` are closed (down to ``min_size``), and connections
+    idle past ``ping_after`` are checked with a ``SELECT 1`` before checkout
+    so a dropped Azure session is replaced instead of failing the request.
+    """
+
+    def __init__(
+        self,
+        connect=_connect,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        idle_timeout=POOL_IDLE_TIMEOUT_SECONDS,
+        checkout_timeout=POOL_CHECKOUT_TIMEOUT_SECONDS,
+        ping_after=POOL_PING_AFTER_SECONDS,
+    ):
+        self._connect = connect
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []
+        self._size = 0
+        self._topping_up = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "creates": 0,
+            "failures": 0,
+            "ping_failures": 0,
+            "reaped": 0,
+            "discarded": 0,
+        }
+
+    def _close_quietly(self, raw_conn):
+        try:
+            raw_conn.close()
+        except pyodbc.Error:
+            pass
+
+    def _reap_idle_locked(self, now):
+        if self.idle_timeout <= 0:
+            return []
+        reaped = []
+        # Oldest idle connections sit at the front of the list.
+        while self._idle and self._size > self.min_size:
+            raw_conn, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            self._stats["reaped"] += 1
+            reaped.append(raw_conn)
+        return reaped
+
+    def _is_alive(self, raw_conn):
+        try:
+            cursor = raw_conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _schedule_top_up(self):
+        """Start a background top-up when the pool holds fewer than ``min_size``."""
+        with self._cond:
+            if self._topping_up or self._size >= self.min_size:
+                return
+            self._topping_up = True
+        threading.Thread(target=self._top_up, name="db-pool-top-up", daemon=True).start()
+
+    def _top_up(self):
+        """Open idle connections until the pool holds ``min_size``."""
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size:
+                        return
+                    self._size += 1
+                try:
+                    raw_conn = self._connect()
+                except Exception:
+                    # Retried by the next checkout that finds the pool short.
+                    with self._cond:
+                        self._size -= 1
+                        self._stats["failures"] += 1
+                        self._cond.notify()
+                    return
+                with self._cond:
+                    self._stats["creates"] += 1
+                    self._idle.insert(0, (raw_conn, time.monotonic()))
+                    self._cond.notify()
+        finally:
+            with self._cond:
+                self._topping_up = False
+
+    def acquire(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+
+        while True:
+            raw_conn = None
+            last_used = None
+            should_create = False
+            reaped = []
+
+            with self._cond:
+                now = time.monotonic()
+                reaped = self._reap_idle_locked(now)
+                while True:
+                    if self._idle:
+                        raw_conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        should_create = True
+                        break
+
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.checkout_timeout:g}s "
+                            f"(pool max size {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            for stale_conn in reaped:
+                self._close_quietly(stale_conn)
+
+            if should_create:
+                try:
+                    raw_conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._stats["failures"] += 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["creates"] += 1
+                    self._stats["checkouts"] += 1
+                self._schedule_top_up()
+                return PooledConnection(self, raw_conn)
+
+            if self.ping_after >= 0 and time.monotonic() - last_used >= self.ping_after:
+                if not self._is_alive(raw_conn):
+                    self._close_quietly(raw_conn)
+                    with self._cond:
+                        self._size -= 1
+                        self._stats["ping_failures"] += 1
+                        self._cond.notify()
+                    continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+            self._schedule_top_up()
+            return PooledConnection(self, raw_conn)
+
+    def release(self, raw_conn, discard=False, rolled_back=False):
+        if not discard and not rolled_back:
+            # Never hand an open transaction to the next borrower.
+            try:
+                raw_conn.rollback()
+            except pyodbc.Error:
+                discard = True
+
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._stats["discarded"] += 1
+            else:
+                self._idle.append((raw_conn, time.monotonic()))
+            reaped = self._reap_idle_locked(time.monotonic())
+            self._cond.notify()
+
+        if discard:
+            self._close_quietly(raw_conn)
+        for stale_conn in reaped:
+            self._close_quietly(stale_conn)
+
+    def stats(self):
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        return snapshot
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this worker's pool, creating a fresh one after a fork."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            # Sockets inherited from a pre-fork parent must not be shared.
+            _pool = ConnectionPool()
+            _pool_pid = pid
+    return _pool
+
+
+def get_conn():
+    return get_pool().acquire()
+
+
+@contextmanager
+def db_connection():
+    """
+    Check out a pooled connection for the duration of a ``with`` block.
+
+    Uncommitted work is rolled back when the block exits, and connections
+    that fail that rollback are discarded rather than returned to the pool.
+    """
+    conn = get_conn()
+    try:
+        yield conn
+    except Exception:
+        conn.mark_broken_if_unusable()
+        raise
+    finally:
+        conn.close()
+
+
+def executemany(cursor, query, rows):
+    """
+    Run a parameterized statement for every row, sending the parameters as
+    a single array when the ODBC driver supports it.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    cursor.fast_executemany = FAST_EXECUTEMANY
+    cursor.executemany(query, rows)
+    return len(rows)
+
+
+def pool_stats():
+    return get_pool().stats()
@@ -0,0 +1,289 @@
+"""
+Deputy status storage.
+
+dbo.deputies.current_status keeps the JSON document the roster pages edit
+(leave/training ranges, weekly unavailability rules and a legacy free-text
+status). Every write also mirrors that document into dbo.deputy_status_ranges,
+one row per range or rule, so "who is off on a date" can be answered with an
+indexed query instead of decoding every deputy's JSON.
+"""
+
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from db_connect import executemany
+
+KIND_RANGE = "range"
+KIND_WEEKLY = "weekly"
+KIND_LEGACY = "legacy"
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_status_payload(status_text):
+    if not status_text:
+        return {"legacy": None, "legacy_meta": {}, "ranges": [], "weekly_unavailable": []}
+
+    try:
+        parsed = json.loads(status_text)
+        if isinstance(parsed, dict) and "ranges" in parsed:
+            return {
+                "legacy": parsed.get("legacy"),
+                "legacy_meta": parsed.get("legacy_meta") or {},
+                "ranges": parsed.get("ranges") or [],
+                "weekly_unavailable": parsed.get("weekly_unavailable") or []
+            }
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    return {"legacy": status_text, "legacy_meta": {}, "ranges": [], "weekly_unavailable": []}
+
+
+@lru_cache(maxsize=1024)
+def _parse_target_date(value):
+    return _parse_date(value)
+
+
+class StatusTimeline:
+    """
+    One deputy's status document compiled for fast per-date lookups.
+
+    Ranges are flattened into non-overlapping segments, each carrying the
+    entry that wins there, so a date resolves with one bisect. Weekly rules
+    always outrank ranges; per weekday they are kept sorted by end date with
+    the best rule for every suffix precomputed, which is again one bisect.
+    """
+
+    __slots__ = ("_segment_starts", "_segments", "_weekday_mask", "_weekly", "_fallback")
+
+    def __init__(self, payload):
+        ranges = payload.get("ranges") or []
+        weekly_rules = payload.get("weekly_unavailable") or []
+
+        entries = []
+        for idx, status_range in enumerate(ranges):
+            start = _parse_date(status_range.get("start_date"))
+            end = _parse_date(status_range.get("end_date"))
+            status_value = status_range.get("status")
+            if start and end and status_value and start <= end:
+                entries.append((start, end, idx, (status_value, status_range.get("changed_by"), status_range.get("changed_at"))))
+        self._segment_starts, self._segments = self._compile_segments(entries)
+
+        by_weekday = [[] for _ in range(7)]
+        for idx, rule in enumerate(weekly_rules):
+            rule_day = (rule.get("day") or "").strip()
+            rule_end = _parse_date(rule.get("end_date"))
+            if not rule_day or not rule_end:
+                continue
+            compiled = (rule_end, len(ranges) + idx, ("Unavailable", rule.get("changed_by"), rule.get("changed_at")))
+            for weekday in range(7):
+                if rule_day == "Any Day" or rule_day == _WEEKDAY_NAMES[weekday]:
+                    by_weekday[weekday].append(compiled)
+
+        self._weekday_mask = 0
+        self._weekly = []
+        for weekday, rules in enumerate(by_weekday):
+            rules.sort(key=lambda item: item[0])
+            best = []
+            winner = None
+            for rule in reversed(rules):
+                if winner is None or rule[1] > winner[1]:
+                    winner = rule
+                best.append(winner[2])
+            best.reverse()
+            self._weekly.append(([rule[0] for rule in rules], best))
+            if rules:
+                self._weekday_mask |= 1 << weekday
+
+        self._fallback = (None, None, None)
+        legacy_status = payload.get("legacy")
+        if legacy_status and not ranges and not weekly_rules:
+            legacy_meta = payload.get("legacy_meta") or {}
+            self._fallback = (legacy_status, legacy_meta.get("changed_by"), legacy_meta.get("changed_at"))
+
+    @staticmethod
+    def _compile_segments(entries):
+        if not entries:
+            return [], []
+
+        boundaries = sorted({entry[0] for entry in entries} | {entry[1] + timedelta(days=1) for entry in entries})
+        starts = []
+        segments = []
+        for seg_start, next_start in zip(boundaries, boundaries[1:]):
+            seg_end = next_start - timedelta(days=1)
+            winner = None
+            for start, end, order, meta in entries:
+                if start <= seg_start and seg_end <= end and (winner is None or order > winner[0]):
+                    winner = (order, meta)
+            if winner is None:
+                continue
+            if segments and segments[-1][2] is winner[1] and segments[-1][1] + timedelta(days=1) == seg_start:
+                segments[-1] = (segments[-1][0], seg_end, winner[1])
+                continue
+            starts.append(seg_start)
+            segments.append((seg_start, seg_end, winner[1]))
+        return starts, segments
+
+    def _lookup(self, target_date):
+        target = target_date if isinstance(target_date, date) else _parse_target_date(target_date)
+        if target:
+            weekday = target.weekday()
+            if self._weekday_mask & (1 << weekday):
+                ends, best = self._weekly[weekday]
+                idx = bisect_left(ends, target)
+                if idx < len(ends):
+                    return best[idx]
+
+            idx = bisect_right(self._segment_starts, target) - 1
+            if idx >= 0 and target <= self._segments[idx][1]:
+                return self._segments[idx][2]
+        return self._fallback
+
+    def meta_for(self, target_date):
+        status_value, changed_by, changed_at = self._lookup(target_date)
+        return {"status": status_value, "changed_by": changed_by, "changed_at": changed_at}
+
+    def status_for(self, target_date):
+        return self._lookup(target_date)[0]
+
+
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+@lru_cache(maxsize=4096)
+def compile_status_timeline(status_text):
+    """Compile (or reuse) the timeline for a current_status value."""
+    return StatusTimeline(parse_status_payload(status_text))
+
+
+def status_ledger_rows(full_name, payload):
+    """
+    Flatten a status payload into dbo.deputy_status_ranges rows.
+
+    ``ordinal`` mirrors the precedence the JSON readers use: later ranges
+    beat earlier ones and every weekly rule beats every range. Entries the
+    readers would ignore (missing status or unparseable dates) are dropped.
+    """
+    rows = []
+    ranges = payload.get("ranges") or []
+    for idx, status_range in enumerate(ranges):
+        start = _parse_date(status_range.get("start_date"))
+        end = _parse_date(status_range.get("end_date"))
+        status_value = status_range.get("status")
+        if not (start and end and status_value):
+            continue
+        rows.append((
+            full_name, KIND_RANGE, status_value, start, end, None, idx,
+            status_range.get("changed_by"), status_range.get("changed_at"),
+        ))
+
+    for idx, rule in enumerate(payload.get("weekly_unavailable") or []):
+        rule_day = (rule.get("day") or "").strip()
+        rule_end = _parse_date(rule.get("end_date"))
+        if not rule_day or not rule_end:
+            continue
+        rows.append((
+            full_name, KIND_WEEKLY, "Unavailable", None, rule_end, rule_day, len(ranges) + idx,
+            rule.get("changed_by"), rule.get("changed_at"),
+        ))
+
+    # The legacy free-text status is ignored once any range or rule exists,
+    # even an invalid one, so it only gets a row when it can apply.
+    legacy_status = payload.get("legacy")
+    if legacy_status and not ranges and not payload.get("weekly_unavailable"):
+        legacy_meta = payload.get("legacy_meta") or {}
+        rows.append((
+            full_name, KIND_LEGACY, legacy_status, None, None, None, 0,
+            legacy_meta.get("changed_by"), legacy_meta.get("changed_at"),
+        ))
+
+    return rows
+
+
+_INSERT_LEDGER_ROW_SQL = """
+    INSERT INTO dbo.deputy_status_ranges (
+        full_name, kind, status, start_date, end_date, rule_day, ordinal, changed_by, changed_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def replace_status_ledger(cursor, full_name, payload):
+    """Rewrite one deputy's ledger rows to match the payload just saved."""
+    cursor.execute("DELETE FROM dbo.deputy_status_ranges WHERE full_name = ?", (full_name,))
+    if payload:
+        executemany(cursor, _INSERT_LEDGER_ROW_SQL, status_ledger_rows(full_name, payload))
+
+
+def rename_status_ledger(cursor, old_full_name, new_full_name):
+    cursor.execute("""
+        UPDATE dbo.deputy_status_ranges
+        SET full_name = ?
+        WHERE full_name = ?
+    """, (new_full_name, old_full_name))
+
+
+def rebuild_status_ledger(cursor):
+    """Rebuild every ledger row from dbo.deputies.current_status."""
+    cursor.execute("""
+        SELECT full_name, current_status
+        FROM dbo.deputies
+        WHERE current_status IS NOT NULL
+    """)
+    rows = []
+    for full_name, status_text in cursor.fetchall():
+        if full_name:
+            rows.extend(status_ledger_rows(full_name, parse_status_payload(status_text)))
+
+    cursor.execute("DELETE FROM dbo.deputy_status_ranges")
+    return executemany(cursor, _INSERT_LEDGER_ROW_SQL, rows)
+
+
+def statuses_between(cursor, start_date, end_date=None):
+    """
+    Return ``{date: {full_name: status}}`` for every date in the window.
+
+    Only deputies with a status on a date appear under it. Precedence matches
+    the JSON readers: the highest-ordinal range or weekly rule covering the
+    date wins; legacy rows only exist for deputies without ranges or rules.
+    """
+    end_date = end_date or start_date
+    cursor.execute("""
+        SELECT r.full_name, r.kind, r.status, r.start_date, r.end_date, r.rule_day, r.ordinal
+        FROM dbo.deputy_status_ranges r
+        WHERE (r.kind = 'range' AND r.start_date <= ? AND r.end_date >= ?)
+           OR (r.kind = 'weekly' AND r.end_date >= ?)
+           OR r.kind = 'legacy'
+    """, (end_date, start_date, start_date))
+    rows = cursor.fetchall()
+
+    statuses = {}
+    day = start_date
+    while day <= end_date:
+        weekday_name = day.strftime("%A")
+        winners = {}
+        for full_name, kind, status_value, row_start, row_end, rule_day, ordinal in rows:
+            if kind == KIND_RANGE:
+                applies = row_start <= day <= row_end
+            elif kind == KIND_WEEKLY:
+                applies = day <= row_end and rule_day in ("Any Day", weekday_name)
+            else:
+                applies = True
+            if not applies:
+                continue
+            current = winners.get(full_name)
+            if current is None or ordinal >= current[0]:
+                winners[full_name] = (ordinal, status_value)
+        statuses[day] = {full_name: winner[1] for full_name, winner in winners.items()}
+        day += timedelta(days=1)
+
+    return statuses
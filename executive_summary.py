@@ -0,0 +1,584 @@
+"""
+Executive summary figures for a work week.
+
+These rules were previously evaluated in the browser by
+templates/executive_summary.html; they are kept here with the same
+semantics so the page can ask the server for finished numbers.
+"""
+
+import re
+from datetime import timedelta
+from functools import lru_cache
+
+from assignment_members import member_key, parse_assigned_member_names
+
+FIXED_POST_BASELINE = 24
+
+_MITCHELL_ROOMS = ["600M", "636M", "231M", "417M", "556C", "215M", "441M", "309M", "228C", "226M", "420M", "400M", "236M", "203M", "451M", "438M"]
+_CUMMINGS_ROOMS = ["225C", "201C", "430C", "329C", "230C", "227C", "540C", "404C", "523C", "528C", "113C"]
+
+_MITCHELL_POSTS = [
+    ("Calvert", "8:00 AM", "0800-1"),
+    ("Calvert", "8:00 AM", "0800-2"),
+    ("Calvert", "8:00 AM", "0800-3"),
+    ("Lexington", "7:00 AM - 3:00 PM", "0700-1500"),
+    ("Lexington", "3:00 PM - 11:00 PM", "1500-2300"),
+    ("Lexington", "11:00 PM - 7:00 AM", "2300-0700"),
+    ("Fayette H/C Console room", "7:00 AM", "0700"),
+    ("Fayette H/C Console room", "7:15 AM", "0715"),
+    ("Lock Up West", "1 of 2", "OPEN-1"),
+    ("Lock Up West", "2 of 2", "OPEN-2"),
+    ("Jury Room", "7:30 AM", "0730"),
+    ("St. Paul", "7:30 AM", "0730"),
+    ("St. Paul", "8:30 AM", "0830"),
+    ("Mitchell Office", "8:00 AM", "0800"),
+    ("Rover", "7:00 AM", "0700"),
+    ("Judges", "7:00 AM", "0700"),
+]
+
+_CUMMINGS_POSTS = [
+    ("Cummings", "8:00 AM", "0800"),
+    ("Cummings", "8:30 AM", "0830-1"),
+    ("Cummings", "8:30 AM", "0830-2"),
+    ("Fayette St. H/C", "7:15 AM", "0715"),
+    ("Fayette St. H/C", "9:00 AM", "0900"),
+    ("Console Room", "8:30 AM", "0830-1"),
+    ("Console Room", "8:30 AM", "0830-2"),
+    ("Lock Up East", "8:00 AM", "0800"),
+    ("Garage", "6:00 AM", "0600"),
+    ("Garage", "4:00 PM", "1600"),
+    ("Family Desk", "8:00 AM", "0800"),
+    ("Transportation", "", ""),
+]
+
+_COURT_SECURITY_DIVISIONS = {
+    "court security officer",
+    "court security officer division",
+    "court security",
+    "court security division",
+}
+
+_EXCLUDED_COURT_SECURITY_RANKS = {"LT", "CAPT", "MJR"}
+
+# capacity tag -> (court capable, armed)
+_CAPABILITY_CATEGORY_RULES = {
+    "DEPUTY": (True, True),
+    "SPO-A: COURT TRAINED (FT)": (True, True),
+    "SPO-A: COURT TRAINED (CONTRACTOR)": (True, True),
+    "SPO-A: (FT)": (False, True),
+    "SPO-A: (CONTRACTOR)": (False, True),
+    "SPO: COURT TRAINED(FT)": (True, False),
+    "SPO COURT TRAINED (CONTRACTOR)": (True, False),
+    "K9": (True, True),
+    "CSO": (False, False),
+    "CADET": (False, False),
+}
+
+_DEFAULT_OT_SHIFT_RANGES = {
+    "Mitchell": {
+        "rover ot|1630-1900": "4:30 PM - 7:00 PM",
+        "rover|1630-1900": "4:30 PM - 7:00 PM",
+        "judges ot|0700": "7:00 AM - 3:00 PM",
+        "judges|0700": "7:00 AM - 3:00 PM",
+    },
+    "Cummings": {
+        "garage|1600": "4:30 PM - 9:00 PM",
+        "garage ot|1600": "4:30 PM - 9:00 PM",
+    },
+}
+
+_AMPM_TIME_RE = re.compile(r"^([0-9]{1,2})(?::([0-9]{2}))?\s*(AM|PM)$")
+_HHMM_TIME_RE = re.compile(r"^([0-9]{1,2})([0-9]{2})$")
+_BARE_TIME_RE = re.compile(r"^([0-9]{1,2})(?::([0-9]{2}))?$")
+_SUFFIX_RE = re.compile(r"\b(AM|PM)\b")
+
+
+def _text(value):
+    return (value or "").strip()
+
+
+def work_week(any_day):
+    """Monday through Friday of the week containing ``any_day``."""
+    monday = any_day - timedelta(days=any_day.weekday())
+    return [monday + timedelta(days=offset) for offset in range(5)]
+
+
+def parse_assigned_member_value(value):
+    text = _text(value)
+    if not text:
+        return []
+    if "||" in text:
+        return [name.strip() for name in re.split(r"\s*\|\|\s*", text) if name.strip()]
+    if "\n" in text:
+        return [name.strip() for name in re.split(r"\n+", text) if name.strip()]
+    return [text]
+
+
+def required_deputies_for_courtroom_label(value):
+    normalized = _text(value).upper()
+    if not normalized:
+        return 0
+    if normalized in {"CLOSED", "NO DEPUTY", "NO DEPUTIES", "CIVIL - NO DEPUTIES", "ON LEAVE"}:
+        return 0
+    if normalized == "NEED 2 DEPUTIES":
+        return 2
+    # Older free-text labels, like OPEN and the NEED 1 variants, need one deputy.
+    return 1
+
+
+def is_open_court_label(normalized):
+    return normalized == "OPEN" or normalized.startswith("OPEN-") or normalized == "WAITING TO RECEIVE CASE"
+
+
+def fixed_post_requirement_group(courthouse, post, detail, part, count_named_transportation=False):
+    """
+    The requirement a fixed post slot counts toward, or None for optional
+    slots. Slots sharing a group are one requirement, filled by any of them.
+
+    The summary never counts Transportation. The board's totals badges count
+    named transportation slots and only skip the placeholder row without a
+    part or detail (``count_named_transportation``).
+    """
+    courthouse = _text(courthouse).lower()
+    post = _text(post).lower()
+    detail = _text(detail).lower()
+    part = _text(part).lower()
+
+    if post == "transportation" and (not count_named_transportation or (not part and not detail)):
+        return None
+    if courthouse == "mitchell" and post == "calvert" and part == "0800-3":
+        return None
+    if courthouse == "mitchell" and post in {"lock up west", "lockup west"} and part == "open-2":
+        return None
+    if courthouse == "juvenile" and post == "lobby" and part == "0830-1630-3":
+        return None
+    if courthouse == "juvenile" and post == "lockup":
+        return None
+
+    if courthouse == "mitchell" and post in {"jury room", "st. paul"}:
+        return f"{courthouse}|jury-stpaul-combined"
+
+    if courthouse == "cummings" and post == "cummings":
+        if part == "0800":
+            return f"{courthouse}|cummings-0800"
+        if part.startswith("0830"):
+            return None
+
+    return "|".join([courthouse, post, detail, part])
+
+
+def is_court_security(deputy):
+    return _text(deputy.get("division")).lower() in _COURT_SECURITY_DIVISIONS
+
+
+def _is_excluded_court_security_rank(deputy):
+    return re.sub(r"[^A-Z]", "", (deputy.get("rank") or "").upper()) in _EXCLUDED_COURT_SECURITY_RANKS
+
+
+def is_out_status(status):
+    normalized = _text(status).lower()
+    if not normalized:
+        return False
+    return any(indicator in normalized for indicator in ("scheduled leave", "unscheduled", "unavailable", "training", "out"))
+
+
+def unavailable_breakdown(status):
+    normalized = (status or "").lower()
+    is_unscheduled = "unscheduled leave" in normalized or normalized == "unscheduled"
+    is_scheduled = not is_unscheduled and ("scheduled leave" in normalized or normalized == "leave")
+    return {
+        "scheduled_leave": 1 if is_scheduled else 0,
+        "unscheduled_leave": 1 if is_unscheduled else 0,
+        "unavailable": 1 if "unavailable" in normalized else 0,
+        "training": 1 if "training" in normalized else 0,
+    }
+
+
+def summarize_available_deputies(deputies):
+    summary = {"total": 0, "court": 0, "armed": 0, "basic": 0, "by_capacity_tag": {}}
+    for deputy in deputies:
+        summary["total"] += 1
+        court, armed = _CAPABILITY_CATEGORY_RULES.get(_text(deputy.get("capacity_tag")).upper(), (False, False))
+        if court:
+            summary["court"] += 1
+        if armed:
+            summary["armed"] += 1
+        if not court and not armed:
+            summary["basic"] += 1
+        tag_label = _text(deputy.get("capacity_tag")) or "UNSPECIFIED"
+        summary["by_capacity_tag"][tag_label] = summary["by_capacity_tag"].get(tag_label, 0) + 1
+    return summary
+
+
+def count_assigned_courts(assignments):
+    return sum(
+        required_deputies_for_courtroom_label(row.get("assignment_notes"))
+        for row in assignments
+        if _text(row.get("assignment_type")) == "Courtroom"
+    )
+
+
+def _courtroom_rows_for_counts(assignments):
+    courtroom_rows = [row for row in assignments if _text(row.get("assignment_type")) == "Courtroom"]
+    rows_to_count = []
+
+    for courthouse, rooms in (("Mitchell", _MITCHELL_ROOMS), ("Cummings", _CUMMINGS_ROOMS)):
+        first_by_room = {}
+        for row in courtroom_rows:
+            if _text(row.get("courthouse")) == courthouse:
+                first_by_room.setdefault(_text(row.get("location_detail")), row)
+        for room in rooms:
+            rows_to_count.append(first_by_room.get(room) or {"assignment_type": "Courtroom"})
+
+    rows_to_count.extend(row for row in courtroom_rows if _text(row.get("courthouse")) == "Juvenile")
+    return rows_to_count
+
+
+def _fixed_post_rows_for_counts(assignments):
+    fixed_posts = [row for row in assignments if _text(row.get("assignment_type")) == "Fixed Post"]
+
+    def _pick_preferred(rows):
+        for row in rows:
+            if _text(row.get("assigned_member")):
+                return row
+        return rows[0] if rows else None
+
+    selected_rows = []
+    for courthouse, posts in (("Mitchell", _MITCHELL_POSTS), ("Cummings", _CUMMINGS_POSTS)):
+        courthouse_rows = [row for row in fixed_posts if _text(row.get("courthouse")) == courthouse]
+        for post, detail, part in posts:
+            if courthouse.lower() in {"mitchell", "cummings"} and "console room" in post.lower():
+                continue
+            post_rows = [row for row in courthouse_rows if _text(row.get("location_group")) == post]
+            slot_matches = [
+                row for row in post_rows
+                if (part and _text(row.get("part")) == part)
+                or (detail and _text(row.get("location_detail")) == detail)
+                or (not part and not detail)
+            ]
+            fallback_matches = [
+                row for row in post_rows
+                if not _text(row.get("part")) and not _text(row.get("location_detail"))
+            ]
+            selected_rows.append(_pick_preferred(slot_matches) or _pick_preferred(fallback_matches) or {
+                "assignment_type": "Fixed Post",
+                "courthouse": courthouse,
+                "location_group": post,
+                "part": part,
+            })
+    return selected_rows
+
+
+def assignment_totals(assignments):
+    totals = {"vacant": 0, "filled": 0, "open": 0}
+    fixed_post_groups = {}
+
+    for row in _fixed_post_rows_for_counts(assignments) + _courtroom_rows_for_counts(assignments):
+        row_type = _text(row.get("assignment_type"))
+        assigned_count = len(parse_assigned_member_value(row.get("assigned_member")))
+
+        if row_type == "Fixed Post":
+            group_key = fixed_post_requirement_group(
+                row.get("courthouse"), row.get("location_group"), row.get("location_detail"), row.get("part"),
+            )
+            if group_key and assigned_count > fixed_post_groups.get(group_key, 0):
+                fixed_post_groups[group_key] = assigned_count
+            continue
+
+        if row_type != "Courtroom":
+            continue
+
+        label = _text(row.get("assignment_notes")).upper()
+        required = required_deputies_for_courtroom_label(label)
+        if required == 0:
+            continue
+        if is_open_court_label(label):
+            totals["open"] += 1
+            continue
+
+        totals["filled"] += min(assigned_count, required)
+        totals["vacant"] += max(required - assigned_count, 0)
+
+    for assigned_count in fixed_post_groups.values():
+        if assigned_count > 0:
+            totals["filled"] += 1
+        else:
+            totals["vacant"] += 1
+
+    return totals
+
+
+def count_borrowed_deputies(assignments, deputies_by_name):
+    borrowed = set()
+    for row in assignments:
+        for name in parse_assigned_member_value(row.get("assigned_member")):
+            normalized = name.strip().lower()
+            deputy = deputies_by_name.get(normalized)
+            if normalized and deputy and not is_court_security(deputy):
+                borrowed.add(normalized)
+    return len(borrowed)
+
+
+def _ot_post_name(value):
+    return re.sub(r"\s+", " ", _text(value).lower())
+
+
+def _ot_post_token(value):
+    return re.sub(r"[^a-z0-9]+", "", _text(value).lower())
+
+
+def _is_mitchell_fixed_post_ot_row(row):
+    if _text(row.get("assignment_type")) != "Fixed Post" or _text(row.get("courthouse")) != "Mitchell":
+        return False
+
+    post = _ot_post_name(row.get("location_group"))
+    part = _text(row.get("part")).lower()
+    if post in {"rover", "rover ot"} and part == "1630-1900":
+        return True
+    if post in {"judges", "judges ot"} and part == "0700":
+        return True
+
+    token = _ot_post_token(" ".join([
+        row.get("location_group") or "",
+        row.get("location_detail") or "",
+        row.get("part") or "",
+        row.get("assignment_notes") or "",
+    ]))
+    return "roverot" in token or "judgesot" in token or (
+        "ot" in token and ("rover" in token or "judges" in token)
+    )
+
+
+def _is_fixed_post_ot_row(row):
+    if _text(row.get("assignment_type")) != "Fixed Post":
+        return False
+    if _is_mitchell_fixed_post_ot_row(row):
+        return True
+
+    courthouse = _text(row.get("courthouse")).lower()
+    part = _text(row.get("part")).lower()
+    post_name = _text(row.get("location_group") or row.get("location_detail")).lower()
+    if courthouse == "cummings" and part == "1600" and "garage" in post_name:
+        return True
+    return "ot" in post_name
+
+
+def _default_fixed_post_shift_range(row):
+    if _text(row.get("assignment_type")) != "Fixed Post":
+        return ""
+
+    courthouse = _text(row.get("courthouse"))
+    post = _ot_post_name(row.get("location_group") or row.get("location_detail"))
+    part = _text(row.get("part")).lower()
+    exact_match = _DEFAULT_OT_SHIFT_RANGES.get(courthouse, {}).get(f"{post}|{part}")
+    if exact_match:
+        return exact_match
+
+    token = _ot_post_token(" ".join([
+        row.get("location_group") or "",
+        row.get("location_detail") or "",
+        row.get("assignment_notes") or "",
+    ]))
+    if courthouse == "Mitchell":
+        if "roverot" in token or ("rover" in token and "ot" in token):
+            return "4:30 PM - 7:00 PM"
+        if "judgesot" in token or ("judges" in token and "ot" in token):
+            return "7:00 AM - 3:00 PM"
+    if courthouse == "Cummings" and "garage" in token:
+        return "4:30 PM - 9:00 PM"
+    return ""
+
+
+def _parse_shift_minutes(value, fallback_suffix):
+    normalized = value.upper().replace(".", "").strip()
+
+    match = _AMPM_TIME_RE.match(normalized)
+    if match:
+        hour = int(match.group(1)) % 12
+        if match.group(3) == "PM":
+            hour += 12
+        return hour * 60 + int(match.group(2) or 0)
+
+    match = _HHMM_TIME_RE.match(normalized)
+    if match:
+        return int(match.group(1)) * 60 + int(match.group(2))
+
+    match = _BARE_TIME_RE.match(normalized)
+    if match and fallback_suffix:
+        hour = int(match.group(1)) % 12
+        if fallback_suffix == "PM":
+            hour += 12
+        return hour * 60 + int(match.group(2) or 0)
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse_shift_duration_hours(shift_text):
+    raw = _text(shift_text)
+    if not raw or "-" not in raw:
+        return 0
+
+    pieces = raw.split("-")
+    start_raw = pieces[0].strip()
+    end_raw = pieces[1].strip()
+    if not start_raw or not end_raw:
+        return 0
+
+    start_suffix = _SUFFIX_RE.search(start_raw.upper())
+    end_suffix = _SUFFIX_RE.search(end_raw.upper())
+    start_suffix = start_suffix.group(1) if start_suffix else None
+    end_suffix = end_suffix.group(1) if end_suffix else None
+
+    start_minutes = _parse_shift_minutes(start_raw, start_suffix or end_suffix)
+    end_minutes = _parse_shift_minutes(end_raw, end_suffix or start_suffix)
+    if start_minutes is None or end_minutes is None:
+        return 0
+
+    diff = end_minutes - start_minutes
+    if diff < 0:
+        diff += 24 * 60
+    return diff / 60
+
+
+def overtime_hours_for_row(row):
+    for candidate in (
+        row.get("shift_time"),
+        row.get("location_detail"),
+        _default_fixed_post_shift_range(row),
+        row.get("part"),
+    ):
+        hours = parse_shift_duration_hours(candidate)
+        if hours > 0:
+            return hours
+
+    if not _is_mitchell_fixed_post_ot_row(row):
+        return 0
+
+    part = _text(row.get("part")).lower()
+    if part == "0700":
+        return 8
+    if part == "1630-1900":
+        return 2.5
+    return 0
+
+
+OVERTIME_COLUMNS = (
+    "assignment_type", "courthouse", "location_group", "location_detail", "part", "shift_time", "assignment_notes",
+)
+OVERTIME_GROUPS = ("deputy", "courthouse")
+
+
+@lru_cache(maxsize=8192)
+def _overtime_slot_hours(values):
+    # The same slot recurs on every day of a range, so its hours are cached.
+    row = dict(zip(OVERTIME_COLUMNS, values))
+    if not _is_fixed_post_ot_row(row) and _text(row.get("assignment_type")) != "Overtime":
+        return 0
+    return overtime_hours_for_row(row)
+
+
+def overtime_row_hours(row):
+    """Overtime hours of a row's shift; 0 for rows that are not overtime."""
+    return _overtime_slot_hours(tuple(row.get(name) for name in OVERTIME_COLUMNS))
+
+
+def total_overtime_hours(assignments):
+    total = 0
+    for row in assignments:
+        if not parse_assigned_member_value(row.get("assigned_member")):
+            continue
+        total += overtime_row_hours(row)
+    return total
+
+
+def overtime_report(assignments, by):
+    """
+    Overtime hours per day and per ``by`` group ("deputy" or "courthouse").
+
+    A courthouse is credited each staffed overtime shift once, as in
+    total_overtime_hours. Every deputy named on a shift is credited its
+    full hours, so deputy figures can add up to more than the total.
+    """
+    if by not in OVERTIME_GROUPS:
+        raise ValueError(f"by must be one of {', '.join(OVERTIME_GROUPS)}")
+
+    by_day = {}
+    groups = {}
+    total = 0
+    for row in assignments:
+        if not parse_assigned_member_value(row.get("assigned_member")):
+            continue
+        hours = overtime_row_hours(row)
+        if not hours:
+            continue
+        total += hours
+
+        if by == "courthouse":
+            courthouse = _text(row.get("courthouse"))
+            credited = [(courthouse.lower(), courthouse)]
+        else:
+            credited = [(member_key(name), name) for name in parse_assigned_member_names(row.get("assigned_member"))]
+
+        day = row.get("assignment_date")
+        for key, label in credited:
+            group = groups.setdefault(key, {by: label, "hours": 0, "shifts": 0})
+            group["hours"] += hours
+            group["shifts"] += 1
+            day_group = by_day.setdefault((day, key), {"date": day, by: group[by], "hours": 0})
+            day_group["hours"] += hours
+
+    return {
+        "total_hours": round(total, 2),
+        "days": [
+            dict(entry, hours=round(entry["hours"], 2))
+            for _, entry in sorted(by_day.items(), key=lambda item: (item[0][0], item[0][1]))
+        ],
+        "totals": [
+            dict(groups[key], hours=round(groups[key]["hours"], 2))
+            for key in sorted(groups)
+        ],
+    }
+
+
+def summarize_day(assignments, deputies, courtroom_meta_rows):
+    """
+    Figures for one day.
+
+    ``deputies`` carry the status in effect on that day under "status";
+    ``assignments`` are the deduplicated rows /api/search returns.
+    """
+    court_security = [
+        deputy for deputy in deputies
+        if is_court_security(deputy) and not _is_excluded_court_security_rank(deputy)
+    ]
+
+    unavailable = {"scheduled_leave": 0, "unscheduled_leave": 0, "unavailable": 0, "training": 0}
+    for deputy in court_security:
+        for key, value in unavailable_breakdown(deputy.get("status")).items():
+            unavailable[key] += value
+
+    available = summarize_available_deputies(
+        deputy for deputy in court_security if not is_out_status(deputy.get("status"))
+    )
+    deputies_by_name = {_text(deputy.get("full_name")).lower(): deputy for deputy in deputies}
+    needed_courts = count_assigned_courts(assignments)
+    totals = assignment_totals(assignments)
+
+    return {
+        "needed": needed_courts + FIXED_POST_BASELINE,
+        "needed_courts": needed_courts,
+        "needed_posts": FIXED_POST_BASELINE,
+        "available": available["total"],
+        "available_court": available["court"],
+        "available_armed": available["armed"],
+        "available_basic": available["basic"],
+        "available_by_capacity_tag": available["by_capacity_tag"],
+        "assignment_totals": totals,
+        "high_profile_cases": sum(1 for row in courtroom_meta_rows if row.get("is_high_profile")),
+        "unscheduled_courts": sum(1 for row in courtroom_meta_rows if row.get("is_unscheduled")),
+        "open_courts": totals["open"],
+        "total_overtime_hours": total_overtime_hours(assignments),
+        "unavailable_breakdown": unavailable,
+        "borrowed": count_borrowed_deputies(assignments, deputies_by_name),
+    }
@@ -0,0 +1,565 @@
+"""
+Versioned schema migrations.
+
+Each migration is registered with a unique, increasing version number and
+runs exactly once per database. Applied versions are recorded in
+dbo.schema_migrations, so request handlers never need to issue DDL.
+
+Migrations only change the schema. A table derived from other data is
+filled by the rebuild command its migration names; `flask migrate` runs
+those after every pending migration has been applied, so they always run
+the application's current code against the schema it was written for.
+"""
+
+from db_connect import executemany
+
+MIGRATIONS = []
+REBUILDS = {}
+
+_APPLOCK_RESOURCE = "court_scheduling_schema_migrations"
+
+
+def migration(version, name, rebuild=None):
+    def register(step):
+        if any(existing[0] == version for existing in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append((version, name, step))
+        if rebuild:
+            REBUILDS[version] = rebuild
+        return step
+    return register
+
+
+def rebuilds_for(versions):
+    """Return the rebuild commands the given migrations need, once each, in version order."""
+    commands = []
+    for version in sorted(versions):
+        command = REBUILDS.get(version)
+        if command and command not in commands:
+            commands.append(command)
+    return commands
+
+
+@migration(1, "create courtroom_meta")
+def _create_courtroom_meta(cursor):
+    # Guarded so databases created by the old per-request DDL upgrade cleanly.
+    cursor.execute("""
+        IF OBJECT_ID('dbo.courtroom_meta', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.courtroom_meta (
+                assignment_date DATE NOT NULL,
+                courthouse NVARCHAR(100) NOT NULL,
+                location_detail NVARCHAR(100) NOT NULL,
+                part NVARCHAR(100) NOT NULL DEFAULT '',
+                start_time NVARCHAR(16) NULL,
+                break_time NVARCHAR(16) NULL,
+                restart_time NVARCHAR(16) NULL,
+                adjourned_time NVARCHAR(16) NULL,
+                start_to_break_minutes INT NULL,
+                break_to_restart_minutes INT NULL,
+                restart_to_adjourned_minutes INT NULL,
+                total_time_up_minutes INT NULL,
+                is_down BIT NOT NULL DEFAULT 0,
+                is_high_profile BIT NOT NULL DEFAULT 0,
+                is_unscheduled BIT NOT NULL DEFAULT 0,
+                unscheduled_changed_by NVARCHAR(255) NULL,
+                unscheduled_changed_at NVARCHAR(64) NULL,
+                updated_at DATETIME NOT NULL DEFAULT GETDATE(),
+                CONSTRAINT PK_courtroom_meta PRIMARY KEY (assignment_date, courthouse, location_detail, part)
+            )
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'break_time') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD break_time NVARCHAR(16) NULL;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'start_to_break_minutes') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD start_to_break_minutes INT NULL;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'break_to_restart_minutes') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD break_to_restart_minutes INT NULL;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'restart_to_adjourned_minutes') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD restart_to_adjourned_minutes INT NULL;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'total_time_up_minutes') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD total_time_up_minutes INT NULL;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'is_high_profile') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD is_high_profile BIT NOT NULL CONSTRAINT DF_courtroom_meta_is_high_profile DEFAULT 0;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'is_unscheduled') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD is_unscheduled BIT NOT NULL CONSTRAINT DF_courtroom_meta_is_unscheduled DEFAULT 0;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'unscheduled_changed_by') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD unscheduled_changed_by NVARCHAR(255) NULL;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'unscheduled_changed_at') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta ADD unscheduled_changed_at NVARCHAR(64) NULL;
+        END
+    """)
+
+
+@migration(2, "create deputy_transfers")
+def _create_deputy_transfers(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.deputy_transfers', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.deputy_transfers (
+                assignment_date DATE NOT NULL,
+                full_name NVARCHAR(255) NOT NULL,
+                transfer_out_time DATETIME NULL,
+                transfer_in_time DATETIME NULL,
+                transfer_history NVARCHAR(MAX) NULL,
+                CONSTRAINT PK_deputy_transfers PRIMARY KEY (assignment_date, full_name)
+            )
+        END
+
+        IF COL_LENGTH('dbo.deputy_transfers', 'transfer_history') IS NULL
+        BEGIN
+            ALTER TABLE dbo.deputy_transfers ADD transfer_history NVARCHAR(MAX) NULL;
+        END
+    """)
+
+
+@migration(3, "create materialized_days ledger")
+def _create_materialized_days(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.materialized_days', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.materialized_days (
+                assignment_date DATE NOT NULL,
+                materialized_at DATETIME NOT NULL DEFAULT GETDATE(),
+                seeded_rows INT NULL,
+                CONSTRAINT PK_materialized_days PRIMARY KEY (assignment_date)
+            )
+        END
+    """)
+
+
+@migration(4, "create deputy_status_ranges", rebuild="rebuild-status-ledger")
+def _create_deputy_status_ranges(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.deputy_status_ranges', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.deputy_status_ranges (
+                id INT IDENTITY(1,1) NOT NULL,
+                full_name NVARCHAR(255) NOT NULL,
+                kind NVARCHAR(16) NOT NULL,
+                status NVARCHAR(100) NOT NULL,
+                start_date DATE NULL,
+                end_date DATE NULL,
+                rule_day NVARCHAR(16) NULL,
+                ordinal INT NOT NULL,
+                changed_by NVARCHAR(255) NULL,
+                changed_at NVARCHAR(64) NULL,
+                CONSTRAINT PK_deputy_status_ranges PRIMARY KEY (id)
+            )
+        END
+
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_deputy_status_ranges_kind_dates')
+        BEGIN
+            CREATE INDEX IX_deputy_status_ranges_kind_dates
+                ON dbo.deputy_status_ranges (kind, end_date, start_date)
+                INCLUDE (full_name, status, rule_day, ordinal);
+        END
+
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_deputy_status_ranges_full_name')
+        BEGIN
+            CREATE INDEX IX_deputy_status_ranges_full_name
+                ON dbo.deputy_status_ranges (full_name, kind);
+        END
+    """)
+
+
+@migration(5, "add normalized slot key columns")
+def _add_slot_key_columns(cursor):
+    # Persisted, indexable copies of the trimmed, lower-cased slot columns so
+    # slot lookups can seek instead of wrapping every row in LOWER/LTRIM/RTRIM.
+    cursor.execute("""
+        IF COL_LENGTH('dbo.court_assignments', 'group_key') IS NULL
+        BEGIN
+            ALTER TABLE dbo.court_assignments
+                ADD group_key AS CAST(LOWER(LTRIM(RTRIM(ISNULL(location_group, '')))) AS NVARCHAR(255)) PERSISTED;
+        END
+
+        IF COL_LENGTH('dbo.court_assignments', 'detail_key') IS NULL
+        BEGIN
+            ALTER TABLE dbo.court_assignments
+                ADD detail_key AS CAST(LOWER(LTRIM(RTRIM(ISNULL(location_detail, '')))) AS NVARCHAR(255)) PERSISTED;
+        END
+
+        IF COL_LENGTH('dbo.court_assignments', 'part_key') IS NULL
+        BEGIN
+            ALTER TABLE dbo.court_assignments
+                ADD part_key AS CAST(LOWER(LTRIM(RTRIM(ISNULL(part, '')))) AS NVARCHAR(100)) PERSISTED;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'detail_key') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta
+                ADD detail_key AS CAST(LOWER(LTRIM(RTRIM(location_detail))) AS NVARCHAR(100)) PERSISTED;
+        END
+
+        IF COL_LENGTH('dbo.courtroom_meta', 'part_key') IS NULL
+        BEGIN
+            ALTER TABLE dbo.courtroom_meta
+                ADD part_key AS CAST(LOWER(LTRIM(RTRIM(part))) AS NVARCHAR(100)) PERSISTED;
+        END
+    """)
+    cursor.execute("""
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_court_assignments_group_slot')
+        BEGIN
+            CREATE INDEX IX_court_assignments_group_slot
+                ON dbo.court_assignments (assignment_date, courthouse, assignment_type, group_key, part_key, detail_key)
+                INCLUDE (assigned_member, assignment_notes, shift_time, judge_name);
+        END
+
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_court_assignments_detail_slot')
+        BEGIN
+            CREATE INDEX IX_court_assignments_detail_slot
+                ON dbo.court_assignments (assignment_date, courthouse, assignment_type, detail_key, part_key)
+                INCLUDE (location_group, assigned_member, assignment_notes, shift_time);
+        END
+
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_courtroom_meta_slot')
+        BEGIN
+            CREATE INDEX IX_courtroom_meta_slot
+                ON dbo.courtroom_meta (assignment_date, courthouse, detail_key, part_key)
+                INCLUDE (is_high_profile, is_unscheduled, unscheduled_changed_by, unscheduled_changed_at);
+        END
+    """)
+
+
+@migration(6, "create court_assignment_members", rebuild="rebuild-assignment-members")
+def _create_court_assignment_members(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.court_assignment_members', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.court_assignment_members (
+                assignment_id INT NOT NULL,
+                ordinal INT NOT NULL,
+                member_name NVARCHAR(255) NOT NULL,
+                member_key NVARCHAR(255) NOT NULL,
+                assignment_date DATE NOT NULL,
+                CONSTRAINT PK_court_assignment_members PRIMARY KEY (assignment_id, ordinal),
+                CONSTRAINT FK_court_assignment_members_assignment
+                    FOREIGN KEY (assignment_id) REFERENCES dbo.court_assignments (id) ON DELETE CASCADE
+            )
+        END
+
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_court_assignment_members_member_date')
+        BEGIN
+            CREATE INDEX IX_court_assignment_members_member_date
+                ON dbo.court_assignment_members (member_key, assignment_date)
+                INCLUDE (member_name);
+        END
+    """)
+
+
+@migration(7, "create day_versions")
+def _create_day_versions(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.day_versions', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.day_versions (
+                assignment_date DATE NOT NULL,
+                version BIGINT NOT NULL,
+                updated_at DATETIME2 NOT NULL,
+                CONSTRAINT PK_day_versions PRIMARY KEY (assignment_date)
+            )
+        END
+    """)
+
+
+@migration(8, "create data_versions")
+def _create_data_versions(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.data_versions', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.data_versions (
+                scope NVARCHAR(64) NOT NULL,
+                version BIGINT NOT NULL,
+                updated_at DATETIME2 NOT NULL,
+                CONSTRAINT PK_data_versions PRIMARY KEY (scope)
+            )
+        END
+    """)
+
+
+@migration(9, "index staffing_daily by cell and date")
+def _index_staffing_cells(cursor):
+    cursor.execute("""
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_staffing_daily_cell_date')
+        BEGIN
+            CREATE INDEX IX_staffing_daily_cell_date
+                ON dbo.staffing_daily (row_number, column_name, staffing_date DESC)
+                INCLUDE (deputy_name);
+        END
+
+        IF OBJECT_ID('dbo.staffing_cells', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.staffing_cells (
+                row_number INT NOT NULL,
+                column_name NVARCHAR(100) NOT NULL,
+                CONSTRAINT PK_staffing_cells PRIMARY KEY (row_number, column_name)
+            )
+        END
+    """)
+    cursor.execute("""
+        INSERT INTO dbo.staffing_cells (row_number, column_name)
+        SELECT DISTINCT sd.row_number, sd.column_name
+        FROM dbo.staffing_daily sd
+        WHERE sd.row_number IS NOT NULL
+          AND sd.column_name IS NOT NULL
+          AND NOT EXISTS (
+                SELECT 1
+                FROM dbo.staffing_cells c
+                WHERE c.row_number = sd.row_number
+                  AND c.column_name = sd.column_name
+          )
+    """)
+
+
+@migration(10, "make the assignment slot key unique")
+def _unique_assignment_slots(cursor):
+    # Existing duplicates lose to the same rule, on the same trimmed and
+    # case-sensitive key, the board used to apply on read; the index can
+    # only be built once each slot has a single row.
+    cursor.execute("""
+        ;WITH ranked AS (
+            SELECT ca.assignment_date,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY ca.assignment_date,
+                                    LTRIM(RTRIM(ISNULL(ca.courthouse, ''))) COLLATE Latin1_General_BIN2,
+                                    LTRIM(RTRIM(ISNULL(ca.assignment_type, ''))) COLLATE Latin1_General_BIN2,
+                                    LTRIM(RTRIM(ISNULL(ca.location_group, ''))) COLLATE Latin1_General_BIN2,
+                                    LTRIM(RTRIM(ISNULL(ca.location_detail, ''))) COLLATE Latin1_General_BIN2,
+                                    LTRIM(RTRIM(ISNULL(ca.part, ''))) COLLATE Latin1_General_BIN2
+                       ORDER BY
+                           CASE WHEN LTRIM(RTRIM(ISNULL(ca.assigned_member, ''))) <> '' THEN 1 ELSE 0 END DESC,
+                           CASE WHEN LTRIM(RTRIM(ISNULL(ca.shift_time, ''))) <> '' THEN 1 ELSE 0 END DESC,
+                           CASE WHEN LTRIM(RTRIM(ISNULL(ca.assignment_notes, ''))) <> '' THEN 1 ELSE 0 END DESC,
+                           ca.created_at DESC,
+                           ca.id ASC
+                   ) AS slot_rank,
+                   ca.id
+            FROM dbo.court_assignments ca
+        )
+        DELETE target
+        OUTPUT deleted.assignment_date
+        FROM dbo.court_assignments target
+        INNER JOIN ranked r ON r.id = target.id
+        WHERE r.slot_rank > 1
+    """)
+    compacted_days = sorted({row[0] for row in cursor.fetchall()})
+    executemany(cursor, """
+        MERGE dbo.day_versions WITH (HOLDLOCK) AS target
+        USING (SELECT CAST(? AS DATE) AS assignment_date) AS source
+        ON target.assignment_date = source.assignment_date
+        WHEN MATCHED THEN
+            UPDATE SET version = target.version + 1, updated_at = SYSUTCDATETIME()
+        WHEN NOT MATCHED THEN
+            INSERT (assignment_date, version, updated_at)
+            VALUES (source.assignment_date, 1, SYSUTCDATETIME());
+    """, [(day,) for day in compacted_days])
+
+    # Rows the board showed separately but whose slot keys collide through
+    # case are not the migration's to merge. Report them and roll back.
+    cursor.execute("""
+        SELECT ca.id, ca.assignment_date, ca.courthouse, ca.assignment_type,
+               ca.location_group, ca.location_detail, ca.part
+        FROM dbo.court_assignments ca
+        WHERE EXISTS (
+            SELECT 1
+            FROM dbo.court_assignments other
+            WHERE other.id <> ca.id
+              AND other.assignment_date = ca.assignment_date
+              AND other.courthouse = ca.courthouse
+              AND other.assignment_type = ca.assignment_type
+              AND other.group_key = ca.group_key
+              AND other.detail_key = ca.detail_key
+              AND other.part_key = ca.part_key
+        )
+        ORDER BY ca.assignment_date, ca.courthouse, ca.assignment_type, ca.id
+    """)
+    conflicts = cursor.fetchall()
+    if conflicts:
+        listed = "; ".join(
+            f"{day} id {row_id}: {' / '.join(value or '' for value in key)}"
+            for row_id, day, *key in conflicts[:20]
+        )
+        raise RuntimeError(
+            f"{len(conflicts)} assignment row(s) share a slot with rows that differ only in case, "
+            f"so the unique slot index cannot be built. Nothing was deleted. Rename or merge them "
+            f"(`flask --app app compact-duplicate-slots --dry-run` lists them) and run migrate again. "
+            f"{listed}"
+        )
+
+    cursor.execute("""
+        IF NOT EXISTS (
+            SELECT 1
+            FROM sys.indexes
+            WHERE name = 'IX_court_assignments_group_slot'
+              AND object_id = OBJECT_ID('dbo.court_assignments')
+              AND is_unique = 1
+        )
+        BEGIN
+            CREATE UNIQUE INDEX IX_court_assignments_group_slot
+                ON dbo.court_assignments (assignment_date, courthouse, assignment_type, group_key, part_key, detail_key)
+                INCLUDE (assigned_member, assignment_notes, shift_time, judge_name)
+                WITH (DROP_EXISTING = ON);
+        END
+    """)
+
+
+@migration(11, "create vacancy_counters", rebuild="rebuild-vacancy-counters")
+def _create_vacancy_counters(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.vacancy_counters', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.vacancy_counters (
+                assignment_date DATE NOT NULL,
+                courthouse NVARCHAR(100) NOT NULL,
+                assignment_type NVARCHAR(50) NOT NULL,
+                vacant INT NOT NULL,
+                filled INT NOT NULL,
+                updated_at DATETIME2 NOT NULL,
+                courthouse_key AS CAST(LOWER(LTRIM(RTRIM(courthouse))) AS NVARCHAR(100)) PERSISTED,
+                CONSTRAINT PK_vacancy_counters PRIMARY KEY (assignment_date, courthouse, assignment_type)
+            )
+        END
+
+        IF OBJECT_ID('dbo.vacancy_counter_days', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.vacancy_counter_days (
+                assignment_date DATE NOT NULL,
+                day_version BIGINT NOT NULL,
+                counted_at DATETIME2 NOT NULL,
+                CONSTRAINT PK_vacancy_counter_days PRIMARY KEY (assignment_date)
+            )
+        END
+    """)
+
+
+@migration(12, "create court_assignment_member_tokens", rebuild="rebuild-assignment-members")
+def _create_court_assignment_member_tokens(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.court_assignment_member_tokens', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.court_assignment_member_tokens (
+                assignment_id INT NOT NULL,
+                ordinal INT NOT NULL,
+                token_key NVARCHAR(100) NOT NULL,
+                assignment_date DATE NOT NULL,
+                CONSTRAINT PK_court_assignment_member_tokens PRIMARY KEY (assignment_id, ordinal, token_key),
+                CONSTRAINT FK_court_assignment_member_tokens_member
+                    FOREIGN KEY (assignment_id, ordinal)
+                    REFERENCES dbo.court_assignment_members (assignment_id, ordinal) ON DELETE CASCADE
+            )
+        END
+
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_court_assignment_member_tokens_token_date')
+        BEGIN
+            CREATE INDEX IX_court_assignment_member_tokens_token_date
+                ON dbo.court_assignment_member_tokens (token_key, assignment_date);
+        END
+    """)
+
+
+def _ensure_schema_migrations_table(cursor):
+    cursor.execute("""
+        IF OBJECT_ID('dbo.schema_migrations', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.schema_migrations (
+                version INT NOT NULL,
+                name NVARCHAR(255) NOT NULL,
+                applied_at DATETIME NOT NULL DEFAULT GETDATE(),
+                CONSTRAINT PK_schema_migrations PRIMARY KEY (version)
+            )
+        END
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM dbo.schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def pending_migrations(cursor):
+    applied = applied_versions(cursor)
+    return [entry for entry in sorted(MIGRATIONS, key=lambda item: item[0]) if entry[0] not in applied]
+
+
+def schema_is_current(cursor):
+    """Return True when every registered migration has been applied."""
+    cursor.execute("SELECT OBJECT_ID('dbo.schema_migrations', 'U')")
+    row = cursor.fetchone()
+    if not row or row[0] is None:
+        return False
+    return not pending_migrations(cursor)
+
+
+def run_migrations(conn, log=None):
+    """
+    Apply every pending migration in version order and return the versions run.
+
+    An exclusive application lock serializes concurrent runners, so several
+    workers starting at once apply each migration only once. Every migration
+    commits together with its schema_migrations row.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SET NOCOUNT ON;
+        DECLARE @result INT;
+        EXEC @result = sp_getapplock
+            @Resource = ?,
+            @LockMode = 'Exclusive',
+            @LockOwner = 'Session',
+            @LockTimeout = 120000;
+        SELECT @result;
+    """, (_APPLOCK_RESOURCE,))
+    lock_result = cursor.fetchone()
+    if not lock_result or lock_result[0] < 0:
+        raise RuntimeError(f"Unable to acquire schema migration lock (result {lock_result and lock_result[0]})")
+
+    applied_now = []
+    try:
+        _ensure_schema_migrations_table(cursor)
+        conn.commit()
+
+        for version, name, step in pending_migrations(cursor):
+            if log:
+                log(f"Applying schema migration {version}: {name}")
+            try:
+                step(cursor)
+                cursor.execute("""
+                    INSERT INTO dbo.schema_migrations (version, name, applied_at)
+                    VALUES (?, ?, GETDATE())
+                """, (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied_now.append(version)
+    finally:
+        cursor.execute("EXEC sp_releaseapplock @Resource = ?, @LockOwner = 'Session'", (_APPLOCK_RESOURCE,))
+        conn.commit()
+
+    return applied_now
@@ -0,0 +1,104 @@
+"""
+Incremental JSON encoding for large result sets.
+
+fetchall() followed by jsonify keeps the driver rows, the list of dicts and
+the encoded body in memory together. These helpers pull rows with
+fetchmany and encode them one at a time, so a worker only holds a single
+fetch batch and one output chunk at any moment.
+"""
+
+import os
+import tracemalloc
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+
+STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "500"))
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def iter_rows(cursor, batch_size=STREAM_FETCH_SIZE):
+    """Yield the rows of an executed cursor, fetching ``batch_size`` at a time."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def http_date_text(value):
+    """
+    Format a date or datetime the way Flask's JSON provider does (RFC 822,
+    naive values taken as UTC), without going through email.utils.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset() is not None:
+            value = value.astimezone(timezone.utc)
+        hour, minute, second = value.hour, value.minute, value.second
+    else:
+        hour = minute = second = 0
+    return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+        _WEEKDAYS[value.weekday()], value.day, _MONTHS[value.month - 1], value.year, hour, minute, second,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _date_json(value):
+    # Plain dates repeat on every row of a day, so their text is cached.
+    return encode_basestring_ascii(http_date_text(value))
+
+
+def encode_json_value(value, fallback):
+    """
+    JSON text for the common column types, matching Flask's encoding;
+    anything else goes through ``fallback``.
+    """
+    value_type = value.__class__
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if value_type is int:
+        return str(value)
+    if value_type is date:
+        return _date_json(value)
+    if value_type is datetime:
+        return encode_basestring_ascii(http_date_text(value))
+    return fallback(value)
+
+
+def json_array_chunks(items, dumps, chunk_bytes=STREAM_CHUNK_BYTES):
+    """
+    Encode ``items`` as one JSON array, yielding text chunks of roughly
+    ``chunk_bytes``. ``dumps`` encodes a single item.
+    """
+    buffer = ["["]
+    size = 1
+    separator = ""
+    for item in items:
+        encoded = dumps(item)
+        buffer.append(separator)
+        buffer.append(encoded)
+        size += len(encoded) + len(separator)
+        separator = ","
+        if size >= chunk_bytes:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    buffer.append("]")
+    yield "".join(buffer)
+
+
+def peak_allocation(produce):
+    """Run ``produce()`` and return ``(result, peak traced bytes)``."""
+    tracemalloc.start()
+    try:
+        result = produce()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
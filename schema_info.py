@@ -0,0 +1,46 @@
+"""
+Per-process cache of table columns read from INFORMATION_SCHEMA.
+
+Some optional columns (for example dbo.deputies.division, rank and email)
+only exist on databases that have been upgraded by hand. Handlers look them
+up here and build one statement for the columns that are actually present
+instead of probing with failing queries.
+"""
+
+import threading
+
+_columns_cache = {}
+_cache_lock = threading.Lock()
+
+
+def table_columns(cursor, table_name, schema_name="dbo"):
+    """Return the lower-cased column names of a table, loading them once."""
+    key = (schema_name.lower(), table_name.lower())
+    columns = _columns_cache.get(key)
+    if columns is not None:
+        return columns
+
+    cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = ?
+          AND TABLE_NAME = ?
+    """, (schema_name, table_name))
+    columns = frozenset((row[0] or "").lower() for row in cursor.fetchall())
+
+    with _cache_lock:
+        _columns_cache[key] = columns
+    return columns
+
+
+def has_column(cursor, table_name, column_name, schema_name="dbo"):
+    return column_name.lower() in table_columns(cursor, table_name, schema_name)
+
+
+def refresh_schema_cache(table_name=None, schema_name="dbo"):
+    """Forget cached columns for one table, or for every table."""
+    with _cache_lock:
+        if table_name is None:
+            _columns_cache.clear()
+        else:
+            _columns_cache.pop((schema_name.lower(), table_name.lower()), None)
@@ -0,0 +1,158 @@
+"""
+Staffing grid lookups.
+
+dbo.staffing_daily only stores a cell on the dates it was edited, so the grid
+for a date is "the latest value of every cell on or before that date".
+dbo.staffing_cells lists the cells that have ever been written, and each one
+is resolved with a TOP 1 seek on IX_staffing_daily_cell_date, so the cost
+follows the grid size rather than the length of the history.
+"""
+
+import time
+from datetime import date, timedelta
+
+LATEST_STAFFING_SQL = """
+    SELECT c.row_number, c.column_name, latest.deputy_name
+    FROM {cells} c
+    CROSS APPLY (
+        SELECT TOP 1 sd.deputy_name
+        FROM {daily} sd
+        WHERE sd.row_number = c.row_number
+          AND sd.column_name = c.column_name
+          AND sd.staffing_date <= ?
+        ORDER BY sd.staffing_date DESC
+    ) latest
+"""
+
+# The original whole-history query, kept for benchmark comparisons.
+_GROUPED_STAFFING_SQL = """
+    SELECT sd.row_number, sd.column_name, sd.deputy_name
+    FROM {daily} sd
+    INNER JOIN (
+        SELECT row_number, column_name, MAX(staffing_date) AS max_date
+        FROM {daily}
+        WHERE staffing_date <= ?
+        GROUP BY row_number, column_name
+    ) latest
+    ON sd.row_number = latest.row_number
+       AND sd.column_name = latest.column_name
+       AND sd.staffing_date = latest.max_date
+"""
+
+_REMEMBER_CELL_SQL = """
+    INSERT INTO dbo.staffing_cells (row_number, column_name)
+    SELECT ?, ?
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM dbo.staffing_cells WITH (UPDLOCK, HOLDLOCK)
+        WHERE row_number = ? AND column_name = ?
+    )
+"""
+
+
+def latest_staffing(cursor, staffing_date):
+    cursor.execute(
+        LATEST_STAFFING_SQL.format(cells="dbo.staffing_cells", daily="dbo.staffing_daily"),
+        (staffing_date,),
+    )
+    return cursor.fetchall()
+
+
+def remember_cell(cursor, row_number, column_name):
+    """Record a grid cell the first time a value is written to it."""
+    cursor.execute(_REMEMBER_CELL_SQL, (row_number, column_name, row_number, column_name))
+
+
+def benchmark_latest_staffing(cursor, years=3, grid_rows=40, grid_columns=12, edit_percent=25, samples=5):
+    """
+    Time the grouped query against the indexed lookup on synthetic history.
+
+    Everything is built in session temp tables (#bench_staffing_daily and
+    #bench_staffing_cells), so the real tables are never touched. Each cell
+    gets a value on day one and is then edited on roughly ``edit_percent``
+    percent of the following days.
+    """
+    days = max(1, int(years * 365))
+    cursor.execute("""
+        DROP TABLE IF EXISTS #bench_staffing_daily;
+        DROP TABLE IF EXISTS #bench_staffing_cells;
+        CREATE TABLE #bench_staffing_daily (
+            staffing_date DATE NOT NULL,
+            row_number INT NOT NULL,
+            column_name NVARCHAR(100) NOT NULL,
+            deputy_name NVARCHAR(255) NULL
+        );
+        CREATE TABLE #bench_staffing_cells (
+            row_number INT NOT NULL,
+            column_name NVARCHAR(100) NOT NULL,
+            PRIMARY KEY (row_number, column_name)
+        );
+    """)
+    cursor.execute("""
+        WITH n AS (
+            SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS i
+            FROM sys.all_objects a CROSS JOIN sys.all_objects b
+        )
+        INSERT INTO #bench_staffing_cells (row_number, column_name)
+        SELECT r.i + 1, CONCAT('col', c.i + 1)
+        FROM n r CROSS JOIN n c
+        WHERE r.i < ? AND c.i < ?
+    """, (max(grid_rows, grid_columns), grid_rows, grid_columns))
+    cursor.execute("""
+        WITH d AS (
+            SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS i
+            FROM sys.all_objects a CROSS JOIN sys.all_objects b
+        )
+        INSERT INTO #bench_staffing_daily (staffing_date, row_number, column_name, deputy_name)
+        SELECT DATEADD(DAY, d.i, '2000-01-01'), c.row_number, c.column_name,
+               CONCAT('Deputy ', ABS(CHECKSUM(NEWID())) % 500)
+        FROM d CROSS JOIN #bench_staffing_cells c
+        WHERE d.i = 0 OR ABS(CHECKSUM(NEWID())) % 100 < ?
+    """, (days, edit_percent))
+    cursor.execute("""
+        CREATE UNIQUE CLUSTERED INDEX IX_bench_staffing_daily
+            ON #bench_staffing_daily (staffing_date, row_number, column_name);
+        CREATE INDEX IX_bench_staffing_daily_cell_date
+            ON #bench_staffing_daily (row_number, column_name, staffing_date DESC)
+            INCLUDE (deputy_name);
+    """)
+    cursor.execute("SELECT COUNT(*) FROM #bench_staffing_daily")
+    history_rows = cursor.fetchone()[0]
+
+    queries = {
+        "grouped": _GROUPED_STAFFING_SQL.format(daily="#bench_staffing_daily"),
+        "indexed": LATEST_STAFFING_SQL.format(cells="#bench_staffing_cells", daily="#bench_staffing_daily"),
+    }
+    first_day = date(2000, 1, 1)
+    sample_dates = [
+        (first_day + timedelta(days=int((days - 1) * (index + 1) / samples))).isoformat()
+        for index in range(samples)
+    ]
+
+    timings = {}
+    results = {}
+    for name, query in queries.items():
+        elapsed = []
+        for sample_date in sample_dates:
+            started = time.perf_counter()
+            cursor.execute(query, (sample_date,))
+            rows = cursor.fetchall()
+            elapsed.append((time.perf_counter() - started) * 1000)
+            results.setdefault(sample_date, {})[name] = sorted(tuple(row) for row in rows)
+        timings[name] = {
+            "min_ms": round(min(elapsed), 2),
+            "avg_ms": round(sum(elapsed) / len(elapsed), 2),
+            "max_ms": round(max(elapsed), 2),
+        }
+
+    cursor.execute("""
+        DROP TABLE IF EXISTS #bench_staffing_daily;
+        DROP TABLE IF EXISTS #bench_staffing_cells;
+    """)
+    return {
+        "history_rows": history_rows,
+        "grid_cells": grid_rows * grid_columns,
+        "days": days,
+        "timings": timings,
+        "results_match": all(by_query["grouped"] == by_query["indexed"] for by_query in results.values()),
+    }
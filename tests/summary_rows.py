@@ -0,0 +1,73 @@
+"""
+Seeded assignment rows for comparing the executive summary rules with the
+page JavaScript they were ported from. The expected values in
+fixtures/*_js.json were computed by that JavaScript on these rows.
+"""
+
+import random
+
+from executive_summary import _CUMMINGS_POSTS, _CUMMINGS_ROOMS, _MITCHELL_POSTS, _MITCHELL_ROOMS
+
+COURTHOUSES = ["Mitchell", "Cummings", "Juvenile", " Mitchell ", "Eastside"]
+LABELS = ["", "Need 1 Deputy", "NEED 2 DEPUTIES", "need 2 deputies ", "CLOSED", "No Deputies", "Civil - No Deputies",
+          "On Leave", "OPEN", "open-2", "Waiting to receive case", "Juvenile", "Family", "Motions", " OPEN-A "]
+MEMBERS = ["", "Doe, Jane", "Doe, Jane || Roe, Sam", "OPEN", "Roe, Sam\nPoe, Al", "  ", "VACANT", "TBD || Doe, Jane"]
+SHIFTS = ["", "8:30-4:30", "7:00 AM - 3:00 PM", "1600-2100", "4:30 p.m. - 9 p.m.", "11 PM - 7 AM", "bad", "0700-",
+          "7-3", "9:00 - 5:00 PM", "12 AM - 12 PM", "0830-1630-3"]
+EXTRA_POSTS = [("Rover OT", "", "1630-1900"), ("Rover", "4:30 PM", "1630-1900"), ("Judges", "", "0700"),
+               ("Judges OT", "7:00 AM", "0700"), ("Garage", "4:00 PM", "1600"), ("Garage OT", "", "1600"),
+               ("Transportation", "", ""), ("Transportation", "Van 2", "T-2"), ("Lockup", "", "0800"),
+               ("Lobby", "", "0830-1630-3"), ("Cummings", "8:30 AM", "0830-3"), ("Spot OT", "", "")]
+
+SEEDS = range(20)
+
+
+def _post_row(generator, courthouse, post, detail, part):
+    return {
+        "assignment_type": "Fixed Post",
+        "courthouse": courthouse,
+        "location_group": generator.choice([post, post, f" {post} ", post.upper()]),
+        "location_detail": generator.choice([detail, detail, ""]),
+        "part": generator.choice([part, part, "", f"{part} "]),
+        "assigned_member": generator.choice(MEMBERS),
+        "assignment_notes": generator.choice(["", "", "OT"]),
+        "shift_time": generator.choice(SHIFTS),
+    }
+
+
+def day_rows(seed):
+    """One day of Courtroom, Fixed Post and Overtime rows, with messy labels and spacing."""
+    generator = random.Random(seed)
+    rows = []
+    for _ in range(generator.randrange(5, 40)):
+        courthouse = generator.choice(COURTHOUSES)
+        room = generator.choice(_MITCHELL_ROOMS + _CUMMINGS_ROOMS + ["999X", " 600M "])
+        rows.append({
+            "assignment_type": "Courtroom",
+            "courthouse": courthouse,
+            "location_group": "",
+            "location_detail": room,
+            "part": str(generator.randrange(3)),
+            "assigned_member": generator.choice(MEMBERS),
+            "assignment_notes": generator.choice(LABELS),
+            "shift_time": generator.choice(SHIFTS),
+        })
+    for _ in range(generator.randrange(5, 40)):
+        courthouse = generator.choice(COURTHOUSES + ["Mitchell", "Cummings"])
+        pool = {"Mitchell": _MITCHELL_POSTS, "Cummings": _CUMMINGS_POSTS}.get(courthouse.strip(), _MITCHELL_POSTS)
+        post, detail, part = generator.choice(list(pool) + EXTRA_POSTS)
+        rows.append(_post_row(generator, courthouse, post, detail, part))
+    for _ in range(generator.randrange(0, 6)):
+        rows.append({
+            "assignment_type": generator.choice(["Overtime", " Overtime ", "Special"]),
+            "courthouse": generator.choice(COURTHOUSES),
+            "location_group": generator.choice(["Detail", "Rover OT", ""]),
+            "location_detail": generator.choice(["", "6:00 PM - 10:00 PM", "Gate"]),
+            "part": generator.choice(["", "1630-1900", "0700"]),
+            "assigned_member": generator.choice(MEMBERS),
+            "assignment_notes": "",
+            "shift_time": generator.choice(SHIFTS),
+        })
+    generator.shuffle(rows)
+    return rows
+
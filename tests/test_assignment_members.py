@@ -0,0 +1,119 @@
+import pytest
+
+from assignment_members import (
+    member_key,
+    member_key_prefix,
+    member_search_prefixes,
+    member_tokens,
+    parse_assigned_member_names,
+    remove_member,
+    sync_assignment_members,
+)
+
+
+@pytest.mark.parametrize("value, names", [
+    (None, []),
+    ("", []),
+    ("   ", []),
+    ("Doe, Jane", ["Doe, Jane"]),
+    (" Doe, Jane ", ["Doe, Jane"]),
+    ("Doe, Jane || Roe, Sam", ["Doe, Jane", "Roe, Sam"]),
+    ("Doe, Jane||Roe, Sam||", ["Doe, Jane", "Roe, Sam"]),
+    ("Doe, Jane\nRoe, Sam\n\n", ["Doe, Jane", "Roe, Sam"]),
+    ("OPEN", []),
+    ("open-2", []),
+    ("VACANT || Doe, Jane || TBD || Unassigned", ["Doe, Jane"]),
+    ("Openshaw, Al", ["Openshaw, Al"]),
+])
+def test_parse_assigned_member_names(value, names):
+    assert parse_assigned_member_names(value) == names
+
+
+def test_member_key_folds_case_and_spacing():
+    assert member_key("  Doe, JANE ") == "doe, jane"
+    assert member_key(None) == ""
+
+
+@pytest.mark.parametrize("name, pattern", [
+    ("Doe", "doe%"),
+    (" DOE, J ", "doe, j%"),
+    ("50%", "50[%]%"),
+    ("a_b", "a[_]b%"),
+    ("[x]", "[[]x]%"),
+])
+def test_member_key_prefix_escapes_like_wildcards(name, pattern):
+    assert member_key_prefix(name) == pattern
+
+
+@pytest.mark.parametrize("name, tokens", [
+    ("Doe, Jane", ["doe", "jane"]),
+    ("  DOE,JANE  ", ["doe", "jane"]),
+    ("Smith-Jones, Mary Ann", ["smith-jones", "smith", "jones", "mary", "ann"]),
+    ("O'Brien, Pat", ["o'brien", "pat"]),
+    ("Doe, Doe", ["doe"]),
+    ("", []),
+])
+def test_member_tokens(name, tokens):
+    assert member_tokens(name) == tokens
+
+
+@pytest.mark.parametrize("query, prefixes", [
+    ("Jane", ["jane%"]),
+    ("doe, ja", ["doe%", "ja%"]),
+    ("  Jane   Doe ", ["jane%", "doe%"]),
+    ("50%_off", ["50[%][_]off%"]),
+    (",", [",%"]),
+])
+def test_member_search_prefixes(query, prefixes):
+    assert member_search_prefixes(query) == prefixes
+
+
+@pytest.mark.parametrize("query", ["jane", "JA", "doe", "doe, jane", "jane doe", "Jane D"])
+def test_search_prefixes_find_last_first_names(query):
+    tokens = member_tokens("Doe, Jane")
+    for prefix in member_search_prefixes(query):
+        assert any(token.startswith(prefix[:-1]) for token in tokens)
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.batches = []
+
+    def executemany(self, query, rows):
+        self.batches.append((" ".join(query.split()), list(rows)))
+
+
+def test_sync_writes_member_and_token_rows():
+    cursor = RecordingCursor()
+    sync_assignment_members(cursor, [(7, "2026-01-05", "Doe, Jane || OPEN || Smith-Jones, Al")])
+
+    (delete_sql, deleted), (member_sql, members), (token_sql, tokens) = cursor.batches
+    assert delete_sql.startswith("DELETE FROM dbo.court_assignment_members") and deleted == [(7,)]
+    assert "dbo.court_assignment_members" in member_sql
+    assert members == [
+        (7, 0, "Doe, Jane", "doe, jane", "2026-01-05"),
+        (7, 1, "Smith-Jones, Al", "smith-jones, al", "2026-01-05"),
+    ]
+    assert "dbo.court_assignment_member_tokens" in token_sql
+    assert tokens == [
+        (7, 0, "doe", "2026-01-05"),
+        (7, 0, "jane", "2026-01-05"),
+        (7, 1, "smith-jones", "2026-01-05"),
+        (7, 1, "smith", "2026-01-05"),
+        (7, 1, "jones", "2026-01-05"),
+        (7, 1, "al", "2026-01-05"),
+    ]
+
+
+@pytest.mark.parametrize("assigned_member, name, remaining, removed", [
+    ("Doe, Jane", "Doe, Jane", None, 1),
+    ("Doe, Jane || Roe, Sam", " doe, JANE ", "Roe, Sam", 1),
+    ("Roe, Sam\nDoe, Jane\nPoe, Al", "Doe, Jane", "Roe, Sam || Poe, Al", 1),
+    ("OPEN || Doe, Jane || Doe, Jane", "Doe, Jane", "OPEN", 2),
+    ("Doe, Janet || Doe, Jane", "Doe, Jane", "Doe, Janet", 1),
+    ("Roe, Sam", "Doe, Jane", "Roe, Sam", 0),
+    ("", "Doe, Jane", None, 0),
+    (None, "Doe, Jane", None, 0),
+])
+def test_remove_member(assigned_member, name, remaining, removed):
+    assert remove_member(assigned_member, name) == (remaining, removed)
@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from assignment_rows import (
+    SEARCH_COLUMNS,
+    AssignmentRow,
+    RowLayout,
+    json_array_text,
+    synthetic_search_rows,
+)
+from result_stream import json_array_chunks
+
+app = Flask(__name__)
+
+
+def encode_json_row(row):
+    # What app._encode_json_row passes as the fallback encoder.
+    return app.json.dumps(row, separators=(",", ":"))
+
+
+def jsonify_text(payload):
+    with app.app_context():
+        return app.json.response(payload).get_data(as_text=True).rstrip("\n")
+
+
+VALUES = [
+    "",
+    " Room 4 ",
+    'quote " backslash \\ slash /',
+    "tab\tnew\nline\x01",
+    "café — \U0001f600",
+    None,
+    0,
+    -17,
+    True,
+    False,
+    1.5,
+    Decimal("12.50"),
+    date(2026, 1, 5),
+    date(1999, 12, 31),
+    datetime(2026, 1, 5, 8, 30, 15),
+    datetime(2026, 1, 5, 23, 59, 59, 999999),
+    datetime(2026, 1, 5, 20, 0, tzinfo=timezone(timedelta(hours=-5))),
+    datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc),
+]
+
+
+@pytest.mark.parametrize("value", VALUES, ids=repr)
+def test_to_json_matches_jsonify_for_each_type(value):
+    layout = RowLayout(["zeta", "alpha", "Mid"])
+    row = AssignmentRow(layout, ("last", value, None))
+    assert row.to_json(encode_json_row) == jsonify_text(row.as_dict())
+
+
+def test_search_rows_match_jsonify_byte_for_byte():
+    layout = RowLayout(SEARCH_COLUMNS)
+    rows = [AssignmentRow(layout, values) for values in synthetic_search_rows(500)]
+    expected = jsonify_text([row.as_dict() for row in rows])
+
+    assert json_array_text(rows, encode_json_row) == expected
+    assert "".join(json_array_chunks(rows, lambda row: row.to_json(encode_json_row), chunk_bytes=1024)) == expected
+
+
+def test_dates_use_rfc_822():
+    row = AssignmentRow(RowLayout(["day"]), (date(2026, 10, 18),))
+    assert row.to_json(encode_json_row) == '{"day":"Sun, 18 Oct 2026 00:00:00 GMT"}'
+
+
+def test_row_reads_by_column_name():
+    row = AssignmentRow(RowLayout(["id", "courthouse"]), (3, "Mitchell"))
+    assert row["courthouse"] == "Mitchell"
+    assert row.get("part", "") == ""
+    assert row.as_dict() == {"id": 3, "courthouse": "Mitchell"}
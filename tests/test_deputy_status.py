@@ -0,0 +1,121 @@
+import json
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from deputy_status import compile_status_timeline, parse_status_payload
+
+
+def _parse(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _baseline_meta(status_text, target_date):
+    """The per-day resolution /api/deputies used before StatusTimeline."""
+    payload = parse_status_payload(status_text)
+
+    if target_date:
+        target = _parse(target_date)
+        matches = []
+
+        for idx, status_range in enumerate(payload.get("ranges", [])):
+            start = _parse(status_range.get("start_date"))
+            end = _parse(status_range.get("end_date"))
+            status_value = status_range.get("status")
+            if not (start and end and status_value):
+                continue
+            if target and start <= target <= end:
+                matches.append((idx, status_value, status_range.get("changed_by"), status_range.get("changed_at")))
+
+        weekday_name = target.strftime("%A") if target else None
+        for idx, rule in enumerate(payload.get("weekly_unavailable", [])):
+            rule_day = (rule.get("day") or "").strip()
+            rule_end = _parse(rule.get("end_date"))
+            if not rule_day or not rule_end or not weekday_name:
+                continue
+            if target <= rule_end and (rule_day == "Any Day" or rule_day == weekday_name):
+                matches.append((len(payload.get("ranges", [])) + idx, "Unavailable", rule.get("changed_by"), rule.get("changed_at")))
+
+        if matches:
+            _, status, changed_by, changed_at = sorted(matches, key=lambda item: item[0])[-1]
+            return {"status": status, "changed_by": changed_by, "changed_at": changed_at}
+
+    has_structured_status = bool(payload.get("ranges") or payload.get("weekly_unavailable"))
+    legacy_status = payload.get("legacy")
+    if legacy_status and not has_structured_status:
+        legacy_meta = payload.get("legacy_meta") or {}
+        return {"status": legacy_status, "changed_by": legacy_meta.get("changed_by"), "changed_at": legacy_meta.get("changed_at")}
+
+    return {"status": None, "changed_by": None, "changed_at": None}
+
+
+def _random_status_text(generator):
+    first_day = date(2026, 1, 1)
+
+    def day(offset):
+        return (first_day + timedelta(days=offset)).isoformat()
+
+    ranges = []
+    for index in range(generator.randrange(6)):
+        start = generator.randrange(60)
+        ranges.append({
+            "start_date": day(start),
+            # Some ranges end before they start and must be ignored.
+            "end_date": day(start + generator.randrange(-3, 20)),
+            "status": generator.choice(["Leave", "Training", "Sick", ""]),
+            "changed_by": f"user{index}",
+            "changed_at": f"2025-12-{index + 1:02d}",
+        })
+    weekly = [
+        {
+            "day": generator.choice(["Monday", "Friday", "Any Day", " Sunday ", ""]),
+            "end_date": day(generator.randrange(60)) if generator.randrange(5) else "",
+            "changed_by": f"rule{index}",
+            "changed_at": "2025-11-01",
+        }
+        for index in range(generator.randrange(3))
+    ]
+    return json.dumps({
+        "legacy": generator.choice([None, "Active"]),
+        "legacy_meta": {"changed_by": "admin", "changed_at": "2025-01-01"},
+        "ranges": ranges,
+        "weekly_unavailable": weekly,
+    })
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_timeline_matches_baseline_resolution(seed):
+    generator = random.Random(seed)
+    status_text = _random_status_text(generator)
+    timeline = compile_status_timeline(status_text)
+    for offset in range(-5, 70):
+        target = (date(2026, 1, 1) + timedelta(days=offset)).isoformat()
+        assert timeline.meta_for(target) == _baseline_meta(status_text, target), target
+
+
+@pytest.mark.parametrize("status_text", [
+    None,
+    "",
+    "Active",
+    "not json {",
+    json.dumps({"legacy": "Active", "legacy_meta": {"changed_by": "admin"}, "ranges": []}),
+    json.dumps({"legacy": "Active", "ranges": [{"start_date": "2026-01-01", "end_date": "2026-01-31", "status": "Leave"}]}),
+])
+@pytest.mark.parametrize("target_date", [None, "", "2026-01-15", "2026-02-15", "15/01/2026"])
+def test_undated_and_legacy_statuses_match_baseline(status_text, target_date):
+    assert compile_status_timeline(status_text).meta_for(target_date) == _baseline_meta(status_text, target_date)
+
+
+def test_weekly_rules_outrank_ranges():
+    status_text = json.dumps({
+        "ranges": [{"start_date": "2026-01-01", "end_date": "2026-01-31", "status": "Leave"}],
+        "weekly_unavailable": [{"day": "Monday", "end_date": "2026-01-31", "changed_by": "rule"}],
+    })
+    timeline = compile_status_timeline(status_text)
+    assert timeline.status_for("2026-01-05") == "Unavailable"
+    assert timeline.status_for("2026-01-06") == "Leave"
+    assert timeline.status_for(date(2026, 1, 5)) == "Unavailable"
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from executive_summary import (
+    assignment_totals,
+    fixed_post_requirement_group,
+    is_open_court_label,
+    parse_shift_duration_hours,
+    required_deputies_for_courtroom_label,
+)
+from summary_rows import SEEDS, day_rows
+
+EXPECTED = json.loads((Path(__file__).parent / "fixtures" / "executive_summary_js.json").read_text())
+
+
+@pytest.mark.parametrize("label, required", EXPECTED["required_deputies"])
+def test_required_deputies_match_js(label, required):
+    assert required_deputies_for_courtroom_label(label) == required
+
+
+@pytest.mark.parametrize("label, is_open", EXPECTED["open_labels"])
+def test_open_court_labels_match_js(label, is_open):
+    # The page normalized labels before this check; callers here pass them normalized.
+    assert is_open_court_label((label or "").strip().upper()) == is_open
+
+
+@pytest.mark.parametrize("shift, hours", EXPECTED["shift_hours"])
+def test_shift_durations_match_js(shift, hours):
+    assert parse_shift_duration_hours(shift) == pytest.approx(hours)
+
+
+@pytest.mark.parametrize("seed, expected", list(zip(SEEDS, EXPECTED["days"])))
+def test_day_totals_match_js(seed, expected):
+    rows = day_rows(seed)
+    assert assignment_totals(rows) == expected["totals"]
+
+    groups = [
+        fixed_post_requirement_group(row["courthouse"], row["location_group"], row["location_detail"], row["part"])
+        if row["assignment_type"].strip() == "Fixed Post" else None
+        for row in rows
+    ]
+    assert groups == expected["fixed_post_groups"]
+
+
+@pytest.mark.parametrize("post, detail, part, grouped", [
+    ("Transportation", "", "", False),
+    ("Transportation", "Van 2", "T-2", True),
+    ("Calvert", "8:00 AM", "0800-1", True),
+])
+def test_badges_count_named_transportation(post, detail, part, grouped):
+    group = fixed_post_requirement_group("Mitchell", post, detail, part, count_named_transportation=True)
+    assert (group is not None) == grouped
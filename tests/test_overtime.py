@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from executive_summary import overtime_report, overtime_row_hours, total_overtime_hours
+from summary_rows import SEEDS, day_rows
+
+EXPECTED = json.loads((Path(__file__).parent / "fixtures" / "overtime_js.json").read_text())
+DAYS = list(zip(SEEDS, EXPECTED["days"]))
+
+
+@pytest.mark.parametrize("seed, expected", DAYS)
+def test_overtime_hours_match_js(seed, expected):
+    rows = day_rows(seed)
+    assert [overtime_row_hours(row) for row in rows] == pytest.approx(expected["row_hours"])
+    assert total_overtime_hours(rows) == pytest.approx(expected["total_hours"])
+
+
+def _dated_rows():
+    rows = []
+    for seed, _ in DAYS:
+        rows.extend(dict(row, assignment_date=f"2026-01-{seed + 1:02d}") for row in day_rows(seed))
+    return rows
+
+
+def test_courthouse_report_adds_up_to_js_total():
+    report = overtime_report(_dated_rows(), "courthouse")
+    expected_total = sum(expected["total_hours"] for _, expected in DAYS)
+
+    assert report["total_hours"] == pytest.approx(round(expected_total, 2))
+    assert sum(group["hours"] for group in report["totals"]) == pytest.approx(expected_total, abs=0.01 * len(report["totals"]))
+    assert sum(day["hours"] for day in report["days"]) == pytest.approx(expected_total, abs=0.01 * len(report["days"]))
+
+
+def test_deputy_report_credits_every_named_deputy():
+    rows = [
+        {"assignment_date": "2026-01-05", "assignment_type": "Overtime", "courthouse": "Mitchell",
+         "shift_time": "4:30 PM - 9:00 PM", "assigned_member": "Doe, Jane || Roe, Sam"},
+        {"assignment_date": "2026-01-06", "assignment_type": "Overtime", "courthouse": "Mitchell",
+         "shift_time": "7:00 AM - 3:00 PM", "assigned_member": " doe, jane "},
+        {"assignment_date": "2026-01-06", "assignment_type": "Overtime", "courthouse": "Mitchell",
+         "shift_time": "7:00 AM - 3:00 PM", "assigned_member": "OPEN"},
+    ]
+    report = overtime_report(rows, "deputy")
+
+    # Like the page, the total counts a shift whose member text is a
+    # placeholder; no deputy is credited for it.
+    assert report["total_hours"] == 20.5
+    assert [(group["deputy"], group["hours"], group["shifts"]) for group in report["totals"]] == [
+        ("Doe, Jane", 12.5, 2),
+        ("Roe, Sam", 4.5, 1),
+    ]
+    assert [(day["date"], day["hours"]) for day in report["days"]] == [
+        ("2026-01-05", 4.5), ("2026-01-05", 4.5), ("2026-01-06", 8),
+    ]
+
+
+def test_report_rejects_unknown_grouping():
+    with pytest.raises(ValueError):
+        overtime_report([], "assignment_type")
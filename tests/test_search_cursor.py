@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import date, datetime
+
+import pytest
+
+from assignment_rows import decode_search_cursor, encode_search_cursor
+
+
+def raw_token(payload):
+    text = payload if isinstance(payload, str) else json.dumps(payload)
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("assignment_date, assignment_id", [
+    ("2026-01-05", 1),
+    (date(2026, 1, 5), 123456789),
+    (datetime(2026, 1, 5, 8, 30), 42),
+    (" 2026-01-05 ", 7),
+])
+def test_cursor_round_trips(assignment_date, assignment_id):
+    token = encode_search_cursor(assignment_date, assignment_id)
+    assert "=" not in token and "+" not in token and "/" not in token
+    assert decode_search_cursor(token) == ("2026-01-05", assignment_id)
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "!!!",
+    "é",
+    "abc",
+    raw_token("not json"),
+    raw_token([1, 2]),
+    raw_token("12"),
+    raw_token({"d": "2026-01-05"}),
+    raw_token({"i": 3}),
+    raw_token({"d": "2026-13-40", "i": 3}),
+    raw_token({"d": None, "i": 3}),
+    raw_token({"d": ["2026-01-05"], "i": 3}),
+    raw_token({"d": "2026-01-05", "i": "3"}),
+    raw_token({"d": "2026-01-05", "i": 3.5}),
+    raw_token({"d": "2026-01-05", "i": True}),
+    raw_token({"d": "2026-01-05", "i": None}),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+])
+def test_malformed_cursors_decode_to_none(token):
+    assert decode_search_cursor(token) is None
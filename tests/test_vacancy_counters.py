@@ -0,0 +1,122 @@
+from datetime import date
+
+from vacancy_counters import count_vacancies, courthouse_key, refresh_vacancy_counters
+
+
+def courtroom(label, members="", courthouse="Mitchell", room="600M"):
+    return {"assignment_type": "Courtroom", "courthouse": courthouse, "location_group": "",
+            "location_detail": room, "part": "1", "assigned_member": members, "assignment_notes": label}
+
+
+def fixed_post(post, part, members="", courthouse="Mitchell", detail=""):
+    return {"assignment_type": "Fixed Post", "courthouse": courthouse, "location_group": post,
+            "location_detail": detail, "part": part, "assigned_member": members, "assignment_notes": ""}
+
+
+def test_courtrooms_count_required_deputies():
+    counts = count_vacancies([
+        courtroom("NEED 2 DEPUTIES", "Doe, Jane"),
+        courtroom("need 1 deputy", "Doe, Jane || Roe, Sam"),
+        courtroom("", "Doe, Jane"),
+        courtroom("CLOSED"),
+        courtroom("OPEN-2"),
+        courtroom("Motions", "OPEN"),
+    ])
+    # 2 needed/1 named, 1 needed/2 named (capped at 1), and a free-text
+    # label needing 1 with only a placeholder. Blank, closed and open labels
+    # need nobody.
+    assert counts == {("Mitchell", "Courtroom"): [2, 2]}
+
+
+def test_fixed_post_groups_count_once():
+    counts = count_vacancies([
+        # Jury Room and St. Paul share one requirement at Mitchell.
+        fixed_post("Jury Room", "0730"),
+        fixed_post("St. Paul", "0830", "Doe, Jane"),
+        fixed_post("Calvert", "0800-1"),
+        fixed_post("Calvert", "0800-3", "Roe, Sam"),
+        fixed_post("Transportation", ""),
+        fixed_post("Transportation", "T-2", "Poe, Al", detail="Van 2"),
+        {"assignment_type": "Overtime", "courthouse": "Mitchell", "assigned_member": ""},
+    ])
+    # Filled: jury/St. Paul, named transportation. Vacant: Calvert 0800-1.
+    # Calvert 0800-3 and the placeholder transportation row are optional.
+    assert counts == {("Mitchell", "Fixed Post"): [1, 2]}
+
+
+def test_courthouses_fold_to_one_key():
+    counts = count_vacancies([
+        courtroom("NEED 1 DEPUTY", "Doe, Jane", courthouse="Mitchell"),
+        courtroom("NEED 1 DEPUTY", courthouse=" mitchell "),
+        courtroom("NEED 1 DEPUTY", courthouse="Cummings", room="225C"),
+    ])
+    assert counts == {("Mitchell", "Courtroom"): [1, 1], ("Cummings", "Courtroom"): [1, 0]}
+    assert courthouse_key(" MITCHELL ") == courthouse_key("mitchell") == "mitchell"
+
+
+class DayCursor:
+    """Answers the statements refresh_vacancy_counters sends for one day."""
+
+    COLUMNS = ("assignment_date", "courthouse", "assignment_type", "location_group", "location_detail",
+               "part", "assigned_member", "assignment_notes")
+
+    def __init__(self, rows, version=4, stamp_rowcount=1):
+        self.rows = rows
+        self.version = version
+        self.stamp_rowcount = stamp_rowcount
+        self.statements = []
+        self.inserted = []
+        self.description = None
+        self.rowcount = -1
+        self._pending = []
+
+    def execute(self, query, params=()):
+        query = " ".join(query.split())
+        self.statements.append((query, params))
+        self._pending = []
+        if "FROM dbo.day_versions" in query:
+            self._pending = [(self.version,)]
+        elif "FROM dbo.court_assignments" in query:
+            self.description = [(name,) for name in self.COLUMNS]
+            self._pending = [tuple(row.get(name) for name in self.COLUMNS) for row in self.rows]
+        elif query.startswith("MERGE dbo.vacancy_counter_days"):
+            self.rowcount = self.stamp_rowcount
+        return self
+
+    def fetchone(self):
+        return self._pending.pop(0) if self._pending else None
+
+    def fetchmany(self, size):
+        batch, self._pending = self._pending[:size], self._pending[size:]
+        return batch
+
+    def executemany(self, query, rows):
+        self.inserted.extend(rows)
+
+
+def test_refresh_recounts_and_stamps_a_day():
+    cursor = DayCursor([
+        courtroom("NEED 2 DEPUTIES", "Doe, Jane"),
+        fixed_post("Calvert", "0800-1", "Roe, Sam"),
+    ])
+
+    assert refresh_vacancy_counters(cursor, [date(2026, 1, 5), "2026-01-05", "not a date"]) == ["2026-01-05"]
+
+    queries = [query for query, _ in cursor.statements]
+    assert queries[0].startswith("SELECT version FROM dbo.day_versions")
+    assert "FROM dbo.court_assignments" in queries[1]
+    assert queries[2].startswith("MERGE dbo.vacancy_counter_days")
+    assert cursor.statements[2][1] == ("2026-01-05", 4)
+    assert queries[3] == "DELETE FROM dbo.vacancy_counters WHERE assignment_date = ?"
+    assert cursor.inserted == [
+        ("2026-01-05", "Mitchell", "Courtroom", 1, 1),
+        ("2026-01-05", "Mitchell", "Fixed Post", 0, 1),
+    ]
+
+
+def test_refresh_leaves_counters_when_stamp_is_current():
+    cursor = DayCursor([courtroom("NEED 1 DEPUTY")], stamp_rowcount=0)
+
+    assert refresh_vacancy_counters(cursor, ["2026-01-05"]) == []
+    assert not any(query.startswith("DELETE") for query, _ in cursor.statements)
+    assert cursor.inserted == []
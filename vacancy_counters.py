@@ -0,0 +1,263 @@
+"""
+Per-day vacancy counters for the board's totals badges.
+
+dbo.vacancy_counters holds the vacant and filled figures of
+/api/assignment-totals for each (assignment_date, courthouse,
+assignment_type). dbo.vacancy_counter_days records the day version
+(dbo.day_versions) each date's counters were counted from.
+
+Writes only bump the day version, as before. The counters are recounted
+after the write has committed, by the next reader that finds the date's
+stamp behind its version (refresh_stale_vacancy_counters). A quiet date
+is read with a primary-key lookup, and no edit holds its locks while a
+day is recounted.
+
+The requirement rules come from executive_summary, so the badges and the
+summary count the same way. Fixed posts count once per requirement group,
+which can span several rows, so a day is recounted from its rows rather
+than adjusted by per-row deltas. rebuild_vacancy_counters recounts a
+whole range; `flask migrate` runs it once after creating the tables, and
+it serves repairs. vacancy_by_day aggregates a range for
+/api/analytics/vacancy.
+"""
+
+import random
+import time
+
+from assignment_members import parse_assigned_member_names
+from assignment_rows import assignment_rows
+from db_connect import executemany
+from day_versions import day_version, normalize_day
+from executive_summary import fixed_post_requirement_group, is_open_court_label, required_deputies_for_courtroom_label
+
+_COUNTED_COLUMNS_SQL = """
+    SELECT assignment_date, courthouse, assignment_type, location_group, location_detail,
+           part, assigned_member, assignment_notes
+    FROM dbo.court_assignments
+"""
+
+_INSERT_COUNTER_SQL = """
+    INSERT INTO dbo.vacancy_counters (assignment_date, courthouse, assignment_type, vacant, filled, updated_at)
+    VALUES (?, ?, ?, ?, ?, SYSUTCDATETIME())
+"""
+
+
+def courthouse_key(value):
+    """The folded courthouse name vacancy_counters.courthouse_key holds."""
+    return (value or "").strip().lower()
+
+
+def count_vacancies(rows):
+    """
+    Apply the staffing requirement rules to one day's rows and return
+    ``{(courthouse, assignment_type): [vacant, filled]}``. Courthouses are
+    matched by courthouse_key, like the counters' key, and a fixed post
+    group is credited to the courthouse of its first row.
+    """
+    counts = {}
+    fixed_post_groups = {}
+    courthouse_names = {}
+
+    for r in rows:
+        typ = (r.get("assignment_type") or "").strip()
+        if typ not in ("Courtroom", "Fixed Post"):
+            continue
+
+        courthouse = (r.get("courthouse") or "").strip()
+        courthouse = courthouse_names.setdefault(courthouse_key(courthouse), courthouse)
+        assigned_count = len(parse_assigned_member_names(r.get("assigned_member")))
+        label = (r.get("assignment_notes") or "").strip().upper()
+
+        if typ == "Fixed Post":
+            group_key = fixed_post_requirement_group(
+                courthouse, r.get("location_group"), r.get("location_detail"), r.get("part"),
+                count_named_transportation=True,
+            )
+            if not group_key:
+                continue
+
+            group = fixed_post_groups.setdefault(group_key, [courthouse, 0])
+            group[1] = max(group[1], assigned_count)
+            continue
+
+        # Courtroom:
+        required_deputies = required_deputies_for_courtroom_label(label)
+        if required_deputies == 0:
+            continue
+
+        if is_open_court_label(label):
+            continue
+
+        totals = counts.setdefault((courthouse, typ), [0, 0])
+        totals[0] += max(required_deputies - assigned_count, 0)
+        totals[1] += min(assigned_count, required_deputies)
+
+    for courthouse, assigned_count in fixed_post_groups.values():
+        totals = counts.setdefault((courthouse, "Fixed Post"), [0, 0])
+        totals[0 if assigned_count == 0 else 1] += 1
+
+    return counts
+
+
+_STAMP_DAY_SQL = """
+    MERGE dbo.vacancy_counter_days WITH (HOLDLOCK) AS target
+    USING (SELECT CAST(? AS DATE) AS assignment_date, CAST(? AS BIGINT) AS day_version) AS source
+    ON target.assignment_date = source.assignment_date
+    WHEN MATCHED AND target.day_version < source.day_version THEN
+        UPDATE SET day_version = source.day_version, counted_at = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN
+        INSERT (assignment_date, day_version, counted_at)
+        VALUES (source.assignment_date, source.day_version, SYSUTCDATETIME());
+"""
+
+
+def refresh_vacancy_counters(cursor, days):
+    """
+    Recount the given dates from court_assignments and return the dates
+    recounted. The caller commits.
+
+    The day version is read before the rows, so a stamp never claims rows
+    older than its version. Claiming the stamp first serializes concurrent
+    recounts of a date; one that finds the stamp already at its version
+    leaves the counters alone.
+    """
+    recounted = []
+    for day in sorted({day for day in (normalize_day(value) for value in days) if day}):
+        version = day_version(cursor, day)
+        cursor.execute(_COUNTED_COLUMNS_SQL + " WHERE assignment_date = ?", (day,))
+        counts = count_vacancies(list(assignment_rows(cursor)))
+
+        cursor.execute(_STAMP_DAY_SQL, (day, version))
+        if cursor.rowcount == 0:
+            continue
+        cursor.execute("DELETE FROM dbo.vacancy_counters WHERE assignment_date = ?", (day,))
+        executemany(cursor, _INSERT_COUNTER_SQL, [
+            (day, courthouse, assignment_type, vacant, filled)
+            for (courthouse, assignment_type), (vacant, filled) in sorted(counts.items())
+        ])
+        recounted.append(day)
+    return recounted
+
+
+def refresh_stale_vacancy_counters(cursor, start_date, end_date=None):
+    """
+    Recount the dates in the range whose counters are behind their day
+    version, returning the dates recounted. The caller commits.
+    """
+    cursor.execute("""
+        SELECT dv.assignment_date
+        FROM dbo.day_versions dv
+        LEFT JOIN dbo.vacancy_counter_days vd ON vd.assignment_date = dv.assignment_date
+        WHERE dv.assignment_date >= ?
+          AND dv.assignment_date <= ?
+          AND dv.version > ISNULL(vd.day_version, -1)
+    """, (normalize_day(start_date), normalize_day(end_date or start_date)))
+    return refresh_vacancy_counters(cursor, [row[0] for row in cursor.fetchall()])
+
+
+def rebuild_vacancy_counters(cursor, start_date=None, end_date=None):
+    """
+    Recount every date in the range (all dates when both ends are None),
+    one day at a time, and return the number of dates recounted.
+    """
+    for table in ("dbo.vacancy_counters", "dbo.vacancy_counter_days"):
+        cursor.execute(f"""
+            DELETE FROM {table}
+            WHERE (? IS NULL OR assignment_date >= ?)
+              AND (? IS NULL OR assignment_date <= ?)
+        """, (start_date, start_date, end_date, end_date))
+    cursor.execute("""
+        SELECT assignment_date
+        FROM dbo.court_assignments
+        WHERE (? IS NULL OR assignment_date >= ?)
+          AND (? IS NULL OR assignment_date <= ?)
+        UNION
+        SELECT assignment_date
+        FROM dbo.day_versions
+        WHERE (? IS NULL OR assignment_date >= ?)
+          AND (? IS NULL OR assignment_date <= ?)
+    """, (start_date, start_date, end_date, end_date) * 2)
+    return len(refresh_vacancy_counters(cursor, [row[0] for row in cursor.fetchall()]))
+
+
+def vacancy_totals(cursor, day, courthouse=None):
+    """Return ``(vacant, filled)`` for a date, optionally for one courthouse."""
+    key = courthouse_key(courthouse) or None
+    cursor.execute("""
+        SELECT ISNULL(SUM(vacant), 0), ISNULL(SUM(filled), 0)
+        FROM dbo.vacancy_counters
+        WHERE assignment_date = ?
+          AND (? IS NULL OR courthouse_key = ?)
+    """, (normalize_day(day), key, key))
+    vacant, filled = cursor.fetchone()
+    return vacant, filled
+
+
+VACANCY_GROUP_COLUMNS = ("courthouse", "assignment_type")
+
+# (selected value, grouping expression) per group_by column. Courthouses
+# group on the folded key and report one spelling of the name.
+_VACANCY_GROUP_SQL = {
+    "courthouse": ("MAX(courthouse)", "courthouse_key"),
+    "assignment_type": ("assignment_type", "assignment_type"),
+}
+
+
+def vacancy_by_day(cursor, start_date, end_date, group_by="courthouse"):
+    """
+    Return ``(date, group, vacant, filled)`` for every date in the range
+    that has counters, ``group`` being the ``group_by`` column's value.
+    """
+    if group_by not in VACANCY_GROUP_COLUMNS:
+        raise ValueError(f"group_by must be one of {', '.join(VACANCY_GROUP_COLUMNS)}")
+    selected, grouping = _VACANCY_GROUP_SQL[group_by]
+    cursor.execute(f"""
+        SELECT assignment_date, {selected}, SUM(vacant), SUM(filled)
+        FROM dbo.vacancy_counters
+        WHERE assignment_date >= ?
+          AND assignment_date <= ?
+        GROUP BY assignment_date, {grouping}
+        ORDER BY assignment_date, {grouping}
+    """, (start_date, end_date))
+    return cursor.fetchall()
+
+
+def synthetic_day_rows(count, seed=7):
+    """One day of assignment rows, shaped like _COUNTED_COLUMNS_SQL reads them."""
+    generator = random.Random(seed)
+    labels = ("", "NEED 1 DEPUTY", "NEED 2 DEPUTIES", "CLOSED", "OPEN")
+    rows = []
+    for index in range(count):
+        fixed_post = index % 4 == 0
+        rows.append({
+            "courthouse": f"Courthouse {index % 5}",
+            "assignment_type": "Fixed Post" if fixed_post else "Courtroom",
+            "location_group": f"Post {index % 40}" if fixed_post else f"Floor {index % 12}",
+            "location_detail": f"Room {index % 150}",
+            "part": str(index % 3),
+            "assigned_member": " || ".join(
+                f"Deputy {generator.randrange(400)}, Sam" for _ in range(generator.randrange(3))
+            ),
+            "assignment_notes": "" if fixed_post else generator.choice(labels),
+        })
+    return rows
+
+
+def benchmark_vacancy_counts(days=365, rows_per_day=300, repeat=3):
+    """
+    Time count_vacancies over ``days`` synthetic days, the Python side of
+    recounting a range (rebuild_vacancy_counters, or a range of stale days
+    read by /api/analytics/vacancy).
+    """
+    day_rows = [synthetic_day_rows(rows_per_day, seed=index) for index in range(days)]
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for rows in day_rows:
+            count_vacancies(rows)
+        elapsed.append((time.perf_counter() - started) * 1000)
+    return {
+        "days": days,
+        "rows": days * rows_per_day,
+        "timings": {"count": {"min_ms": round(min(elapsed), 2), "avg_ms": round(sum(elapsed) / len(elapsed), 2)}},
+    }